@@ -1,5 +1,8 @@
 import pygame
 import random
+from typing import Iterable, Optional
+# Utility imports
+from obstacle_utils import ObstacleQueue
 
 # Constants for world
 SCREEN_WIDTH = 800
@@ -22,34 +25,39 @@ def draw_ammo_ui(screen: pygame.Surface, ammo_icon: pygame.Surface, player_ammo:
 
 
 def manage_ammo_pickups(
-    ammo_pickups: list[pygame.Rect],
-    car_rects: list[pygame.Rect],
+    ammo_pickups: ObstacleQueue,
+    car_rects: Iterable[pygame.Rect],
     player_rect: pygame.Rect,
     player_ammo: int,
-    scroll_step: int
+    scroll_step: int,
+    rng: Optional[random.Random] = None
 ) -> int:
     """
     Handle all ammo pickup logic: movement, cleanup, collision, and spawning.
     Returns updated player_ammo.
     """
+    rng = rng or random
     # Move all pickups with the world
-    for pickup in ammo_pickups:
-        pickup.x -= scroll_step
+    ammo_pickups.move(-scroll_step)
     
-    # Remove off-screen pickups
-    ammo_pickups[:] = [p for p in ammo_pickups if p.right > 0]  # Modify the list in place to keep the reference
+    # Remove off-screen pickups - they are sorted by x, so they leave from the front
+    while ammo_pickups and ammo_pickups[0].right <= 0:
+        ammo_pickups.popleft()
     
-    # Check for player collision with pickups
-    for pickup in ammo_pickups[:]:
-        if player_rect.colliderect(pickup) and player_ammo < AMMO_MAX:
+    # Check for player collision with pickups, stopping at the first one past the player
+    i = 0
+    while i < len(ammo_pickups) and ammo_pickups[i].left < player_rect.right:
+        if player_rect.colliderect(ammo_pickups[i]) and player_ammo < AMMO_MAX:
             player_ammo += 1
-            ammo_pickups.remove(pickup)
+            ammo_pickups.remove_at(i)
+            continue
+        i += 1
     
     # Keep 1-2 pickups on screen - spawn if needed
     while len(ammo_pickups) < 2:
         # Find spawn position
-        last_pickup_x = max([p.right for p in ammo_pickups], default=SCREEN_WIDTH)
-        x = last_pickup_x + random.randint(AMMO_PICKUP_MIN_SPACING, AMMO_PICKUP_MAX_SPACING)
+        last_pickup_x = ammo_pickups[-1].right if ammo_pickups else SCREEN_WIDTH
+        x = last_pickup_x + rng.randint(AMMO_PICKUP_MIN_SPACING, AMMO_PICKUP_MAX_SPACING)
         
         # Simple collision avoidance with cars
         for car_rect in car_rects:
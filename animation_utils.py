@@ -1,46 +1,87 @@
 import pygame
-from typing import List, Tuple
+from bisect import bisect_right
+from itertools import accumulate
+from typing import List, Optional, Sequence
 
 # Animation-related utilities
 
-def advance_animation(
-    frame_idx: int,
-    last_time: int,
-    delay: int,
-    frames: List[pygame.Surface],
-    now: int,
-    loop: bool = True,
-    clamp: bool = True
-) -> Tuple[int, int]:
+class Animation:
     """
-    Advance the animation frame based on time and delay.
+    One animation clip: its frames and how long each is shown. The end time of every frame is
+    worked out up front, so the frame to show is a pure function of the time since the clip
+    started - nothing to advance each frame, and any number of sprites can share one clip.
+    Times can be in any unit (ms for the menus, simulation steps for GameSimulation).
+    frames can be left out when only the frame index is needed, as in the headless simulation.
     """
-    if now - last_time > delay:
-        frame_idx += 1
-        last_time = now
-        # Clamp to last frame if not looping, so animation doesn't reset
-        if frame_idx >= len(frames):
-            if loop:
-                frame_idx = 0
-            elif clamp:
-                frame_idx = len(frames) - 1
-    return frame_idx, last_time
-
-
-def load_animation(path: str, num_frames: int) -> List[pygame.Surface]:
+
+    def __init__(
+        self,
+        durations: Sequence[float],
+        frames: Optional[Sequence[pygame.Surface]] = None,
+        loop: bool = True
+    ) -> None:
+        self.frames = frames
+        self.loop = loop
+        self.frame_count = len(durations)
+        self.frame_ends = list(accumulate(durations))  # When each frame stops being shown
+        self.duration = self.frame_ends[-1]
+
+    @classmethod
+    def uniform(
+        cls,
+        frame_count: int,
+        frame_time: float,
+        frames: Optional[Sequence[pygame.Surface]] = None,
+        loop: bool = True
+    ) -> "Animation":
+        """A clip showing every frame for frame_time."""
+        return cls([frame_time] * frame_count, frames, loop)
+
+    def __len__(self) -> int:
+        return self.frame_count
+
+    def frame_index(self, elapsed: float, speed: float = 1.0) -> int:
+        """
+        Index of the frame shown elapsed time after the clip started, played speed times as fast.
+        Clips that don't loop stay on their last frame once they are over.
+        """
+        elapsed *= speed
+        if elapsed >= self.duration:
+            if not self.loop:
+                return self.frame_count - 1
+            elapsed %= self.duration
+        return bisect_right(self.frame_ends, elapsed)
+
+    def frame(self, elapsed: float, speed: float = 1.0) -> pygame.Surface:
+        """The frame shown elapsed time after the clip started."""
+        return self.frames[self.frame_index(elapsed, speed)]
+
+    def frame_start(self, index: int) -> float:
+        """Time from the start of the clip to when a frame is first shown."""
+        return self.frame_ends[index - 1] if index else 0
+
+
+def load_animation(path: str, num_frames: int, convert: bool = True) -> List[pygame.Surface]:
     """
     Load an animation from a sprite sheet.
+    Pass convert=False to load it without a display.
     """
-    sheet = pygame.image.load(path).convert_alpha()
+    sheet = pygame.image.load(path)
+    if convert:
+        sheet = sheet.convert_alpha()
     frame_w = sheet.get_width() // num_frames
     frame_h = sheet.get_height()
     # Loop through the sprite sheet to create a list of surfaces for each frame
     return [sheet.subsurface((i * frame_w, 0, frame_w, frame_h)) for i in range(num_frames)]
 
 
-def load_multi_img_animation(path: str, num_frames: int) -> List[pygame.Surface]:
+def load_multi_img_animation(path: str, num_frames: int, convert: bool = True) -> List[pygame.Surface]:
     """
     Load an animation from multiple image files.
+    Pass convert=False to load it without a display.
     """
     # Some animations are stored as separate images
-    return [pygame.image.load(path + str(i) + ".png").convert_alpha() for i in range(1, num_frames + 1)]
+    frames = [pygame.image.load(path + str(i) + ".png") for i in range(1, num_frames + 1)]
+    if convert:
+        frames = [frame.convert_alpha() for frame in frames]
+    return frames
@@ -0,0 +1,120 @@
+import threading
+import pygame
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+# Utility imports
+from atlas_utils import ATLAS_CACHE_PATH, OPAQUE_ASSETS, open_atlas, atlas_frame, atlas_asset
+from animation_utils import Animation
+
+# On-demand asset loading - frames are cut out of the memory-mapped atlas the first time they are
+# asked for and kept in a size-bounded LRU cache
+
+
+# Decoded surface budget. Every asset in the atlas decodes to about 13.6 MB (the game screen's
+# set is 12.6 MB), so by default nothing is evicted; the bound is for larger asset sets or for
+# low-memory devices, which can lower it with main.py --asset-cache-mb
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+# Everything the game screen draws, loaded in the background while the menu is up
+LEVEL_ASSETS = ["sky", "back", "buildings_back", "ground"]
+SPRITE_ASSETS = [
+    "cars", "run", "jump", "shoot", "reload", "death", "explosion",
+    "ammo_icon", "ammo_pickup",
+]
+GAME_ASSETS = LEVEL_ASSETS + SPRITE_ASSETS
+
+
+class AssetManager:
+    """
+    Loads named assets (lists of frames, see atlas_utils.ASSET_RECIPES) on first use.
+    Least recently used assets are dropped once the cache holds more than max_bytes of pixels.
+    Dropping only releases the cache's reference: callers that keep frames, such as
+    GameSimulation's car surfaces and the parallax strips, keep them alive and counted outside
+    the budget, and a later get() decodes a fresh copy. Fetch with get() at draw time whatever
+    does not need to stay the same object.
+    """
+
+    def __init__(self, atlas_path: str = ATLAS_CACHE_PATH, max_bytes: int = DEFAULT_CACHE_BYTES) -> None:
+        self.atlas_path = atlas_path
+        self.max_bytes = max_bytes
+        self.cached_bytes = 0
+        self._cache: "OrderedDict[str, List[pygame.Surface]]" = OrderedDict()
+        self._sizes = {}
+        self._masks: Dict[str, List[pygame.Mask]] = {}  # At 1 bit per pixel these are never evicted
+        self._animations: Dict[Tuple[str, float, bool], Animation] = {}
+        self._lock = threading.Lock()
+        self._atlas = None  # (index, width, pixels), opened on first use
+
+    def get(self, name: str) -> List[pygame.Surface]:
+        """All frames of an asset, loading it if it is not cached."""
+        with self._lock:
+            frames = self._cache.get(name)
+            if frames is not None:
+                self._cache.move_to_end(name)
+                return frames
+        # Decode outside the lock so the main thread is never stuck behind a background load
+        frames = self._load(name)
+        with self._lock:
+            if name not in self._cache:
+                self._cache[name] = frames
+                self._sizes[name] = sum(frame.get_width() * frame.get_height() * 4 for frame in frames)
+                self.cached_bytes += self._sizes[name]
+                self._evict(keep=name)
+            return self._cache[name]
+
+    def get_image(self, name: str) -> pygame.Surface:
+        """The first (or only) frame of an asset."""
+        return self.get(name)[0]
+
+    def get_animation(self, name: str, frame_time: float, loop: bool = True) -> Animation:
+        """
+        An asset as a clip showing each frame for frame_time ms. The clip is built once and
+        shared for as long as its frames stay cached.
+        """
+        frames = self.get(name)
+        key = (name, frame_time, loop)
+        clip = self._animations.get(key)
+        if clip is None or clip.frames is not frames:
+            clip = self._animations[key] = Animation.uniform(len(frames), frame_time, frames, loop)
+        return clip
+
+    def get_masks(self, name: str) -> List[pygame.Mask]:
+        """
+        Collision masks for every frame of an asset, built once from the atlas pixels.
+        Works without a display, so headless simulations can use them too.
+        """
+        with self._lock:
+            masks = self._masks.get(name)
+        if masks is None:
+            index, width, pixels = self._open_atlas()
+            masks = [pygame.mask.from_surface(atlas_frame(pixels, width, rect)) for rect in index[name]]
+            with self._lock:
+                masks = self._masks.setdefault(name, masks)
+        return masks
+
+    def preload(self, names: Iterable[str]) -> None:
+        """Load assets ahead of when they are drawn. Safe to call from a background thread."""
+        for name in names:
+            self.get(name)
+
+    def _open_atlas(self) -> tuple:
+        if self._atlas is None:
+            with self._lock:
+                if self._atlas is None:
+                    self._atlas = open_atlas(self.atlas_path)
+        return self._atlas
+
+    def _load(self, name: str) -> List[pygame.Surface]:
+        index, width, pixels = self._open_atlas()
+        convert = pygame.Surface.convert if name in OPAQUE_ASSETS else pygame.Surface.convert_alpha
+        return atlas_asset(pixels, width, index[name], convert)
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Drop least recently used assets until the cache fits the budget. Call with the lock held."""
+        for name in list(self._cache):
+            if self.cached_bytes <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            del self._cache[name]
+            self.cached_bytes -= self._sizes.pop(name)
@@ -0,0 +1,225 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import pygame
+from typing import Callable, Dict, List, Optional, Tuple, Union
+# Utility imports
+from image_utils import scale_to_height, scale_frames
+from animation_utils import load_animation, load_multi_img_animation
+from car_utils import NUM_CAR_SPRITES, CAR_HEIGHT
+from ammo_utils import AMMO_ICON_HEIGHT, AMMO_PICKUP_HEIGHT
+from simulation import (
+    SCREEN_WIDTH,
+    SCREEN_HEIGHT,
+    PLAYER_SCALE,
+    EXPLOSION_SCALE,
+    ANIM_FRAME_COUNTS,
+    EXPLOSION_FRAME_COUNT,
+)
+
+# Texture atlas - every scaled sprite the game draws, baked into one file of raw RGBA pixels
+# so startup is a single read instead of decoding and scaling ~100 images
+
+
+ATLAS_CACHE_PATH = ".cache/atlas.bin"
+ATLAS_MAGIC = b"DINOATLS"
+ATLAS_VERSION = 2
+ATLAS_MAX_WIDTH = 2048
+# magic, version, cache key, atlas width, atlas height, index length
+ATLAS_HEADER_FORMAT = "<8sH32sIII"
+
+# How to build each named asset: (kind, source path, frame count, transform, transform value, flip)
+# kind is "image" (one file), "sheet" (sprite sheet) or "sequence" (numbered files)
+# transform is "size" (exact size), "height" (keep aspect ratio) or "scale" (factor)
+ASSET_RECIPES = {
+    "sky": ("image", "assets/level/sky.png", 1, "size", (SCREEN_WIDTH, SCREEN_HEIGHT), False),
+    "ground": ("image", "assets/level/road.png", 1, "size", (SCREEN_WIDTH, SCREEN_HEIGHT), False),
+    "buildings_back": ("image", "assets/level/buildings_back.png", 1, "size", (SCREEN_WIDTH, SCREEN_HEIGHT), False),
+    "back": ("image", "assets/level/back.png", 1, "size", (SCREEN_WIDTH, SCREEN_HEIGHT), False),
+    "cars": ("sequence", "assets/obstacle/vehicles/", NUM_CAR_SPRITES, "height", CAR_HEIGHT, True),
+    "run": ("sheet", "assets/player/Run.png", ANIM_FRAME_COUNTS["run"], "scale", PLAYER_SCALE, False),
+    "jump": ("sheet", "assets/player/Jump.png", ANIM_FRAME_COUNTS["jump"], "scale", PLAYER_SCALE, False),
+    "walk": ("sheet", "assets/player/Walk.png", 10, "scale", PLAYER_SCALE, False),
+    "shoot": ("sheet", "assets/player/Shoot.png", ANIM_FRAME_COUNTS["shoot"], "scale", PLAYER_SCALE, False),
+    "reload": ("sheet", "assets/player/Reload.png", ANIM_FRAME_COUNTS["reload"], "scale", PLAYER_SCALE, False),
+    "death": ("sheet", "assets/player/Dead.png", ANIM_FRAME_COUNTS["death"], "scale", PLAYER_SCALE, False),
+    "explosion": ("sequence", "assets/effects/Explosion/", EXPLOSION_FRAME_COUNT, "scale", EXPLOSION_SCALE, False),
+    "ammo_icon": ("image", "assets/powerups/ammo.png", 1, "height", AMMO_ICON_HEIGHT, False),
+    "ammo_pickup": ("image", "assets/powerups/ammo.png", 1, "height", AMMO_PICKUP_HEIGHT, False),
+}
+OPAQUE_ASSETS = {"sky"}  # Converted without per-pixel alpha, like the old convert() call
+
+
+def recipe_sources(recipe: tuple) -> List[str]:
+    """The files an asset is built from."""
+    kind, path, count = recipe[:3]
+    if kind == "sequence":
+        return [path + str(i) + ".png" for i in range(1, count + 1)]
+    return [path]
+
+
+def atlas_key() -> bytes:
+    """
+    Hash of the recipes and the size and modification time of every source file,
+    so the atlas is rebuilt whenever an image or a scale constant changes.
+    """
+    digest = hashlib.sha256(f"{ATLAS_VERSION}:{json.dumps(ASSET_RECIPES, sort_keys=True)}".encode())
+    for recipe in ASSET_RECIPES.values():
+        for source in recipe_sources(recipe):
+            stat = os.stat(source)
+            digest.update(f"{source}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.digest()
+
+
+def build_asset(recipe: tuple) -> List[pygame.Surface]:
+    """Load and scale one asset from its source images. Works without a display."""
+    kind, path, count, transform, value, flip = recipe
+    if kind == "sheet":
+        frames = load_animation(path, count, convert=False)
+    elif kind == "sequence":
+        frames = load_multi_img_animation(path, count, convert=False)
+    else:
+        frames = [pygame.image.load(path)]
+
+    if transform == "size":
+        frames = [pygame.transform.scale(frame, value) for frame in frames]
+    elif transform == "height":
+        frames = [scale_to_height(frame, value) for frame in frames]
+    else:
+        frames = scale_frames(frames, value)
+
+    if flip:
+        frames = [pygame.transform.flip(frame, True, False) for frame in frames]
+    return frames
+
+
+def pack_frames(sizes: List[Tuple[int, int]], max_width: int = ATLAS_MAX_WIDTH) -> Tuple[List[Tuple[int, int]], int, int]:
+    """
+    Shelf-pack rectangles, tallest first. Returns the position of each rectangle and the atlas size.
+    """
+    order = sorted(range(len(sizes)), key=lambda i: sizes[i][1], reverse=True)
+    positions = [(0, 0)] * len(sizes)
+    x = y = shelf_height = atlas_width = 0
+    for i in order:
+        w, h = sizes[i]
+        if x + w > max_width:
+            # Start a new shelf
+            y += shelf_height
+            x = shelf_height = 0
+        positions[i] = (x, y)
+        x += w
+        shelf_height = max(shelf_height, h)
+        atlas_width = max(atlas_width, x)
+    return positions, atlas_width, y + shelf_height
+
+
+def bake_atlas() -> bytes:
+    """
+    Bake every asset into the contents of an atlas file. The frames of an asset are packed into
+    one block, so loading an asset converts a single surface and its frames stay together in memory.
+    """
+    assets = {name: build_asset(recipe) for name, recipe in ASSET_RECIPES.items()}
+    layouts = {name: pack_frames([frame.get_size() for frame in frames]) for name, frames in assets.items()}
+    block_positions, width, height = pack_frames([(w, h) for _, w, h in layouts.values()])
+
+    pixels = bytearray(width * height * 4)
+    index: Dict[str, List[List[int]]] = {name: [] for name in ASSET_RECIPES}
+    for (name, frames), (block_x, block_y) in zip(assets.items(), block_positions):
+        for frame, (frame_x, frame_y) in zip(frames, layouts[name][0]):
+            _copy_frame(pixels, width, frame, block_x + frame_x, block_y + frame_y)
+            index[name].append([block_x + frame_x, block_y + frame_y, *frame.get_size()])
+
+    index_data = json.dumps(index).encode()
+    header = struct.pack(ATLAS_HEADER_FORMAT, ATLAS_MAGIC, ATLAS_VERSION, atlas_key(), width, height, len(index_data))
+    return header + index_data + pixels
+
+
+def build_atlas(path: str = ATLAS_CACHE_PATH) -> None:
+    """Bake the atlas and save it to path."""
+    _save_atlas(path, bake_atlas())
+
+
+def _save_atlas(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)  # Never leave a half-written atlas behind
+
+
+def _copy_frame(pixels: bytearray, width: int, frame: pygame.Surface, x: int, y: int) -> None:
+    w, h = frame.get_size()
+    # Copy rows of raw RGBA so the alpha channel is stored exactly (a blit would blend it)
+    data = pygame.image.tobytes(frame, "RGBA")
+    for row in range(h):
+        start = ((y + row) * width + x) * 4
+        pixels[start:start + w * 4] = data[row * w * 4:(row + 1) * w * 4]
+
+
+def _map_atlas(path: str, key: bytes) -> Optional[mmap.mmap]:
+    """Memory-map the atlas file if it exists and matches the current key."""
+    header_size = struct.calcsize(ATLAS_HEADER_FORMAT)
+    if not os.path.exists(path) or os.path.getsize(path) < header_size:
+        return None
+    with open(path, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if struct.unpack_from(ATLAS_HEADER_FORMAT, data)[:3] != (ATLAS_MAGIC, ATLAS_VERSION, key):
+        data.close()
+        return None
+    return data
+
+
+def open_atlas(path: str = ATLAS_CACHE_PATH) -> Tuple[Dict[str, List[List[int]]], int, memoryview]:
+    """
+    Map the atlas file into memory, rebuilding it first if it is missing or stale (in memory only
+    if it cannot be saved). Returns the frame index, the atlas width and the raw RGBA pixels.
+    """
+    data: Union[mmap.mmap, bytes, None] = _map_atlas(path, atlas_key())
+    if data is None:
+        data = bake_atlas()
+        try:
+            _save_atlas(path, data)
+        except OSError as e:
+            # A read-only or full disk only means the next launch bakes it again
+            print(f"Warning: Could not save the sprite atlas to {path}: {e}")
+
+    header_size = struct.calcsize(ATLAS_HEADER_FORMAT)
+    _, _, _, width, height, index_length = struct.unpack_from(ATLAS_HEADER_FORMAT, data)
+    index = json.loads(data[header_size:header_size + index_length])
+    pixels = memoryview(data)[header_size + index_length:header_size + index_length + width * height * 4]
+    return index, width, pixels
+
+
+def atlas_frame(pixels: memoryview, atlas_width: int, rect: List[int]) -> pygame.Surface:
+    """
+    A view of one frame of the atlas, without copying. Convert it to get a standalone surface.
+    """
+    x, y, w, h = rect
+    pitch = atlas_width * 4
+    rows = pygame.image.frombuffer(pixels[y * pitch:(y + h) * pitch], (atlas_width, h), "RGBA")
+    return rows.subsurface((x, 0, w, h))
+
+
+def atlas_asset(
+    pixels: memoryview,
+    atlas_width: int,
+    rects: List[List[int]],
+    convert: Callable[[pygame.Surface], pygame.Surface]
+) -> List[pygame.Surface]:
+    """
+    All frames of one asset, converted together: the asset's block of the atlas becomes one
+    surface and the frames are subsurfaces of it.
+    """
+    block = pygame.Rect(rects[0]).unionall(rects[1:])
+    surface = convert(atlas_frame(pixels, atlas_width, block))
+    if len(rects) == 1:
+        return [surface]
+    return [surface.subsurface((x - block.x, y - block.y, w, h)) for x, y, w, h in rects]
+
+
+if __name__ == "__main__":
+    # Build step - bake the atlas ahead of time so the first launch is fast too
+    build_atlas()
+    print(f"Wrote {ATLAS_CACHE_PATH} ({os.path.getsize(ATLAS_CACHE_PATH) / 1e6:.1f} MB)")
@@ -0,0 +1,281 @@
+import math
+import numpy as np
+import pygame
+from typing import Dict, List, Optional, Tuple
+# Utility imports
+from ammo_utils import AMMO_MAX
+from car_utils import CAR_HEIGHT
+from simulation import (
+    GameSimulation,
+    GROUND_Y_DEFAULT,
+    JUMP_GRAVITY_START_SPEED,
+    HITBOX_WIDTH,
+    HITBOX_HEIGHT,
+    PLAYER_ANIMATIONS,
+    ACTION_NONE,
+    ACTION_JUMP,
+    ACTION_SHOOT,
+)
+
+# Scripted player that looks ahead along the jump arc.
+# A jump follows the same path whatever the cars do (until it lands), so for each path and
+# scroll speed the outcome against a lone car only depends on the car's size and how far ahead
+# it is. Those outcomes are tabulated once, and a decision is a few table lookups per car.
+
+
+LAND_TOLERANCE = 5  # is_on_car's tolerance between the hitbox bottom and a car's top
+SAFETY_MARGIN = 3  # Pixels added around each car
+PLAN_DEPTH = 3  # How many landings ahead a plan is followed, to check it does not lead into a trap
+# The car in front explodes this many steps after pressing shoot, counting the step it is pressed on
+SHOOT_DELAY = PLAYER_ANIMATIONS["shoot"].frame_start(len(PLAYER_ANIMATIONS["shoot"]) - 3) + 1
+SHOOT_STEPS = PLAYER_ANIMATIONS["shoot"].duration  # Jumping is frozen until the shot animation ends
+
+# Outcome codes: step * 2 (the 1-based step of the plan it happens on), plus 1 for landing on a car
+# or 0 for crashing into it. Tables hold them in bytes, with NO_EVENT for a car that is never in the way
+NO_EVENT = 255
+SAFE = 1 << 30  # Rank of a plan that never crashes, above every crash step
+
+# A path step: hitbox bottom at the start of the step, vertical speed when cars are landed on,
+# and whether the player is in the air (standing after touching down can't count as landing)
+PathStep = Tuple[int, int, bool]
+# How the world scrolls over the next steps: (scroll step, steps before it goes up by one, or None)
+SpeedProfile = Tuple[int, Optional[int]]
+
+
+def player_path(bottom: int, jump: bool, tail: int = 0) -> List[PathStep]:
+    """
+    The player's path from standing at bottom: a jump (or, without jump, a fall off a roof) until
+    back on the ground, then tail steps standing. Follows GameSimulation.step() with no cars
+    around, so it stops being valid from the first step that lands on one.
+    """
+    path = []
+    speed = JUMP_GRAVITY_START_SPEED if jump else 0
+    while True:
+        path.append((bottom, speed, True))
+        # Falling logic and gravity, in step() order
+        if bottom > GROUND_Y_DEFAULT:
+            break  # Snapped back to the ground this step
+        speed += 1
+        bottom += speed
+    return path + [(GROUND_Y_DEFAULT, 0, False)] * tail
+
+
+def scroll_shift(speed: SpeedProfile, steps: int) -> int:
+    """How far the world scrolls in the next steps."""
+    scroll_step, flip = speed
+    return steps * scroll_step + (max(0, steps - flip) if flip is not None else 0)
+
+
+def speed_after(speed: SpeedProfile, steps: int) -> SpeedProfile:
+    """The speed profile as seen steps later."""
+    scroll_step, flip = speed
+    if flip is None:
+        return speed
+    return (scroll_step, flip - steps) if steps < flip else (scroll_step + 1, None)
+
+
+def outcome_table(path: List[PathStep], speed: SpeedProfile, width: int, top: int, bottom: int) -> Tuple[int, bytes]:
+    """
+    The first outcome code along path for a car of the given size and vertical span, for every
+    distance a = car.left - hitbox.left when the path starts. Returns the a of the first entry and
+    the entries.
+    """
+    shifts = [scroll_shift(speed, j) for j in range(len(path) + 1)]
+    # The car overlaps the hitbox on step j when shifts[j] - width < a < shifts[j] + HITBOX_WIDTH
+    lo = shifts[1] - width + 1 - SAFETY_MARGIN
+    hi = shifts[-1] + HITBOX_WIDTH + SAFETY_MARGIN
+    events = np.full(hi - lo, NO_EVENT, dtype=np.uint8)
+    # Latest steps first, so each a ends up with its earliest outcome
+    for j in range(len(path), 0, -1):
+        player_bottom, vertical_speed, airborne = path[j - 1]
+        first = shifts[j] - width + 1 - lo
+        last = shifts[j] + HITBOX_WIDTH - 1 - lo
+        if airborne and abs(player_bottom - top) <= LAND_TOLERANCE and vertical_speed >= 0:
+            # Near the edges it might miss the roof and hit the side instead
+            events[max(first - SAFETY_MARGIN, 0):last + 1 + SAFETY_MARGIN] = j * 2
+            events[first + SAFETY_MARGIN:last + 1 - SAFETY_MARGIN] = j * 2 + 1
+        elif top < player_bottom and bottom > player_bottom - HITBOX_HEIGHT:
+            events[max(first - SAFETY_MARGIN, 0):last + 1 + SAFETY_MARGIN] = j * 2
+    return lo, events.tobytes()
+
+
+# Steps a jump from the ground takes to get above a car's roof
+RISE_STEPS = next(j for j, (bottom, _, _) in enumerate(player_path(GROUND_Y_DEFAULT, True)) if bottom <= GROUND_Y_DEFAULT - CAR_HEIGHT)
+# After touching down, a car reaching the player before they can jump and rise over it again is a crash
+TAIL_STEPS = RISE_STEPS + 1
+
+
+def is_safe(outcome: int) -> bool:
+    return outcome == NO_EVENT or outcome & 1 == 1
+
+
+def rank(outcome: int) -> int:
+    """Orders outcomes from worst to best: crashing sooner, crashing later, safe."""
+    return SAFE if is_safe(outcome) else outcome
+
+
+class Autopilot:
+    """
+    Plays a GameSimulation: call act(sim) before each step and pass what it returns to step().
+    Jumps as late as still clears (or lands on) the cars ahead, drops off roofs when that is safe,
+    and shoots the car in front when no jump works or the ammo is full anyway.
+    Outcome tables are built on first use for each speed and car size, and shared by every game
+    this autopilot plays.
+    """
+
+    def __init__(self) -> None:
+        self._paths: Dict[tuple, List[PathStep]] = {}
+        self._tables: Dict[tuple, Tuple[int, bytes]] = {}
+
+    def act(self, sim: GameSimulation) -> int:
+        """The actions to press on the next step."""
+        if sim.is_dying or sim.is_shooting:
+            return ACTION_NONE  # A jump pressed while shooting would hang in the air until the shot ends
+        base = sim.player_rect.bottom
+        if sim.is_jumping or base < sim.ground_y:
+            return ACTION_NONE  # In the air, the jump was planned when it started
+
+        speed = self._speed_profile(sim)
+        hitbox_left = sim.get_hitbox_rect().left
+        # Cars not yet passed, as (distance ahead of the hitbox, car)
+        cars = [(car.left - hitbox_left, car) for car in sim.cars if car.right > hitbox_left]
+        jump_now = self._outcome(("jump", base), speed, cars)
+        wait = self._wait(base, speed, cars)
+
+        if is_safe(wait):
+            # Nothing forces a jump yet - use up ammo that pickups can no longer add to
+            if sim.player_ammo >= AMMO_MAX and self._shot_clears(base, speed, cars):
+                return ACTION_SHOOT
+            return ACTION_NONE
+        if is_safe(jump_now):
+            return ACTION_JUMP
+        # Every plan crashes - blow up the car in front if it is far enough for the shot,
+        # otherwise put off the crash as long as possible
+        if sim.player_ammo > 0 and self._shot_clears(base, speed, cars, need_gap=False):
+            return ACTION_SHOOT
+        return ACTION_JUMP if rank(jump_now) > rank(wait) else ACTION_NONE
+
+    @staticmethod
+    def _speed_profile(sim: GameSimulation) -> SpeedProfile:
+        """The scroll step of the next step, and how many steps until the speed-up raises it."""
+        scroll_step = round(sim.scroll_speed)
+        if sim.speed_increment <= 0 or scroll_step + 0.5 > sim.max_speed:
+            return scroll_step, None
+        return scroll_step, math.ceil((scroll_step + 0.5 - sim.scroll_speed) / sim.speed_increment)
+
+    def _wait(self, base: int, speed: SpeedProfile, cars: List[Tuple[int, pygame.Rect]], depth: int = PLAN_DEPTH) -> int:
+        """
+        The best outcome of not jumping on the next step: jumping after standing a few more steps,
+        or on a roof, dropping off its back.
+        """
+        jump = ("jump", base)
+        horizon = len(self._path(jump))
+        stand_steps = 0
+        if base < GROUND_Y_DEFAULT:
+            # Standing is safe while the roof is under the hitbox
+            a, roof = cars[0] if cars else (0, None)
+            if roof is not None and a < HITBOX_WIDTH and roof.top == base:
+                while stand_steps < horizon and a + roof.width > scroll_shift(speed, stand_steps + 1):
+                    stand_steps += 1
+            best = self._outcome(("fall", base), speed, cars, stand_steps, depth)
+        else:
+            # Standing is safe until the first car reaches the hitbox
+            reach = HITBOX_WIDTH + SAFETY_MARGIN
+            while stand_steps <= horizon and (not cars or cars[0][0] - scroll_shift(speed, stand_steps + 1) >= reach):
+                stand_steps += 1
+            if stand_steps > horizon:
+                return NO_EVENT  # Nothing near yet
+            best = 0
+        for delay in range(1, stand_steps + 1):
+            if is_safe(best):
+                break
+            best = max(best, self._outcome(jump, speed, cars, delay, depth), key=rank)
+        return best
+
+    def _outcome(
+        self,
+        path_key: tuple,
+        speed: SpeedProfile,
+        cars: List[Tuple[int, pygame.Rect]],
+        delay: int = 0,
+        depth: int = PLAN_DEPTH
+    ) -> int:
+        """
+        The first outcome along a path that starts after delay steps, over all cars. Landing on a roof
+        or back on the ground only counts as safe if there is a safe way on from there, looking
+        depth landings ahead.
+        """
+        shift = scroll_shift(speed, delay)
+        path_speed = speed_after(speed, delay)
+        first, landed_on = NO_EVENT, None
+        for a, car in cars:
+            lo, events = self._table(path_key, path_speed, car)
+            i = a - shift - lo
+            if 0 <= i < len(events) and events[i] < first:
+                first, landed_on = events[i], car
+        if first == NO_EVENT:
+            if depth == 0:
+                return first
+            # Back on the ground - plan again from there
+            steps = delay + len(self._path(path_key)) - TAIL_STEPS
+            then = self._continue(GROUND_Y_DEFAULT, speed, cars, steps, depth - 1)
+            return first if is_safe(then) else then + steps * 2
+        first += delay * 2
+        if first & 1 and depth > 0:
+            # Landed on a roof - plan again from there
+            steps = first >> 1
+            then = self._continue(landed_on.top, speed, cars, steps, depth - 1)
+            if not is_safe(then):
+                return then + steps * 2
+        return first
+
+    def _continue(self, base: int, speed: SpeedProfile, cars: List[Tuple[int, pygame.Rect]], steps: int, depth: int) -> int:
+        """The best outcome from standing at base after steps more steps, jumping right away or waiting."""
+        shift = scroll_shift(speed, steps)
+        later = [(a - shift, car) for a, car in cars if a - shift + car.width > 0]
+        later_speed = speed_after(speed, steps)
+        jump_now = self._outcome(("jump", base), later_speed, later, 0, depth)
+        if is_safe(jump_now):
+            return jump_now
+        return max(jump_now, self._wait(base, later_speed, later, depth), key=rank)
+
+    def _table(self, path_key: tuple, speed: SpeedProfile, car: pygame.Rect) -> Tuple[int, bytes]:
+        path = self._path(path_key)
+        if speed[1] is not None and speed[1] >= len(path):
+            speed = (speed[0], None)  # Only speeds up after the path is over
+        key = (path_key, speed, car.width, car.top, car.bottom)
+        table = self._tables.get(key)
+        if table is None:
+            table = self._tables[key] = outcome_table(path, speed, car.width, car.top, car.bottom)
+        return table
+
+    def _path(self, path_key: tuple) -> List[PathStep]:
+        path = self._paths.get(path_key)
+        if path is None:
+            kind, bottom = path_key
+            path = self._paths[path_key] = player_path(bottom, kind == "jump", TAIL_STEPS)
+        return path
+
+    def _shot_clears(self, base: int, speed: SpeedProfile, cars: List[Tuple[int, pygame.Rect]], need_gap: bool = True) -> bool:
+        """
+        Whether shooting now blows up the car in front before it reaches the player. With need_gap,
+        the car after it must also be far enough to jump once the shot animation is over.
+        """
+        if base != GROUND_Y_DEFAULT:
+            return False  # Shooting only works on the ground
+        # explode_car takes the first car whose left edge is past the hitbox when the shot goes off
+        ahead = [a for a, _ in cars if a > HITBOX_WIDTH]
+        if not ahead or ahead[0] - scroll_shift(speed, SHOOT_DELAY) <= HITBOX_WIDTH + SAFETY_MARGIN:
+            return False
+        return not need_gap or len(ahead) < 2 or ahead[1] - scroll_shift(speed, SHOOT_STEPS + RISE_STEPS) > HITBOX_WIDTH
+
+
+_autopilot: Optional[Autopilot] = None
+
+
+def autopilot_policy(sim: GameSimulation) -> int:
+    """Autopilot as a rollout policy (a module-level function, so it can be sent to worker processes)."""
+    global _autopilot
+    if _autopilot is None:
+        _autopilot = Autopilot()
+    return _autopilot.act(sim)
@@ -0,0 +1,301 @@
+import numpy as np
+import pygame
+from typing import List, Optional
+# Utility imports
+from car_utils import load_car_surfs
+from ammo_utils import (
+    AMMO_MAX,
+    AMMO_PICKUP_WIDTH,
+    AMMO_PICKUP_MIN_SPACING,
+    AMMO_PICKUP_MAX_SPACING,
+)
+from simulation import (
+    SCREEN_WIDTH,
+    GROUND_Y_DEFAULT,
+    PLAYER_X,
+    PLAYER_SCALE,
+    PLAYER_FRAME_SIZE,
+    JUMP_GRAVITY_START_SPEED,
+    SCROLL_SPEED_START,
+    SPEED_INCREMENT,
+    MAX_SPEED,
+    ANIM_FRAME_COUNTS,
+    HITBOX_OFFSET_X,
+    HITBOX_OFFSET_Y,
+    HITBOX_WIDTH,
+    HITBOX_HEIGHT,
+    CAR_HITBOX_RIGHT_TRIM,
+    CAR_MIN_SPACING,
+    CAR_MAX_SPACING,
+    ACTION_JUMP,
+    ACTION_SHOOT,
+)
+
+# Many independent games advanced in lockstep with NumPy.
+# Same rules as GameSimulation, but every per-game value is an array of shape (N,) or (N, slots)
+# and every rule is a masked vector operation. Drawing-only state (animations, explosion sprite)
+# is left out, and a game stops as soon as the player is hit instead of playing the death animation.
+
+
+NUM_CARS = 5  # Cars alive per game, same as init_cars
+NUM_PICKUPS = 2  # manage_ammo_pickups keeps two pickups queued
+# Steps from pressing shoot to the explosion - one shoot animation frame per 60 FPS step,
+# and the car explodes on the third-to-last frame
+SHOOT_DELAY_FRAMES = ANIM_FRAME_COUNTS["shoot"] - 3
+PICKUP_CAR_CLEARANCE = 150  # manage_ammo_pickups moves a pickup this close to a car past it
+PICKUP_CAR_GAP = 100
+
+
+class BatchSimulation:
+    """
+    N games of Gangster Dino stepped together.
+    step() takes an int array of ACTION_* flags per game and returns a bool array of the games that
+    ended on that step. Finished games are frozen until reset() is called for them.
+    """
+
+    def __init__(
+        self,
+        num_games: int,
+        seed: Optional[int] = None,
+        car_surfs: Optional[List[pygame.Surface]] = None,
+        scroll_speed_start: float = SCROLL_SPEED_START,
+        speed_increment: float = SPEED_INCREMENT,
+        max_speed: float = MAX_SPEED
+    ) -> None:
+        if car_surfs is None:
+            car_surfs = load_car_surfs(convert=False)
+        self.num_games = num_games
+        self.rng = np.random.default_rng(seed)
+        self.scroll_speed_start = scroll_speed_start
+        self.speed_increment = speed_increment
+        self.max_speed = max_speed
+
+        # Sprite sizes per car type, looked up by index when a car spawns
+        self.car_widths = np.array([surf.get_width() for surf in car_surfs], dtype=np.int64)
+        self.car_heights = np.array([surf.get_height() for surf in car_surfs], dtype=np.int64)
+
+        # The player's rect never moves sideways, so its hitbox x-span is fixed
+        player_size = int(PLAYER_FRAME_SIZE * PLAYER_SCALE)
+        self.player_height = player_size
+        self.hitbox_left = PLAYER_X - player_size // 2 + HITBOX_OFFSET_X
+        self.hitbox_right = self.hitbox_left + HITBOX_WIDTH
+
+        n = num_games
+        self.frame = np.zeros(n, dtype=np.int64)
+        self.done = np.zeros(n, dtype=bool)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.distance_accumulator = np.zeros(n, dtype=np.int64)
+        self.scroll_speed = np.zeros(n, dtype=np.float64)
+        self.scroll_offset = np.zeros(n, dtype=np.int64)
+
+        # Player state - y is the bottom of the player rect
+        self.player_y = np.zeros(n, dtype=np.int64)
+        self.players_gravity_speed = np.zeros(n, dtype=np.int64)
+        self.ground_y = np.zeros(n, dtype=np.int64)
+        self.is_jumping = np.zeros(n, dtype=bool)
+        self.shoot_timer = np.zeros(n, dtype=np.int64)  # > 0 while the shoot animation plays
+        self.just_fired = np.zeros(n, dtype=bool)
+        self.player_ammo = np.zeros(n, dtype=np.int64)
+        self.ammo_used = np.zeros(n, dtype=np.int64)
+
+        # Car hitboxes - left x, trimmed width and height - one slot per live car
+        self.car_x = np.zeros((n, NUM_CARS), dtype=np.int64)
+        self.car_w = np.zeros((n, NUM_CARS), dtype=np.int64)
+        self.car_h = np.zeros((n, NUM_CARS), dtype=np.int64)
+
+        # Ammo pickups - left x and whether the slot holds a pickup
+        self.pickup_x = np.zeros((n, NUM_PICKUPS), dtype=np.int64)
+        self.pickup_alive = np.zeros((n, NUM_PICKUPS), dtype=bool)
+
+        self.reset()
+
+    def reset(self, mask: Optional[np.ndarray] = None) -> None:
+        """Start new games in the slots selected by mask (all games by default)."""
+        if mask is None:
+            mask = np.ones(self.num_games, dtype=bool)
+        for arr in (self.frame, self.score, self.distance_accumulator, self.scroll_offset,
+                    self.players_gravity_speed, self.shoot_timer, self.player_ammo, self.ammo_used):
+            arr[mask] = 0
+        self.done[mask] = False
+        self.is_jumping[mask] = False
+        self.just_fired[mask] = False
+        self.scroll_speed[mask] = self.scroll_speed_start
+        self.player_y[mask] = GROUND_Y_DEFAULT
+        self.ground_y[mask] = GROUND_Y_DEFAULT
+        self.pickup_alive[mask] = False
+
+        # Same layout as init_cars: first car at the screen edge, untrimmed hitboxes
+        count = int(mask.sum())
+        last_x = np.full(count, SCREEN_WIDTH, dtype=np.int64)
+        for k in range(NUM_CARS):
+            kinds = self.rng.integers(0, len(self.car_widths), count)
+            self.car_x[mask, k] = last_x
+            self.car_w[mask, k] = self.car_widths[kinds]
+            self.car_h[mask, k] = self.car_heights[kinds]
+            last_x = last_x + self.car_widths[kinds] + self.rng.integers(CAR_MIN_SPACING, CAR_MAX_SPACING + 1, count)
+
+    def step(self, actions: np.ndarray) -> np.ndarray:
+        """
+        Advance every running game by one frame. Returns a mask of the games that ended this frame.
+        """
+        alive = ~self.done
+        actions = np.asarray(actions)
+
+        # Handle controls (jumping, shooting)
+        jump = alive & ((actions & ACTION_JUMP) != 0) & (self.player_y >= self.ground_y) & ~self.is_jumping
+        self.players_gravity_speed[jump] = JUMP_GRAVITY_START_SPEED
+        self.is_jumping |= jump
+        shoot = (alive & ((actions & ACTION_SHOOT) != 0) & (self.player_y >= GROUND_Y_DEFAULT)
+                 & (self.shoot_timer == 0) & (self.player_ammo > 0))
+        # A jump restarts the shoot animation, and shooting again right after a shot skips its first frame
+        # because the animation timer carries over
+        restart = shoot | (jump & (self.shoot_timer > 0))
+        self.shoot_timer[restart] = SHOOT_DELAY_FRAMES + 1  # Counted down from this step on
+        self.shoot_timer[shoot & self.just_fired & ~jump] = SHOOT_DELAY_FRAMES
+        self.player_ammo -= shoot
+        self.ammo_used += shoot
+
+        # Hitbox from the start of the frame, as in GameSimulation
+        hitbox_top = self.player_y - self.player_height + HITBOX_OFFSET_Y
+        hitbox_bottom = hitbox_top + HITBOX_HEIGHT
+
+        # Scrolling and score
+        scroll_step = np.where(alive, np.rint(self.scroll_speed).astype(np.int64), 0)
+        self.scroll_offset += scroll_step
+        self.distance_accumulator += scroll_step
+        scored = self.distance_accumulator >= 100
+        self.score += scored
+        self.distance_accumulator[scored] = 0
+
+        # Car logic - move, then respawn the ones that left the screen
+        self.car_x -= scroll_step[:, None]
+        retired = alive[:, None] & (self.car_x + self.car_w + CAR_HITBOX_RIGHT_TRIM <= 0)
+        for k in range(NUM_CARS):
+            if retired[:, k].any():
+                self._respawn_cars(retired[:, k], k)
+
+        self._update_pickups(alive, scroll_step, hitbox_top, hitbox_bottom)
+
+        # Player on car logic
+        car_top = GROUND_Y_DEFAULT - self.car_h
+        car_right = self.car_x + self.car_w
+        over_car = (self.hitbox_right > self.car_x) & (self.hitbox_left < car_right)
+        on_car = over_car & (np.abs(hitbox_bottom[:, None] - car_top) <= 5)
+        landing = on_car & (alive & (self.players_gravity_speed >= 0))[:, None]
+        landed = landing.any(axis=1)
+        # Player can only be on one car - the first one in x order, like the list scan
+        landed_car = np.argmin(np.where(landing, self.car_x, np.iinfo(np.int64).max), axis=1)
+        landed_top = np.take_along_axis(car_top, landed_car[:, None], axis=1)[:, 0]
+        self.player_y[landed] = landed_top[landed]
+        self.players_gravity_speed[landed] = 0
+        self.is_jumping[landed] = False
+        self.ground_y = np.where(landed, landed_top, GROUND_Y_DEFAULT)
+
+        # Player falling logic
+        below = self.player_y > self.ground_y
+        self.player_y[below] = self.ground_y[below]
+        self.is_jumping[below] = False
+        self.is_jumping |= alive & (self.player_y < self.ground_y)
+
+        # Shooting takes priority over the jump animation, and gravity is only applied while jumping
+        shooting = self.shoot_timer > 0
+        falling = alive & self.is_jumping & ~shooting
+        self.players_gravity_speed += falling
+        self.player_y += np.where(falling, self.players_gravity_speed, 0)
+        self.shoot_timer -= shooting
+        fired = shooting & (self.shoot_timer == 0)
+        self.just_fired = fired
+        if fired.any():
+            self._explode_cars(fired)
+
+        # Collision with the start-of-frame hitbox
+        car_right = self.car_x + self.car_w
+        car_top = GROUND_Y_DEFAULT - self.car_h
+        over_car = (self.hitbox_right > self.car_x) & (self.hitbox_left < car_right)
+        on_car = over_car & (np.abs(hitbox_bottom[:, None] - car_top) <= 5)
+        hit = (over_car & (hitbox_top[:, None] < GROUND_Y_DEFAULT) & (hitbox_bottom[:, None] > car_top)
+               & ~on_car)
+        died = alive & hit.any(axis=1)
+        self.done |= died
+        # Force player to fall to default ground level when dying
+        self.player_y[died] = GROUND_Y_DEFAULT
+
+        # Speed increment difficulty logic
+        speeding = alive & ~died & (self.scroll_speed < self.max_speed)
+        self.scroll_speed[speeding] += self.speed_increment
+
+        self.frame += alive
+        return died
+
+    def _respawn_cars(self, mask: np.ndarray, slot: int) -> None:
+        """Put a new random car in the given slot behind the last car, for the games in mask."""
+        count = int(mask.sum())
+        last_right = (self.car_x[mask] + self.car_w[mask]).max(axis=1)
+        self.car_x[mask, slot] = last_right + self.rng.integers(CAR_MIN_SPACING, CAR_MAX_SPACING + 1, count)
+        kinds = self.rng.integers(0, len(self.car_widths), count)
+        self.car_w[mask, slot] = self.car_widths[kinds] - CAR_HITBOX_RIGHT_TRIM
+        self.car_h[mask, slot] = self.car_heights[kinds]
+
+    def _explode_cars(self, mask: np.ndarray) -> None:
+        """Remove the first car ahead of the player in each game in mask and spawn a replacement."""
+        ahead = self.car_x > self.hitbox_right
+        target = np.argmin(np.where(ahead, self.car_x, np.iinfo(np.int64).max), axis=1)
+        mask = mask & ahead.any(axis=1)
+        for k in range(NUM_CARS):
+            slot_mask = mask & (target == k)
+            if slot_mask.any():
+                self._respawn_cars(slot_mask, k)
+
+    def _update_pickups(
+        self,
+        alive: np.ndarray,
+        scroll_step: np.ndarray,
+        hitbox_top: np.ndarray,
+        hitbox_bottom: np.ndarray
+    ) -> None:
+        """Vector version of manage_ammo_pickups plus the under-car cleanup."""
+        pickup_top = GROUND_Y_DEFAULT - AMMO_PICKUP_WIDTH  # Pickups are square and sit on the ground
+
+        # Move all pickups with the world and drop off-screen ones
+        self.pickup_x -= scroll_step[:, None]
+        self.pickup_alive &= self.pickup_x + AMMO_PICKUP_WIDTH > 0
+
+        # Check for player collision with pickups
+        touching = (
+            (self.hitbox_left < self.pickup_x + AMMO_PICKUP_WIDTH) & (self.hitbox_right > self.pickup_x)
+            & (hitbox_top < GROUND_Y_DEFAULT)[:, None] & (hitbox_bottom > pickup_top)[:, None]
+        )
+        for p in range(NUM_PICKUPS):
+            collected = alive & self.pickup_alive[:, p] & touching[:, p] & (self.player_ammo < AMMO_MAX)
+            self.player_ammo += collected
+            self.pickup_alive[:, p] &= ~collected
+
+        # Keep two pickups queued, placed clear of the cars (checked in x order, like the car list)
+        car_order = np.argsort(self.car_x, axis=1)
+        car_x = np.take_along_axis(self.car_x, car_order, axis=1)
+        car_w = np.take_along_axis(self.car_w, car_order, axis=1)
+        for p in range(NUM_PICKUPS):
+            spawning = alive & ~self.pickup_alive[:, p]
+            if not spawning.any():
+                continue
+            count = int(spawning.sum())
+            any_alive = self.pickup_alive[spawning].any(axis=1)
+            last_right = np.where(self.pickup_alive, self.pickup_x + AMMO_PICKUP_WIDTH, np.iinfo(np.int64).min)
+            last_right = np.where(any_alive, last_right[spawning].max(axis=1), SCREEN_WIDTH)
+            x = last_right + self.rng.integers(
+                AMMO_PICKUP_MIN_SPACING, AMMO_PICKUP_MAX_SPACING + 1, count
+            )
+            for k in range(NUM_CARS):
+                left = car_x[spawning, k]
+                width = car_w[spawning, k]
+                too_close = np.abs(x - (left + width // 2)) < PICKUP_CAR_CLEARANCE
+                x = np.where(too_close, left + width + PICKUP_CAR_GAP, x)
+            self.pickup_x[spawning, p] = x
+            self.pickup_alive[spawning, p] = True
+
+        # Safety check: remove any ammo that ended up under cars
+        under_car = (
+            (self.pickup_x[:, :, None] < (self.car_x + self.car_w)[:, None, :])
+            & (self.pickup_x[:, :, None] + AMMO_PICKUP_WIDTH > self.car_x[:, None, :])
+        ).any(axis=2)
+        self.pickup_alive &= ~(alive[:, None] & under_car)
@@ -0,0 +1,489 @@
+"""
+Benchmarks for the rendering and simulation hot paths.
+
+Runs headless with SDL's dummy video and audio drivers and fixed seeds, and prints the results as
+JSON so runs on different commits can be compared:
+
+    python benchmarks/run_benchmarks.py --output before.json
+    python benchmarks/run_benchmarks.py --compare before.json
+
+Each benchmark reports operations per second (frames, steps or calls, see "unit"), the median of
+several repeats.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import runpy
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Headless drivers must be set before pygame is initialized
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+os.chdir(REPO_ROOT)  # Asset paths are relative to the repo root
+
+import pygame
+# Utility imports
+from simulation import GameSimulation, SCREEN_WIDTH, SCREEN_HEIGHT, ACTION_NONE, ACTION_JUMP, ACTION_SHOOT, CAR_MIN_SPACING, CAR_MAX_SPACING
+from replay_utils import Replay, REPLAY_EXTENSION
+from autopilot import Autopilot
+
+
+SEED = 1234
+DEFAULT_REPEATS = 5
+GAME_LOOP_FRAMES = 600
+CAR_COUNTS = [5, 50, 500]
+EXPLOSION_COUNTS = [1, 10, 100]
+PARALLAX_SCALES = [1, 2]  # The background is also drawn at 2x, as on a scaled-up window
+
+# name -> (unit, function). Each function runs the benchmark once and returns how many units it did
+BENCHMARKS: Dict[str, Tuple[str, Callable[[], int]]] = {}
+
+
+def benchmark(name: str, unit: str) -> Callable:
+    def register(fn: Callable[[], int]) -> Callable[[], int]:
+        BENCHMARKS[name] = (unit, fn)
+        return fn
+    return register
+
+
+def scripted_actions(sim: GameSimulation, rng: random.Random) -> int:
+    """Jump over the next car and shoot now and then, so games last long enough to measure."""
+    actions = ACTION_NONE
+    if any(0 < car.left - sim.player_rect.right < 60 for car in sim.cars):
+        actions |= ACTION_JUMP
+    if rng.random() < 0.01:
+        actions |= ACTION_SHOOT
+    return actions
+
+
+# GAME LOOP
+
+def record_benchmark_replay(path: str, min_frames: int) -> None:
+    """Record a seeded scripted game that runs for at least min_frames steps."""
+    sim = GameSimulation()
+    seed = SEED
+    while True:
+        sim.reset(seed)
+        rng = random.Random(seed)
+        replay = Replay(seed)
+        while sim.is_playing and sim.frame < min_frames:
+            actions = scripted_actions(sim, rng)
+            replay.record(sim.frame, actions)
+            sim.step(actions)
+        if sim.frame >= min_frames:
+            replay.finish(sim)
+            replay.save(path)
+            return
+        seed += 1
+
+
+def game_loop_child(replay_path: str, frames: int) -> None:
+    """
+    Run main.py on a replay with an uncapped frame rate, quitting after the given number of frames,
+    and print the frame rate. Runs in its own process since main.py shuts pygame down when it exits.
+    """
+    get_events = pygame.event.get
+    count = 0
+
+    def counted_events(*args, **kwargs) -> List[pygame.event.Event]:
+        nonlocal count
+        count += 1
+        events = get_events(*args, **kwargs)
+        if count > frames:
+            events.append(pygame.event.Event(pygame.QUIT))
+        return events
+
+    pygame.event.get = counted_events
+    sys.argv = ["main.py", "--replay", replay_path, "--fps", "0"]
+    start_time = time.perf_counter()
+    runpy.run_path(os.path.join(REPO_ROOT, "main.py"), run_name="__main__")
+    print(json.dumps({"frames": frames, "seconds": time.perf_counter() - start_time}))
+
+
+class _TimedResult(int):
+    """A unit count that carries its own timing, for benchmarks timed in another process."""
+
+    def __new__(cls, frames: int, seconds: float) -> "_TimedResult":
+        result = super().__new__(cls, frames)
+        result.seconds = seconds
+        return result
+
+
+@benchmark("game_loop", "frames")
+def bench_game_loop() -> int:
+    # Game time runs at 60 steps per second whatever the frame rate, so a replay a few times
+    # longer than the run is plenty
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        replay_path = os.path.join(tmp_dir, "bench" + REPLAY_EXTENSION)
+        record_benchmark_replay(replay_path, 3000)
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--game-loop-child", replay_path, str(GAME_LOOP_FRAMES)],
+            capture_output=True, text=True,
+        )
+    if result.returncode != 0:
+        raise RuntimeError(f"main.py failed: {result.stderr.strip().splitlines()[-1]}")
+    # The child's last line is its result, pygame prints its banner first
+    return _TimedResult(**json.loads(result.stdout.strip().splitlines()[-1]))
+
+
+# RENDERING
+
+_screen: Optional[pygame.Surface] = None
+_assets = None
+
+
+def screen() -> pygame.Surface:
+    global _screen
+    if _screen is None:
+        pygame.init()
+        _screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    return _screen
+
+
+def assets():
+    global _assets
+    if _assets is None:
+        from asset_manager import AssetManager
+        screen()
+        _assets = AssetManager()
+    return _assets
+
+
+def parallax_layers(scale: int = 1) -> List[Tuple[pygame.Surface, float]]:
+    """The game's background layers, scaled up for the PARALLAX_SCALES benchmarks."""
+    from image_utils import scale_frames
+    layers = [
+        (assets().get_image("sky"), 0.0),
+        (assets().get_image("back"), 0.85),
+        (assets().get_image("buildings_back"), 0.94),
+        (assets().get_image("ground"), 0.98),
+    ]
+    return [(scale_frames([surface], scale)[0] if scale != 1 else surface, ratio) for surface, ratio in layers]
+
+
+def draw_parallax_benchmark(scale: int) -> int:
+    from image_utils import draw_parallax
+    frames = 300
+    layers = parallax_layers(scale)
+    target = screen() if scale == 1 else pygame.Surface((SCREEN_WIDTH * scale, SCREEN_HEIGHT * scale)).convert()
+    for i in range(frames):
+        for surface, ratio in layers:
+            draw_parallax(target, surface, i * 5 * scale, ratio)
+    return frames
+
+
+def parallax_renderer_benchmark(scale: int) -> int:
+    from image_utils import ParallaxRenderer
+    frames = 300
+    target = screen() if scale == 1 else pygame.Surface((SCREEN_WIDTH * scale, SCREEN_HEIGHT * scale)).convert()
+    renderer = ParallaxRenderer(parallax_layers(scale), target.get_size())
+    for i in range(frames):
+        renderer.draw(target, i * 5 * scale)
+    return frames
+
+
+benchmark("draw_parallax", "frames")(lambda: draw_parallax_benchmark(1))
+benchmark("parallax_renderer", "frames")(lambda: parallax_renderer_benchmark(1))
+for _scale in PARALLAX_SCALES[1:]:
+    _size = f"{SCREEN_WIDTH * _scale}x{SCREEN_HEIGHT * _scale}"
+    benchmark(f"draw_parallax_{_size}", "frames")(lambda scale=_scale: draw_parallax_benchmark(scale))
+    benchmark(f"parallax_renderer_{_size}", "frames")(lambda scale=_scale: parallax_renderer_benchmark(scale))
+
+
+@benchmark("pixel_observation", "frames")
+def bench_pixel_observation() -> int:
+    """Draw a game off-screen into shared memory and make a grayscale, 4x downscaled observation."""
+    from observation_utils import PixelObserver
+    from render_utils import GameRenderer
+    from text_utils import get_font
+    frames = 300
+    sim = GameSimulation(seed=SEED)
+    observer = PixelObserver(GameRenderer(assets(), get_font(24), screen().get_size()), grayscale=True, downscale=4)
+    try:
+        for _ in range(frames):
+            sim.step()
+            observer.observe(sim)
+    finally:
+        observer.close()
+    return frames
+
+
+@benchmark("video_recording", "frames")
+def bench_video_recording() -> int:
+    """Capture frames and write them as a compressed recording. Above 60 frames/s nothing is dropped."""
+    from video_utils import VideoRecorder, VIDEO_EXTENSION
+    frames = 120
+    parallax = parallax_layers()[0][0]
+    with tempfile.TemporaryDirectory() as tmp:
+        video = VideoRecorder(os.path.join(tmp, "bench" + VIDEO_EXTENSION), screen(), 60, "zlib", queue_frames=frames)
+        for i in range(frames):
+            screen().blit(parallax, (-i, 0))
+            video.capture(screen())
+        video.close()
+    return video.written
+
+
+def screen_benchmark(draw: Callable[[], None]) -> int:
+    frames = 300
+    for _ in range(frames):
+        draw()
+    return frames
+
+
+@benchmark("start_screen", "frames")
+def bench_start_screen() -> int:
+    from screens import start_screen
+    screen()
+    walk = assets().get_animation("walk", 100)
+    return screen_benchmark(lambda: start_screen(screen(), walk, []))
+
+
+@benchmark("settings_screen", "frames")
+def bench_settings_screen() -> int:
+    from screens import settings_screen
+    screen()
+    return screen_benchmark(lambda: settings_screen(screen(), []))
+
+
+@benchmark("end_screen", "frames")
+def bench_end_screen() -> int:
+    from screens import end_screen
+    from text_utils import get_font
+    screen()
+    walk = assets().get_animation("walk", 100)
+    font = get_font(24)
+    return screen_benchmark(lambda: end_screen(screen(), 42, [], walk, font, font))
+
+
+# SIMULATION
+
+@benchmark("simulation_step", "steps")
+def bench_simulation_step() -> int:
+    steps = 20000
+    sim = GameSimulation(seed=SEED)
+    rng = random.Random(SEED)
+    for _ in range(steps):
+        if not sim.is_playing:
+            sim.reset(rng.randrange(2 ** 32))
+        sim.step(scripted_actions(sim, rng))
+    return steps
+
+
+@benchmark("autopilot_decision", "calls")
+def bench_autopilot_decision() -> int:
+    """Let a fresh autopilot play seeded games, so building its outcome tables is included."""
+    calls = 5000
+    autopilot = Autopilot()
+    sim = GameSimulation(seed=SEED)
+    rng = random.Random(SEED)
+    for _ in range(calls):
+        if not sim.is_playing:
+            sim.reset(rng.randrange(2 ** 32))
+        sim.step(autopilot.act(sim))
+    return calls
+
+
+@benchmark("telemetry_frame", "frames")
+def bench_telemetry_frame() -> int:
+    """Telemetry's cost per frame, with a shot every half second. Must stay above 10000 frames/s."""
+    from telemetry_utils import Telemetry
+    frames = 20000
+    sim = GameSimulation(seed=SEED)
+    with tempfile.TemporaryDirectory() as tmp:
+        telemetry = Telemetry(os.path.join(tmp, "telemetry.jsonl"))
+        for i in range(frames):
+            telemetry.record_step(sim, ["shot"] if i % 30 == 0 else [])
+            telemetry.record_frame(16.7)
+        telemetry.close()
+    return frames
+
+
+def car_loop_benchmark(num_cars: int) -> int:
+    """Scroll, retire and respawn cars and run the landing and collision checks, as one step does."""
+    from car_utils import init_cars
+    steps = 2000
+    sim = GameSimulation(seed=SEED)
+    init_cars(CAR_MIN_SPACING, CAR_MAX_SPACING, sim.car_surfs, sim.cars, num_cars=num_cars, rng=sim.rng)
+    for _ in range(steps):
+        hitbox_rect = sim.get_hitbox_rect()
+        sim._update_cars(5)
+        sim._land_on_cars(hitbox_rect)
+        sim._check_collision(hitbox_rect, [])
+        sim.is_dying = False  # Keep the cars moving whatever the player hit
+    return steps
+
+
+for _num_cars in CAR_COUNTS:
+    benchmark(f"car_loop_{_num_cars}", "steps")(lambda num_cars=_num_cars: car_loop_benchmark(num_cars))
+
+
+@benchmark("manage_ammo_pickups", "calls")
+def bench_manage_ammo_pickups() -> int:
+    from ammo_utils import manage_ammo_pickups
+    calls = 20000
+    sim = GameSimulation(seed=SEED)
+    rng = random.Random(SEED)
+    hitbox_rect = sim.get_hitbox_rect()
+    ammo = 0
+    for _ in range(calls):
+        ammo = manage_ammo_pickups(sim.ammo_pickups, sim.cars, hitbox_rect, ammo, 5, rng) % 3
+    return calls
+
+
+@benchmark("animation_frame_index", "calls")
+def bench_animation_frame_index() -> int:
+    from animation_utils import Animation
+    calls = 100000
+    clip = Animation.uniform(10, 60)
+    for now in range(calls):
+        clip.frame_index(now * 16.7, 1.1)
+    return calls
+
+
+def explosions_benchmark(num_explosions: int) -> int:
+    """Scroll, retire, respawn and draw many overlapping explosions, as the game does for one."""
+    from simulation import EXPLOSION_ANIMATION
+    from entity_utils import EntityStore
+    frames = 300
+    rng = random.Random(SEED)
+    explosions = EntityStore([EXPLOSION_ANIMATION])
+    explosion_frames = [assets().get("explosion")]
+    for frame in range(frames):
+        while len(explosions) < num_explosions:
+            explosions.spawn(rng.randrange(SCREEN_WIDTH), 200, frame - rng.randrange(EXPLOSION_ANIMATION.duration))
+        explosions.move(-5)
+        explosions.expire(frame)
+        screen().blits(explosions.blit_sequence(explosion_frames, frame), doreturn=False)
+    return frames
+
+
+for _num_explosions in EXPLOSION_COUNTS:
+    benchmark(f"explosions_{_num_explosions}", "frames")(lambda num_explosions=_num_explosions: explosions_benchmark(num_explosions))
+
+
+# STARTUP
+
+@benchmark("build_assets", "loads")
+def bench_build_assets() -> int:
+    """Decode and scale every sprite from the source images, as the atlas build does."""
+    from atlas_utils import ASSET_RECIPES, build_asset
+    for recipe in ASSET_RECIPES.values():
+        build_asset(recipe)
+    return 1
+
+
+@benchmark("scale_frames", "calls")
+def bench_scale_frames() -> int:
+    from animation_utils import load_animation
+    from image_utils import scale_frames
+    from simulation import PLAYER_SCALE
+    sheet = load_animation("assets/player/Run.png", 10, convert=False)
+    calls = 20
+    for _ in range(calls):
+        scale_frames(sheet, PLAYER_SCALE)
+    return calls
+
+
+@benchmark("load_game_assets", "loads")
+def bench_load_game_assets() -> int:
+    """Load every game sprite from the (already built) atlas into a fresh asset manager."""
+    from asset_manager import AssetManager, GAME_ASSETS
+    from atlas_utils import open_atlas
+    screen()
+    open_atlas()  # Build the atlas outside the timing if it is stale
+    AssetManager().preload(GAME_ASSETS)
+    return 1
+
+
+# RUNNER
+
+def run_benchmark(fn: Callable[[], int], repeats: int) -> Dict[str, float]:
+    rates = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        count = fn()
+        elapsed = getattr(count, "seconds", time.perf_counter() - start_time)
+        rates.append(count / elapsed)
+    return {"ops_per_sec": statistics.median(rates), "min": min(rates), "max": max(rates)}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict[str, dict], baseline_path: str) -> None:
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    print(f"{'benchmark':<22}{'before':>14}{'after':>14}{'change':>9}", file=sys.stderr)
+    for name, result in results.items():
+        before = baseline.get(name, {}).get("ops_per_sec")
+        after = result.get("ops_per_sec")
+        if before and after:
+            print(f"{name:<22}{before:>14.1f}{after:>14.1f}{(after / before - 1) * 100:>+8.1f}%", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the game's rendering and simulation hot paths.")
+    parser.add_argument("names", nargs="*", help="benchmarks to run (default: all)")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--output", metavar="FILE", help="write the JSON results to FILE instead of stdout")
+    parser.add_argument("--compare", metavar="FILE", help="print the change against an earlier results file")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+    parser.add_argument("--game-loop-child", nargs=2, metavar=("REPLAY", "FRAMES"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.game_loop_child:
+        game_loop_child(args.game_loop_child[0], int(args.game_loop_child[1]))
+        return
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return
+
+    names = args.names or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    results = {}
+    for name in names:
+        unit, fn = BENCHMARKS[name]
+        try:
+            results[name] = {"unit": unit, **run_benchmark(fn, args.repeats)}
+        except Exception as e:
+            # Keep going so one broken benchmark doesn't hide the rest
+            results[name] = {"unit": unit, "error": f"{type(e).__name__}: {e}"}
+        print(f"{name}: {results[name]}", file=sys.stderr)
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "seed": SEED,
+        "repeats": args.repeats,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,26 @@
 import pygame
-from typing import List
+from typing import List, Optional
 import random
+from image_utils import scale_to_height
+from obstacle_utils import ObstacleQueue
 
 # Car-related utilities
 
+NUM_CAR_SPRITES = 12
+CAR_HEIGHT = 100  # Cars are scaled to this height, keeping their aspect ratio
+
+
+def load_car_surfs(num_cars: int = NUM_CAR_SPRITES, height: int = CAR_HEIGHT, convert: bool = True) -> List[pygame.Surface]:
+    """
+    Load the vehicle sprites, scaled to a common height and flipped to face the player.
+    Pass convert=False to load them without a display (headless simulation).
+    """
+    car_surfs = [pygame.image.load(f"assets/obstacle/vehicles/{i+1}.png") for i in range(num_cars)]
+    if convert:
+        car_surfs = [surf.convert_alpha() for surf in car_surfs]
+    return [pygame.transform.flip(scale_to_height(x, height), True, False) for x in car_surfs]  # Maintain aspect ratio
+
+
 def get_car_hitbox_rect(surf: pygame.Surface, x: int, y: int, car_hitbox_trim: int) -> pygame.Rect:
     """
     Get the hitbox rectangle for a car sprite, trimmed by a specified amount.
@@ -16,19 +33,20 @@ def get_car_hitbox_rect(surf: pygame.Surface, x: int, y: int, car_hitbox_trim: i
 def spawn_car(
     x_start: int,
     car_surfs: List[pygame.Surface],
-    active_car_surfs: List[pygame.Surface],
-    active_car_rects: List[pygame.Rect],
+    active_cars: ObstacleQueue,
     ground_y: int,
-    car_hitbox_trim: int
+    car_hitbox_trim: int,
+    rng: Optional[random.Random] = None
 ) -> None:
     """
     Spawns a car by selecting a random car surface, creating its hitbox, 
-    and adding it to the active car surfaces and rectangles.
+    and adding it at the right end of the active cars.
+    Pass rng to draw from a game's own random stream instead of the global one.
     """
-    surf = random.choice(car_surfs)
+    rng = rng or random
+    surf = rng.choice(car_surfs)
     rect = get_car_hitbox_rect(surf, x_start, ground_y, car_hitbox_trim)
-    active_car_surfs.append(surf)
-    active_car_rects.append(rect)
+    active_cars.append(rect, surf)
 
 
 def is_on_car(car: pygame.Rect, player: pygame.Rect) -> bool:
@@ -46,34 +64,33 @@ def init_cars(
     min_space: int,
     max_space: int,
     car_surfs: List[pygame.Surface],
-    active_car_surfs: List[pygame.Surface],
-    active_car_rects: List[pygame.Rect],
+    active_cars: ObstacleQueue,
     ground_y: int = 365,
     screen_width: int = 800,
     num_cars: int = 5,
-    right_trim: int = 0
+    right_trim: int = 0,
+    rng: Optional[random.Random] = None
 ) -> None:
     """
     Initialize cars by spawning a specified number of cars at random intervals off the screen.
     """
-    active_car_rects.clear()
-    active_car_surfs.clear()
+    rng = rng or random
+    active_cars.clear()
     last_x = screen_width
     for _ in range(num_cars):
         spawn_car(
             last_x,
             car_surfs,
-            active_car_surfs,
-            active_car_rects,
+            active_cars,
             ground_y,
-            right_trim
+            right_trim,
+            rng
         )
-        last_x = active_car_rects[-1].right + random.randint(min_space, max_space)
+        last_x = active_cars[-1].right + rng.randint(min_space, max_space)
 
 
 def explode_car(
-    active_car_surfs: List[pygame.Surface],
-    active_car_rects: List[pygame.Rect],
+    active_cars: ObstacleQueue,
     car_surfs: List[pygame.Surface],
     explosion_rect: pygame.Rect,
     hitbox_rect: pygame.Rect,
@@ -83,23 +100,25 @@ def explode_car(
     car_hitbox_trim: int,
     ground_y: int = 365,
     screen_width: int = 800,
+    rng: Optional[random.Random] = None
 ) -> None:
     """
     Explode the next car by creating an explosion effect at its position and spawn a new car at the end.
     """
-    for i in range(len(active_car_rects)):
-        if active_car_rects[i].left > hitbox_rect.right:
-            explosion_rect.centerx = active_car_rects[i].centerx
-            explosion_rect.bottom = active_car_rects[i].bottom + 30  # Offset for visual alignment
-            active_car_rects.pop(i)
-            active_car_surfs.pop(i)
-            last_x = active_car_rects[-1].right if active_car_rects else screen_width
-            spawn_car(
-                last_x + random.randint(min_space, max_space),
-                car_surfs,
-                active_car_surfs,
-                active_car_rects,
-                ground_y,
-                car_hitbox_trim
-            )
-            break
+    rng = rng or random
+    # Cars are sorted by x, so the next car is found by binary search
+    i = active_cars.index_ahead(hitbox_rect.right)
+    if i < len(active_cars):
+        car_rect = active_cars[i]
+        explosion_rect.centerx = car_rect.centerx
+        explosion_rect.bottom = car_rect.bottom + 30  # Offset for visual alignment
+        active_cars.remove_at(i)
+        last_x = active_cars[-1].right if active_cars else screen_width
+        spawn_car(
+            last_x + rng.randint(min_space, max_space),
+            car_surfs,
+            active_cars,
+            ground_y,
+            car_hitbox_trim,
+            rng
+        )
@@ -0,0 +1,113 @@
+import numpy as np
+import pygame
+from typing import List, Optional, Sequence, Tuple
+# Utility imports
+from animation_utils import Animation
+
+# Entity store for short-lived sprites (explosions) - each component is one NumPy array with a row
+# per entity, and the systems below update every entity with a few array operations
+
+
+class EntityStore:
+    """
+    Entities with a position, a velocity (pixels per step), an animation clip (an index into clips),
+    the step they were spawned on and a lifetime in steps. Rows stay packed and in spawn order: expired
+    entities are removed by shifting the ones after them down. Starts with room for capacity entities
+    and doubles when full.
+    """
+
+    def __init__(self, clips: Sequence[Animation], capacity: int = 8) -> None:
+        self.clips = list(clips)
+        self.count = 0
+        self.x = np.zeros(capacity, dtype=np.int64)
+        self.y = np.zeros(capacity, dtype=np.int64)
+        self.vx = np.zeros(capacity, dtype=np.int64)
+        self.vy = np.zeros(capacity, dtype=np.int64)
+        self.clip = np.zeros(capacity, dtype=np.int64)
+        self.start = np.zeros(capacity, dtype=np.int64)
+        self.lifetime = np.zeros(capacity, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def spawn(
+        self,
+        x: int,
+        y: int,
+        start: int,
+        clip: int = 0,
+        lifetime: Optional[int] = None,
+        vx: int = 0,
+        vy: int = 0
+    ) -> int:
+        """Add an entity and return its row. The lifetime defaults to one play of its clip."""
+        if self.count == len(self.x):
+            self._grow()
+        i = self.count
+        self.x[i], self.y[i], self.vx[i], self.vy[i] = x, y, vx, vy
+        self.clip[i], self.start[i] = clip, start
+        self.lifetime[i] = self.clips[clip].duration if lifetime is None else lifetime
+        self.count += 1
+        return i
+
+    def clear(self) -> None:
+        self.count = 0
+
+    def move(self, dx: int = 0, dy: int = 0) -> None:
+        """Movement system - apply every entity's velocity plus a shared offset (the scrolling)."""
+        n = self.count
+        if n:
+            self.x[:n] += self.vx[:n] + dx
+            self.y[:n] += self.vy[:n] + dy
+
+    def expire(self, now: int) -> int:
+        """Lifetime system - remove the entities that have lived their lifetime. Returns how many."""
+        n = self.count
+        if not n:
+            return 0
+        alive = (now - self.start[:n]) < self.lifetime[:n]
+        kept = int(np.count_nonzero(alive))
+        if kept < n:
+            for component in self._components():
+                component[:kept] = component[:n][alive]
+            self.count = kept
+        return n - kept
+
+    def frame_indices(self, now: int) -> np.ndarray:
+        """Animation system - the frame each entity shows, looked up for all entities of a clip at once."""
+        n = self.count
+        ages = now - self.start[:n]
+        indices = np.zeros(n, dtype=np.int64)
+        for clip_id in np.unique(self.clip[:n]):
+            clip = self.clips[clip_id]
+            rows = self.clip[:n] == clip_id
+            clip_ages = ages[rows] % clip.duration if clip.loop else ages[rows]
+            clip_indices = np.searchsorted(clip.frame_ends, clip_ages, side="right")
+            indices[rows] = np.minimum(clip_indices, len(clip) - 1)
+        return indices
+
+    def blit_sequence(
+        self,
+        frames: Sequence[Sequence[pygame.Surface]],
+        now: int,
+        shift: int = 0
+    ) -> List[Tuple[pygame.Surface, Tuple[int, int]]]:
+        """
+        (surface, position) pairs for Surface.blits(), drawing every entity in one call.
+        frames holds the surfaces of each clip, in the order of clips.
+        """
+        indices = self.frame_indices(now).tolist()
+        clips = self.clip[:self.count].tolist()
+        xs = self.x[:self.count].tolist()
+        ys = self.y[:self.count].tolist()
+        return [(frames[c][i], (x + shift, y)) for c, i, x, y in zip(clips, indices, xs, ys)]
+
+    def _components(self) -> Tuple[np.ndarray, ...]:
+        return self.x, self.y, self.vx, self.vy, self.clip, self.start, self.lifetime
+
+    def _grow(self) -> None:
+        capacity = max(1, len(self.x) * 2)
+        for name in ("x", "y", "vx", "vy", "clip", "start", "lifetime"):
+            grown = np.zeros(capacity, dtype=np.int64)
+            grown[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, grown)
@@ -0,0 +1,157 @@
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import closing
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+# High scores, kept in an SQLite database so several game instances can share one directory.
+# Every write is a single transaction in write-ahead-log mode, so a crash or power cut leaves
+# either the old table or the new one, and SQLite's file locks keep instances from clobbering
+# each other. Writes happen on a background thread, so a game over never waits for the disk
+
+
+HIGH_SCORE_DB = "highscores.db"
+LEGACY_HIGH_SCORE_FILE = "highscore.txt"  # The single score older versions saved, imported once
+HIGH_SCORE_KEEP = 10  # Runs kept in the table
+LOCK_TIMEOUT = 5.0  # Seconds to wait while another instance is writing
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    score INTEGER NOT NULL,
+    seed INTEGER,
+    frames INTEGER NOT NULL,
+    timestamp REAL NOT NULL
+)
+"""
+# Highest first, and the earlier run wins a tie
+TOP_RUNS = "SELECT score, seed, frames, timestamp FROM runs ORDER BY score DESC, timestamp ASC LIMIT ?"
+
+
+class HighScoreRun(NamedTuple):
+    score: int
+    seed: Optional[int]  # None for a score imported from the legacy file
+    frames: int  # Simulation steps the game lasted
+    timestamp: float  # time.time() when the game ended
+
+
+class HighScoreStore:
+    """
+    The best keep runs saved at path. runs is read when the store is created and kept up to date
+    in memory; submit() only queues a run for the writer thread. After each write the writer
+    reloads the table, so scores set by other instances show up too. Call close() before exiting
+    to finish the queued writes.
+    """
+
+    def __init__(self, path: str = HIGH_SCORE_DB, keep: int = HIGH_SCORE_KEEP, legacy_path: Optional[str] = None) -> None:
+        self.path = path
+        self.keep = keep
+        self._lock = threading.Lock()  # Guards runs against the writer thread
+        self._pending: "queue.Queue[Optional[HighScoreRun]]" = queue.Queue()
+        self.runs: List[HighScoreRun] = []
+        try:
+            with closing(self._connect()) as db:
+                self._transaction(db, self._import_legacy, legacy_path)
+                self.runs = self._top_runs(db)
+        except sqlite3.Error as e:
+            print(f"Warning: Could not read high scores from {path}: {e}")
+        self._thread = threading.Thread(target=self._write_runs, name="high-score-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def best(self) -> int:
+        runs = self.runs
+        return runs[0].score if runs else 0
+
+    def submit(self, score: int, seed: Optional[int], frames: int) -> None:
+        """Record a finished game. Returns straight away; the write happens in the background."""
+        run = HighScoreRun(score, seed, frames, time.time())
+        with self._lock:
+            self.runs = sorted(self.runs + [run], key=run_order)[:self.keep]
+            self._pending.put(run)
+
+    def close(self) -> None:
+        """Write out the queued runs and stop the writer."""
+        self._pending.put(None)
+        self._thread.join()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Transactions are started explicitly, see _transaction()
+        db = sqlite3.connect(self.path, timeout=LOCK_TIMEOUT, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")  # Still atomic in WAL mode, the last write may just be lost
+        db.execute(SCHEMA)
+        return db
+
+    def _transaction(self, db: sqlite3.Connection, fn: Callable[..., None], *args) -> None:
+        # IMMEDIATE takes the write lock up front, so two instances never read the same table
+        # and then both write
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            fn(db, *args)
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def _top_runs(self, db: sqlite3.Connection) -> List[HighScoreRun]:
+        return [HighScoreRun(*row) for row in db.execute(TOP_RUNS, (self.keep,))]
+
+    def _import_legacy(self, db: sqlite3.Connection, legacy_path: Optional[str]) -> None:
+        if legacy_path is None or db.execute("SELECT 1 FROM runs LIMIT 1").fetchone():
+            return
+        try:
+            with open(legacy_path, "r") as f:
+                score = int(f.read())
+            timestamp = os.path.getmtime(legacy_path)
+        except (OSError, ValueError):
+            return  # Missing or unreadable - nothing to keep
+        if score > 0:
+            db.execute("INSERT INTO runs (score, seed, frames, timestamp) VALUES (?, NULL, 0, ?)", (score, timestamp))
+
+    def _insert(self, db: sqlite3.Connection, run: HighScoreRun) -> None:
+        db.execute("INSERT INTO runs (score, seed, frames, timestamp) VALUES (?, ?, ?, ?)", run)
+        db.execute(
+            "DELETE FROM runs WHERE id NOT IN (SELECT id FROM runs ORDER BY score DESC, timestamp ASC LIMIT ?)",
+            (self.keep,)
+        )
+
+    def _write_runs(self) -> None:
+        db = None
+        while True:
+            run = self._pending.get()
+            if run is None:
+                break
+            try:
+                if db is None:
+                    db = self._connect()
+                self._transaction(db, self._insert, run)
+                runs = self._top_runs(db)
+            except (sqlite3.Error, OverflowError) as e:
+                # The run stays in memory for this session, it just is not saved. OverflowError is
+                # a number SQLite cannot store, e.g. a seed of 2**63 or more
+                print(f"Warning: Could not save high score {run.score}: {e}")
+                continue
+            with self._lock:
+                # Runs submitted meanwhile are not in the table yet - the next write reloads again
+                if self._pending.empty():
+                    self.runs = runs
+        if db is not None:
+            db.close()
+
+
+def run_order(run: HighScoreRun) -> Tuple[int, float]:
+    return -run.score, run.timestamp
+
+
+if __name__ == "__main__":
+    # List the saved runs: python highscore_utils.py [DATABASE]
+    store = HighScoreStore(sys.argv[1] if len(sys.argv) > 1 else HIGH_SCORE_DB)
+    store.close()
+    for rank, run in enumerate(store.runs, 1):
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(run.timestamp))
+        seed = "-" if run.seed is None else run.seed
+        print(f"{rank:2d}. {run.score:6d}  {run.frames:7d} steps  seed {seed}  {when}")
@@ -1,5 +1,5 @@
 import pygame
-from typing import List
+from typing import List, Tuple
 
 def scale_to_height(img: pygame.Surface, new_height: int) -> pygame.Surface:
     """
@@ -30,3 +30,85 @@ def draw_parallax(screen: pygame.Surface, surface: pygame.Surface, offset: float
     scroll = offset * ratio % surface.get_width()
     screen.blit(surface, (-scroll, 0))
     screen.blit(surface, (-scroll + surface.get_width(), 0))
+
+
+def row_coverage(surface: pygame.Surface) -> Tuple[List[bool], List[bool]]:
+    """
+    For each row of a surface, whether it has any visible pixel and whether it is fully opaque.
+    """
+    width, height = surface.get_size()
+    if not surface.get_flags() & pygame.SRCALPHA:
+        return [True] * height, [True] * height
+    visible = pygame.mask.from_surface(surface, 0)  # alpha > 0
+    opaque = pygame.mask.from_surface(surface, 254)  # alpha == 255
+    row = pygame.mask.Mask((width, 1), fill=True)
+    return (
+        [visible.overlap_area(row, (0, y)) > 0 for y in range(height)],
+        [opaque.overlap_area(row, (0, y)) == width for y in range(height)],
+    )
+
+
+class ParallaxRenderer:
+    """
+    Draws a stack of parallax layers (back to front) as pre-cut horizontal strips.
+    Fully transparent rows and rows hidden behind an opaque row of a layer in front are never drawn,
+    and fully opaque rows are stored without alpha so they blit as plain copies.
+    """
+
+    def __init__(self, layers: List[Tuple[pygame.Surface, float]], screen_size: Tuple[int, int]) -> None:
+        screen_width, screen_height = screen_size
+        covered = [False] * screen_height
+        self.layers = []  # (ratio, width, strips) back to front, strips are (y, surface)
+
+        # Work front to back so each layer knows which rows are already hidden
+        for surface, ratio in reversed(layers):
+            width = surface.get_width()
+            visible, opaque = row_coverage(surface)
+            strips = []
+            y = 0
+            height = min(surface.get_height(), screen_height)
+            while y < height:
+                if covered[y] or not visible[y]:
+                    y += 1
+                    continue
+                # Extend the strip while rows stay drawable and keep the same opacity
+                end = y + 1
+                while end < height and not covered[end] and visible[end] and opaque[end] == opaque[y]:
+                    end += 1
+                strip = surface.subsurface((0, y, width, end - y))
+                strips.append((y, strip.convert() if opaque[y] else strip.convert_alpha()))
+                y = end
+            self.layers.append((ratio, width, strips))
+
+            # Only layers that span the screen hide what is behind them
+            if width >= screen_width:
+                for y in range(height):
+                    covered[y] = covered[y] or opaque[y]
+        self.layers.reverse()
+
+        # Rows no layer covers still need clearing
+        self.fill_rects = []
+        y = 0
+        while y < screen_height:
+            if covered[y]:
+                y += 1
+                continue
+            end = y + 1
+            while end < screen_height and not covered[end]:
+                end += 1
+            self.fill_rects.append(pygame.Rect(0, y, screen_width, end - y))
+            y = end
+
+    def draw(self, screen: pygame.Surface, offset: float) -> None:
+        """Draw all layers scrolled by offset."""
+        for rect in self.fill_rects:
+            screen.fill("black", rect)
+        screen_width = screen.get_width()
+        for ratio, width, strips in self.layers:
+            scroll = offset * ratio % width
+            # A second copy is only needed when the first one doesn't reach the right edge
+            wraps = width - scroll < screen_width
+            for y, strip in strips:
+                screen.blit(strip, (-scroll, y))
+                if wraps:
+                    screen.blit(strip, (-scroll + width, y))
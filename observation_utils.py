@@ -0,0 +1,171 @@
+import numpy as np
+import pygame
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+# Utility imports
+from render_utils import GameRenderer
+from simulation import GameSimulation
+
+# Pixel observations for agents and capture tools. Frames are drawn straight into a ring of
+# frame buffers in shared memory, so another process can read them as NumPy arrays without
+# copying, and the optional grayscale and downscale stages write into buffers allocated once
+
+
+HEADER_SIZE = 8  # One int64: how many frames have been published
+# Integer luma weights (ITU-R BT.601, out of 256)
+GRAY_WEIGHTS = {"r": 77, "g": 150, "b": 29}
+
+
+class FrameRing:
+    """
+    slots frame buffers of size (width, height) in one shared memory block. The writer draws into
+    next_surface(), then publish() makes that frame the latest. frames is a (slots, height, width, 4)
+    uint8 view of the buffers, channels in B, G, R, A order.
+    A frame's buffer is reused slots frames after it was published; readers check is_current()
+    after reading to know the frame was not overwritten meanwhile.
+    Create with FrameRing(slots, size) in the writer and FrameRing.attach(name) in readers.
+    """
+
+    def __init__(self, slots: int, size: Tuple[int, int], name: Optional[str] = None, create: bool = True) -> None:
+        width, height = size
+        self.slots = slots
+        self.size = size
+        self._frame_bytes = width * height * 4
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=HEADER_SIZE + slots * self._frame_bytes)
+        self.name = self.shm.name
+        self._published = np.ndarray((1,), dtype=np.int64, buffer=self.shm.buf)
+        self.frames = np.ndarray((slots, height, width, 4), dtype=np.uint8, buffer=self.shm.buf, offset=HEADER_SIZE)
+        if create:
+            self._published[0] = 0
+        self._surfaces = None  # Only the writer draws, see next_surface()
+
+    @classmethod
+    def attach(cls, name: str, slots: int, size: Tuple[int, int]) -> "FrameRing":
+        """Open a ring created by another process."""
+        return cls(slots, size, name, create=False)
+
+    @property
+    def published(self) -> int:
+        """How many frames have been published. Frame n (from 0) is in slot n % slots."""
+        return int(self._published[0])
+
+    def next_surface(self) -> pygame.Surface:
+        """The surface of the frame being drawn - a view of its slot, so drawing writes to shared memory."""
+        if self._surfaces is None:
+            self._surfaces = [
+                pygame.image.frombuffer(self.shm.buf[HEADER_SIZE + i * self._frame_bytes:HEADER_SIZE + (i + 1) * self._frame_bytes], self.size, "BGRA")
+                for i in range(self.slots)
+            ]
+        return self._surfaces[self.published % self.slots]
+
+    def publish(self) -> int:
+        """Make the frame drawn into next_surface() the latest one. Returns its frame number."""
+        number = self.published
+        self._published[0] = number + 1
+        return number
+
+    def latest(self) -> Tuple[int, Optional[np.ndarray]]:
+        """The number of the latest frame and a view of its pixels, or (-1, None) before the first frame."""
+        number = self.published - 1
+        if number < 0:
+            return number, None
+        return number, self.frames[number % self.slots]
+
+    def is_current(self, number: int) -> bool:
+        """Whether frame number is still intact - the writer has not started drawing over its slot."""
+        return self.published - number < self.slots
+
+    def close(self) -> None:
+        # Views into the block have to go before it can be closed
+        self._surfaces = None
+        self.frames = self._published = None
+        self.shm.close()
+
+    def unlink(self) -> None:
+        """Free the shared memory. Call once, in the process that created the ring, after close()."""
+        self.shm.unlink()
+
+
+class ObservationPipeline:
+    """
+    Turns B, G, R, A frames of a fixed size into observations: RGB, or grayscale if asked, and
+    downscale times smaller on each side by averaging blocks of pixels. Every stage writes into
+    buffers allocated up front, and process() returns the same output array each time - copy it
+    to keep an observation. With neither stage the result is a view of the frame itself.
+    """
+
+    def __init__(self, size: Tuple[int, int], grayscale: bool = False, downscale: int = 1) -> None:
+        width, height = size
+        if width % downscale or height % downscale:
+            raise ValueError(f"downscale {downscale} does not divide the frame size {size}")
+        self.grayscale = grayscale
+        self.downscale = downscale
+        out_width, out_height = width // downscale, height // downscale
+        self.shape = (out_height, out_width) if grayscale else (out_height, out_width, 3)
+
+        if downscale > 1:
+            if downscale * downscale * 255 > np.iinfo(np.uint16).max:
+                raise ValueError(f"downscale {downscale} is too large, block sums must fit 16 bits")
+            self._row_sums = np.zeros((out_height, width, 4), dtype=np.uint16)
+            self._block_sums = np.zeros((out_height, out_width, 4), dtype=np.uint16)
+            self._small = np.zeros((out_height, out_width, 4), dtype=np.uint8)
+        if grayscale:
+            self._luma = np.zeros((out_height, out_width), dtype=np.uint16)
+            self._channel = np.zeros((out_height, out_width), dtype=np.uint16)
+            self._gray = np.zeros((out_height, out_width), dtype=np.uint8)
+
+    def process(self, frame: np.ndarray) -> np.ndarray:
+        """The observation of a (height, width, 4) B, G, R, A frame."""
+        if self.downscale > 1:
+            f = self.downscale
+            height, width = frame.shape[:2]
+            # Add up the f rows of each block, then the f columns. Splitting an axis is a view, and
+            # adding whole slices of all four channels is far faster than NumPy's strided sum
+            rows = frame.reshape(height // f, f, width, 4)
+            np.copyto(self._row_sums, rows[:, 0])
+            for i in range(1, f):
+                np.add(self._row_sums, rows[:, i], out=self._row_sums)
+            # A pixel's four 16-bit sums are added as one 64-bit number - no sum exceeds 16 bits,
+            # so nothing carries from one channel into the next
+            columns = self._row_sums.view(np.uint64).reshape(height // f, width // f, f)
+            block_sums = self._block_sums.view(np.uint64).reshape(height // f, width // f)
+            np.copyto(block_sums, columns[:, :, 0])
+            for i in range(1, f):
+                np.add(block_sums, columns[:, :, i], out=block_sums)
+            np.floor_divide(self._block_sums, f * f, out=self._small, casting="unsafe")
+            frame = self._small
+        bgr = frame[..., :3]
+        if not self.grayscale:
+            return bgr[..., ::-1]  # RGB order, as a view
+        np.multiply(bgr[..., 2], GRAY_WEIGHTS["r"], out=self._luma, dtype=np.uint16)
+        np.multiply(bgr[..., 1], GRAY_WEIGHTS["g"], out=self._channel, dtype=np.uint16)
+        self._luma += self._channel
+        np.multiply(bgr[..., 0], GRAY_WEIGHTS["b"], out=self._channel, dtype=np.uint16)
+        self._luma += self._channel
+        np.right_shift(self._luma, 8, out=self._luma)
+        np.copyto(self._gray, self._luma, casting="unsafe")
+        return self._gray
+
+
+class PixelObserver:
+    """
+    Renders a game off-screen with the same GameRenderer as the window, into a FrameRing, and
+    returns the processed observation. Other processes can attach to ring (by ring.name) to read
+    the raw frames too. Needs a display mode to be set (the dummy video driver works), since
+    the sprites are converted to its format.
+    """
+
+    def __init__(self, renderer: GameRenderer, slots: int = 4, grayscale: bool = False, downscale: int = 1) -> None:
+        self.renderer = renderer
+        self.ring = FrameRing(slots, renderer.size)
+        self.pipeline = ObservationPipeline(renderer.size, grayscale, downscale)
+
+    def observe(self, sim: GameSimulation, high_score: int = 0) -> np.ndarray:
+        """Draw the current state of sim and return its observation (a reused buffer, see ObservationPipeline)."""
+        self.renderer.draw(self.ring.next_surface(), sim, high_score)
+        number = self.ring.publish()
+        return self.pipeline.process(self.ring.frames[number % self.ring.slots])
+
+    def close(self) -> None:
+        self.ring.close()
+        self.ring.unlink()
@@ -0,0 +1,149 @@
+import pygame
+from typing import Iterator, List, Optional, Tuple
+
+# World model for things that scroll past the player - cars and ammo pickups are spawned at the
+# right and retired at the left, so they are kept in x order in a ring buffer
+
+
+class ObstacleQueue:
+    """
+    Obstacles (a hitbox rect, plus the sprite to draw for it) sorted by x, stored in a ring buffer.
+    Retiring the leftmost obstacle and spawning one at the right are O(1), and the first obstacle
+    ahead of a point is found by binary search. Starts with room for capacity obstacles and
+    doubles when full, so a busy game only allocates while it ramps up.
+    Iterating gives the rects from left to right; items() gives (surf, rect) pairs.
+    Everything scrolls together, so the order never changes and doubles as a 1D broad phase:
+    overlapping() and overlap_range() find the few obstacles under an x-span without looking at the rest.
+    """
+
+    def __init__(self, capacity: int = 16) -> None:
+        self._rects: List[Optional[pygame.Rect]] = [None] * capacity
+        self._surfs: List[Optional[pygame.Surface]] = [None] * capacity
+        self._head = 0  # Slot of the leftmost obstacle
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i: int) -> pygame.Rect:
+        return self._rects[self._slot(i)]
+
+    def __iter__(self) -> Iterator[pygame.Rect]:
+        return iter(self._ordered(self._rects))
+
+    def items(self) -> Iterator[Tuple[Optional[pygame.Surface], pygame.Rect]]:
+        return zip(self._ordered(self._surfs), self._ordered(self._rects))
+
+    def surf(self, i: int) -> Optional[pygame.Surface]:
+        return self._surfs[self._slot(i)]
+
+    def append(self, rect: pygame.Rect, surf: Optional[pygame.Surface] = None) -> None:
+        """Add an obstacle at the right end. It must not be left of the current last one."""
+        if self._count == len(self._rects):
+            self._grow()
+        slot = (self._head + self._count) % len(self._rects)
+        self._rects[slot] = rect
+        self._surfs[slot] = surf
+        self._count += 1
+
+    def popleft(self) -> pygame.Rect:
+        """Remove and return the leftmost obstacle."""
+        if not self._count:
+            raise IndexError("pop from an empty ObstacleQueue")
+        rect = self._rects[self._head]
+        self._rects[self._head] = self._surfs[self._head] = None
+        self._head = (self._head + 1) % len(self._rects)
+        self._count -= 1
+        return rect
+
+    def remove_at(self, i: int) -> None:
+        """Remove the obstacle at index i, shifting whichever side of it is shorter."""
+        i = self._index(i)
+        if i < self._count // 2:
+            for j in range(i, 0, -1):
+                self._move_slot(j - 1, j)
+            self.popleft()
+            return
+        for j in range(i, self._count - 1):
+            self._move_slot(j + 1, j)
+        last = self._slot(self._count - 1)
+        self._rects[last] = self._surfs[last] = None
+        self._count -= 1
+
+    def clear(self) -> None:
+        for i in range(len(self._rects)):
+            self._rects[i] = self._surfs[i] = None
+        self._head = self._count = 0
+
+    def move(self, dx: int) -> None:
+        """Scroll every obstacle dx pixels."""
+        for rect in self._ordered(self._rects):
+            rect.x += dx
+
+    def index_ahead(self, x: int) -> int:
+        """Index of the first obstacle whose left edge is past x, or len() if there is none."""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self[mid].left > x:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def overlapping(self, left: int, right: int) -> List[pygame.Rect]:
+        """The obstacles whose x-span overlaps left..right, leftmost first."""
+        start, stop = self.overlap_range(left, right)
+        rects, head, capacity = self._rects, self._head, len(self._rects)
+        return [rects[(head + i) % capacity] for i in range(start, stop)]
+
+    def overlap_range(self, left: int, right: int) -> Tuple[int, int]:
+        """
+        Index range of the obstacles whose x-span overlaps left..right. Relies on the right edges
+        being sorted too, which holds because obstacles in a queue never overlap each other.
+        """
+        rects, head, capacity, count = self._rects, self._head, len(self._rects), self._count
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if rects[(head + mid) % capacity].right > left:
+                hi = mid
+            else:
+                lo = mid + 1
+        stop = lo
+        while stop < count and rects[(head + stop) % capacity].left < right:
+            stop += 1
+        return lo, stop
+
+    def _ordered(self, slots: list) -> list:
+        """The used slots of a buffer, leftmost first. List slices keep iteration in C."""
+        end = self._head + self._count
+        if end <= len(slots):
+            return slots[self._head:end]
+        return slots[self._head:] + slots[:end - len(slots)]
+
+    def _index(self, i: int) -> int:
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("ObstacleQueue index out of range")
+        return i
+
+    def _slot(self, i: int) -> int:
+        # Skip the bounds checks for the common in-range, non-negative case
+        if not 0 <= i < self._count:
+            i = self._index(i)
+        return (self._head + i) % len(self._rects)
+
+    def _move_slot(self, src: int, dst: int) -> None:
+        src, dst = self._slot(src), self._slot(dst)
+        self._rects[dst] = self._rects[src]
+        self._surfs[dst] = self._surfs[src]
+
+    def _grow(self) -> None:
+        # Unwrap into a buffer twice the size, leftmost obstacle first
+        capacity = max(1, len(self._rects) * 2)
+        rects, surfs = [None] * capacity, [None] * capacity
+        for i, (surf, rect) in enumerate(self.items()):
+            rects[i], surfs[i] = rect, surf
+        self._rects, self._surfs, self._head = rects, surfs, 0
@@ -0,0 +1,148 @@
+import json
+import time
+import pygame
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Deque, Dict, Iterator, Optional, Tuple
+# Utility imports
+from text_utils import get_font
+
+# Frame-time profiler - times the phases of each frame, shows rolling percentiles in an
+# overlay and records a Chrome trace (load it in chrome://tracing or ui.perfetto.dev)
+
+
+PROFILE_WINDOW = 300  # Frames the percentiles are taken over, 5 seconds at 60 FPS
+TRACE_MAX_EVENTS = 300_000  # Most recent trace events kept, several minutes of play
+OVERLAY_REFRESH_FRAMES = 30  # Re-render the overlay text twice a second, not every frame
+OVERLAY_FONT_SIZE = 12
+OVERLAY_POS = (10, 60)  # Below the ammo icons
+
+# Simulation phases and the GameSimulation methods that run them
+SIMULATION_PHASES = {
+    "cars": "_update_cars",
+    "ammo": "_update_pickups",
+    "landing": "_land_on_cars",
+    "animation": "_update_animation",
+    "explosion": "_update_explosion",
+    "collision": "_check_collision",
+}
+
+_NULL_PHASE = nullcontext()
+
+
+class FrameProfiler:
+    """
+    Collects how long each named phase took per frame. Time spent in a phase is summed over the
+    frame (several simulation steps can run in one frame) and kept for the last PROFILE_WINDOW frames.
+    Does nothing until enable() is called, so it can stay wired in for normal play.
+    """
+
+    def __init__(self, trace: bool = False) -> None:
+        self.enabled = False
+        self.show_overlay = False
+        self.samples: Dict[str, Deque[float]] = {}  # Phase -> ms per frame
+        self.trace_events: Optional[Deque[Tuple[str, int, int]]] = deque(maxlen=TRACE_MAX_EVENTS) if trace else None
+        self._frame_totals: Dict[str, float] = {}
+        self._frame_start = time.perf_counter_ns()
+        self._overlay: Optional[pygame.Surface] = None
+        self._frames_since_overlay = 0
+
+    def enable(self) -> None:
+        self.enabled = True
+        self._frame_start = time.perf_counter_ns()
+
+    def phase(self, name: str):
+        """Context manager timing a phase of the current frame."""
+        if not self.enabled:
+            return _NULL_PHASE
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name: str) -> Iterator[None]:
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter_ns())
+
+    def add(self, name: str, start_ns: int, end_ns: int) -> None:
+        """Record one run of a phase."""
+        self._frame_totals[name] = self._frame_totals.get(name, 0.0) + (end_ns - start_ns) / 1e6
+        if self.trace_events is not None:
+            self.trace_events.append((name, start_ns, end_ns - start_ns))
+
+    def instrument(self, obj: object, phases: Dict[str, str]) -> None:
+        """
+        Time methods of an object as phases, e.g. instrument(sim, SIMULATION_PHASES). The methods are
+        wrapped on the instance only, so objects that are not instrumented pay nothing.
+        """
+        for name, method_name in phases.items():
+            obj.__dict__[method_name] = self._wrap(name, getattr(obj, method_name))
+
+    def _wrap(self, name: str, method: Callable) -> Callable:
+        def timed(*args, **kwargs):
+            if not self.enabled:
+                return method(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.add(name, start, time.perf_counter_ns())
+        return timed
+
+    def end_frame(self) -> None:
+        """Close the current frame, recording its phase totals and its whole length."""
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        self._frame_totals["frame"] = (now - self._frame_start) / 1e6
+        if self.trace_events is not None:
+            self.trace_events.append(("frame", self._frame_start, now - self._frame_start))
+        # Phases that did not run this frame count as 0 ms
+        for name in self.samples.keys() | self._frame_totals.keys():
+            if name not in self.samples:
+                self.samples[name] = deque(maxlen=PROFILE_WINDOW)
+            self.samples[name].append(self._frame_totals.get(name, 0.0))
+        self._frame_totals = {}
+        self._frame_start = now
+
+    def percentiles(self, name: str) -> Tuple[float, float, float]:
+        """p50, p95 and p99 of a phase over the window, in ms."""
+        values = sorted(self.samples.get(name, ()))
+        if not values:
+            return 0.0, 0.0, 0.0
+        last = len(values) - 1
+        return tuple(values[round(last * p)] for p in (0.5, 0.95, 0.99))
+
+    def draw_overlay(self, screen: pygame.Surface, fps: float) -> Optional[pygame.Rect]:
+        """Draw the overlay if it is shown. Returns the area drawn."""
+        if not self.show_overlay:
+            return None
+        self._frames_since_overlay += 1
+        if self._overlay is None or self._frames_since_overlay >= OVERLAY_REFRESH_FRAMES:
+            self._overlay = self._render_overlay(fps)
+            self._frames_since_overlay = 0
+        return screen.blit(self._overlay, OVERLAY_POS)
+
+    def _render_overlay(self, fps: float) -> pygame.Surface:
+        font = get_font(OVERLAY_FONT_SIZE)
+        # "frame" first, then the slowest phases
+        names = sorted(self.samples, key=lambda name: (name != "frame", -self.percentiles(name)[0]))
+        lines = [f"FPS {fps:5.1f}", f"{'phase':<10}{'p50':>7}{'p95':>7}{'p99':>7} ms"]
+        lines += [f"{name:<10}" + "".join(f"{value:7.2f}" for value in self.percentiles(name)) for name in names]
+        line_height = font.get_linesize()
+        rendered = [font.render(line, False, "white") for line in lines]
+        overlay = pygame.Surface((max(surf.get_width() for surf in rendered) + 8, line_height * len(lines) + 8), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 170))
+        for i, surf in enumerate(rendered):
+            overlay.blit(surf, (4, 4 + i * line_height))
+        return overlay
+
+    def save_trace(self, path: str) -> None:
+        """Write the recorded phases as a Chrome trace (JSON object format, times in microseconds)."""
+        events = [
+            {"name": name, "ph": "X", "ts": start / 1000, "dur": duration / 1000, "pid": 1, "tid": 1}
+            for name, start, duration in (self.trace_events or ())
+        ]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
@@ -0,0 +1,132 @@
+import threading
+import pygame
+from typing import List, Optional, Tuple
+# Utility imports
+from score_utils import display_score
+from image_utils import ParallaxRenderer
+from ammo_utils import draw_ammo_ui
+from asset_manager import AssetManager
+from profile_utils import FrameProfiler
+from simulation import GameSimulation
+
+# Drawing the game and presenting frames to the window
+
+
+class DirtyRectPresenter:
+    """
+    Presents only the parts of the screen that changed, for scenes where most pixels stay put
+    (menus, the end screen, the death animation). Drawing code marks the rects it redrew each frame;
+    present() then updates those rects plus last frame's, so anything that moved is erased too.
+    Call full_redraw() on frames where the whole screen changed.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.rects: List[pygame.Rect] = []
+        self.prev_rects: List[pygame.Rect] = []
+        self.full = True
+
+    def mark(self, *rects: pygame.Rect) -> None:
+        """Mark areas of the screen that were redrawn this frame."""
+        if self.enabled:
+            self.rects.extend(rects)
+
+    def full_redraw(self) -> None:
+        """Present the whole screen this frame."""
+        self.full = True
+
+    def present(self) -> None:
+        if not self.enabled or self.full:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.prev_rects + self.rects)
+        # Kept even after a full flip, so next frame still erases what moved
+        self.prev_rects = self.rects
+        self.rects = []
+        self.full = False
+
+
+class GameRenderer:
+    """
+    Draws a game in progress onto any surface - the window, or an off-screen target such as
+    observation_utils.FrameRing. Frames are timed with profiler and the areas that change while
+    the player is dying are marked on presenter, when they are given.
+    """
+
+    def __init__(
+        self,
+        assets: AssetManager,
+        font: pygame.font.Font,
+        size: Tuple[int, int],
+        profiler: Optional[FrameProfiler] = None,
+        presenter: Optional[DirtyRectPresenter] = None
+    ) -> None:
+        self.assets = assets
+        self.font = font
+        self.size = size
+        # Disabled ones do nothing, so drawing never has to check
+        self.profiler = profiler or FrameProfiler()
+        self.presenter = presenter or DirtyRectPresenter(enabled=False)
+        self._parallax: Optional[ParallaxRenderer] = None
+        self._parallax_lock = threading.Lock()
+
+    def parallax(self) -> ParallaxRenderer:
+        """The background renderer, built from the level images the first time it is needed."""
+        with self._parallax_lock:  # main.py builds it on a background thread
+            if self._parallax is None:
+                self._parallax = ParallaxRenderer([
+                    (self.assets.get_image("sky"), 0.0),
+                    (self.assets.get_image("back"), 0.85),
+                    (self.assets.get_image("buildings_back"), 0.94),
+                    (self.assets.get_image("ground"), 0.98),
+                ], self.size)
+            return self._parallax
+
+    def draw(
+        self,
+        screen: pygame.Surface,
+        sim: GameSimulation,
+        high_score: int,
+        alpha: float = 1.0,
+        prev_player_y: Optional[int] = None
+    ) -> None:
+        """
+        Draw the simulation state, interpolated alpha of the way from the previous step to the current one.
+        """
+        profiler, presenter, assets = self.profiler, self.presenter, self.assets
+        # Everything in the world moved left by scroll_step during the last step, so draw it
+        # part of the way back towards where it was
+        shift = round((1 - alpha) * sim.scroll_step)
+        scroll_offset = sim.scroll_offset - shift
+        player_y = sim.player_rect.y
+        if prev_player_y is not None:
+            player_y = round(prev_player_y + (sim.player_rect.y - prev_player_y) * alpha)
+
+        # Background drawing
+        with profiler.phase("parallax"):
+            self.parallax().draw(screen, scroll_offset)
+
+        with profiler.phase("hud"):
+            display_score(sim.score, high_score, self.font, screen)
+
+        with profiler.phase("sprites"):
+            # Cars and pickups go to the screen in one blits() call
+            ammo_pickup_img = assets.get_image("ammo_pickup")
+            world_sprites = [(car_surf, (car_rect.x + shift, car_rect.y)) for car_surf, car_rect in sim.cars.items()]
+            world_sprites += [(ammo_pickup_img, (pickup.x + shift, pickup.y)) for pickup in sim.ammo_pickups]
+            screen.blits(world_sprites, doreturn=False)
+
+            # Animation names in the simulation match the asset names
+            anim, frame_idx = sim.player_frame
+            player_area = screen.blit(assets.get(anim)[frame_idx], (sim.player_rect.x, player_y))
+
+            if sim.explosions:
+                presenter.mark(*screen.blits(sim.explosions.blit_sequence([assets.get("explosion")], sim.frame, shift)))
+
+            # While dying the world stands still, so only the player and explosion change
+            if sim.is_dying:
+                presenter.mark(player_area)
+
+        # UI: Draw ammo icons in top left
+        with profiler.phase("hud"):
+            draw_ammo_ui(screen, assets.get_image("ammo_icon"), sim.player_ammo)
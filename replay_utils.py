@@ -0,0 +1,139 @@
+import argparse
+import struct
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+# Utility imports
+from simulation import GameSimulation, ACTION_NONE, ANIM_FRAME_COUNTS
+from asset_manager import AssetManager
+
+# Input replays - a seed plus every frame that had input is enough to re-simulate a whole game
+
+REPLAY_MAGIC = b"DINOREPL"
+REPLAY_VERSION = 2
+REPLAY_EXTENSION = ".dinoreplay"
+# magic, version, seed, frames played, final score, number of inputs, REPLAY_* flags
+HEADER_FORMAT = "<8sHQIIIB"
+# frame number, ACTION_* flags pressed on that frame
+INPUT_FORMAT = "<IB"
+
+# Flags - how the game was simulated, so playback can set up the same simulation
+REPLAY_PIXEL_COLLISION = 1
+
+
+class Replay:
+    """
+    The inputs of one game, keyed by the simulation frame they were applied on.
+    frames and score are filled in when the game ends and let playback check it got the same result.
+    pixel_collision is whether the game was played with GameSimulation's precise collisions.
+    """
+
+    def __init__(
+        self,
+        seed: int,
+        inputs: Optional[List[Tuple[int, int]]] = None,
+        frames: int = 0,
+        score: int = 0,
+        pixel_collision: bool = False
+    ) -> None:
+        self.seed = seed
+        self.inputs = inputs if inputs is not None else []
+        self.frames = frames
+        self.score = score
+        self.pixel_collision = pixel_collision
+
+    def record(self, frame: int, actions: int) -> None:
+        """Record the actions pressed before stepping the given frame."""
+        if actions != ACTION_NONE:
+            self.inputs.append((frame, actions))
+
+    def finish(self, sim: GameSimulation) -> None:
+        """Store how the game ended."""
+        self.frames = sim.frame
+        self.score = sim.score
+
+    def actions_by_frame(self) -> Dict[int, int]:
+        return dict(self.inputs)
+
+    def save(self, path: str) -> None:
+        data = bytearray(struct.pack(
+            HEADER_FORMAT, REPLAY_MAGIC, REPLAY_VERSION, self.seed, self.frames, self.score, len(self.inputs),
+            REPLAY_PIXEL_COLLISION if self.pixel_collision else 0
+        ))
+        for frame, actions in self.inputs:
+            data += struct.pack(INPUT_FORMAT, frame, actions)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    @classmethod
+    def load(cls, path: str) -> "Replay":
+        with open(path, "rb") as f:
+            data = f.read()
+        header_size = struct.calcsize(HEADER_FORMAT)
+        if len(data) < header_size or data[:len(REPLAY_MAGIC)] != REPLAY_MAGIC:
+            raise ValueError(f"{path} is not a replay file")
+        magic, version, seed, frames, score, count, flags = struct.unpack_from(HEADER_FORMAT, data)
+        if version != REPLAY_VERSION:
+            raise ValueError(f"{path} is a version {version} replay file, only version {REPLAY_VERSION} can be played")
+        body = data[header_size:]
+        body = body[:len(body) - len(body) % struct.calcsize(INPUT_FORMAT)]  # Drop a partly written input
+        inputs = list(struct.iter_unpack(INPUT_FORMAT, body))
+        if len(inputs) != count:
+            raise ValueError(f"{path} is truncated: expected {count} inputs, found {len(inputs)}")
+        return cls(seed, inputs, frames, score, bool(flags & REPLAY_PIXEL_COLLISION))
+
+
+def replay_simulation(replay: Replay, assets: Optional[AssetManager] = None) -> GameSimulation:
+    """
+    A headless simulation set up the way replay was recorded. Precise collisions take their masks
+    from assets (a new AssetManager if none is given).
+    """
+    if not replay.pixel_collision:
+        return GameSimulation()
+    assets = assets or AssetManager()
+    return GameSimulation(
+        car_masks=assets.get_masks("cars"),
+        player_masks={anim: assets.get_masks(anim) for anim in ANIM_FRAME_COUNTS}
+    )
+
+
+def run_replay(replay: Replay, sim: Optional[GameSimulation] = None) -> GameSimulation:
+    """
+    Re-simulate a replay without drawing anything, as fast as possible.
+    sim is reused if given, and must use the replay's collision mode.
+    Returns the simulation in its final state.
+    """
+    if sim is None:
+        sim = replay_simulation(replay)
+    elif sim.precise_collision != replay.pixel_collision:
+        raise ValueError(f"replay was recorded with pixel_collision={replay.pixel_collision}, the simulation has {sim.precise_collision}")
+    sim.reset(replay.seed)
+    actions = replay.actions_by_frame()
+    while sim.is_playing and sim.frame < replay.frames:
+        sim.step(actions.get(sim.frame, ACTION_NONE))
+    return sim
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-simulate replays headless and check they still end the same way.")
+    parser.add_argument("replays", nargs="+")
+    args = parser.parse_args()
+
+    sims: Dict[bool, GameSimulation] = {}  # One per collision mode, reused across replays
+    assets = AssetManager()
+    failures = 0
+    for path in args.replays:
+        replay = Replay.load(path)
+        if replay.pixel_collision not in sims:
+            sims[replay.pixel_collision] = replay_simulation(replay, assets)
+        sim = sims[replay.pixel_collision]
+        start_time = time.perf_counter()
+        run_replay(replay, sim)
+        elapsed = time.perf_counter() - start_time
+        ok = sim.frame == replay.frames and sim.score == replay.score
+        failures += not ok
+        print(
+            f"{'ok  ' if ok else 'FAIL'} {path}: score {sim.score} (recorded {replay.score}), "
+            f"{sim.frame} frames (recorded {replay.frames}) in {elapsed * 1000:.1f} ms"
+        )
+    sys.exit(1 if failures else 0)
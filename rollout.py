@@ -0,0 +1,163 @@
+import argparse
+import multiprocessing
+import random
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+# Utility imports
+from simulation import (
+    GameSimulation,
+    SCROLL_SPEED_START,
+    SPEED_INCREMENT,
+    MAX_SPEED,
+    ACTION_NONE,
+    ACTION_JUMP,
+    ACTION_SHOOT,
+)
+from autopilot import autopilot_policy
+
+# Runs whole headless episodes across a multiprocessing pool.
+# Each worker owns one GameSimulation and only sends back a summary per episode,
+# so nothing is pickled per frame.
+
+
+DEFAULT_MAX_FRAMES = 60 * 60 * 10  # Stop episodes after 10 minutes of game time
+
+
+class EpisodeResult(NamedTuple):
+    seed: int
+    params: Dict[str, float]
+    score: int
+    frames: int
+    cause_of_death: str  # "car", or "max_frames" if the episode was cut off
+    ammo_used: int
+
+
+def random_policy(sim: GameSimulation) -> int:
+    """Jump and shoot at random - a cheap baseline for sweeps."""
+    actions = ACTION_NONE
+    if random.random() < 0.05:
+        actions |= ACTION_JUMP
+    if random.random() < 0.01:
+        actions |= ACTION_SHOOT
+    return actions
+
+
+POLICIES = {"random": random_policy, "autopilot": autopilot_policy}
+
+
+# Worker state - set once per process by _init_worker
+_worker_sim: Optional[GameSimulation] = None
+_worker_policy: Optional[Callable[[GameSimulation], int]] = None
+_worker_max_frames = DEFAULT_MAX_FRAMES
+
+
+def _init_worker(policy: Callable[[GameSimulation], int], max_frames: int) -> None:
+    """Create the worker's game once so the car sprites are only loaded once per process."""
+    global _worker_sim, _worker_policy, _worker_max_frames
+    _worker_sim = GameSimulation()
+    _worker_policy = policy
+    _worker_max_frames = max_frames
+
+
+def run_episode(
+    sim: GameSimulation,
+    policy: Callable[[GameSimulation], int],
+    seed: int,
+    params: Dict[str, float],
+    max_frames: int = DEFAULT_MAX_FRAMES
+) -> EpisodeResult:
+    """Play one seeded game until the player is hit or max_frames have passed."""
+    random.seed(seed)  # For policies that use the global random module
+    sim.scroll_speed_start = params.get("scroll_speed_start", SCROLL_SPEED_START)
+    sim.speed_increment = params.get("speed_increment", SPEED_INCREMENT)
+    sim.max_speed = params.get("max_speed", MAX_SPEED)
+    sim.reset(seed)
+
+    cause_of_death = "max_frames"
+    while sim.frame < max_frames:
+        # The death animation adds nothing to the result, so stop as soon as the player is hit
+        if "death" in sim.step(policy(sim)):
+            cause_of_death = "car"
+            break
+    return EpisodeResult(seed, params, sim.score, sim.frame, cause_of_death, sim.ammo_used)
+
+
+def _run_job(job: tuple) -> EpisodeResult:
+    seed, params = job
+    return run_episode(_worker_sim, _worker_policy, seed, params, _worker_max_frames)
+
+
+class RolloutPool:
+    """
+    A pool of worker processes that each play whole episodes.
+    Use as a context manager so the workers are shut down afterwards.
+    """
+
+    def __init__(
+        self,
+        processes: Optional[int] = None,
+        policy: Callable[[GameSimulation], int] = random_policy,
+        max_frames: int = DEFAULT_MAX_FRAMES
+    ) -> None:
+        # policy must be a module-level function so it can be sent to the workers
+        self.processes = processes or multiprocessing.cpu_count()
+        self.pool = multiprocessing.Pool(self.processes, initializer=_init_worker, initargs=(policy, max_frames))
+
+    def run(self, seeds: Iterable[int], params: Optional[Dict[str, float]] = None) -> Iterator[EpisodeResult]:
+        """Play one episode per seed with the same parameters. Results arrive in completion order."""
+        params = params or {}
+        return self.sweep([params], seeds)
+
+    def sweep(self, param_sets: List[Dict[str, float]], seeds: Iterable[int]) -> Iterator[EpisodeResult]:
+        """
+        Play every seed under every parameter set (keys: scroll_speed_start, speed_increment, max_speed).
+        Results arrive in completion order.
+        """
+        seeds = list(seeds)  # Read once per parameter set, so a generator must not run out
+        jobs = [(seed, params) for params in param_sets for seed in seeds]
+        # Batch jobs so workers are not waiting on the pipe between short episodes
+        chunksize = max(1, len(jobs) // (self.processes * 4))
+        return self.pool.imap_unordered(_run_job, jobs, chunksize)
+
+    def close(self) -> None:
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self) -> "RolloutPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run headless episodes in parallel and print average scores.")
+    parser.add_argument("--episodes", type=int, default=1000)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--policy", choices=POLICIES, default="random", help="autopilot plays well enough for soak runs and difficulty checks")
+    parser.add_argument("--max-frames", type=int, default=DEFAULT_MAX_FRAMES)
+    parser.add_argument("--scroll-speed-start", type=float, nargs="+", default=[SCROLL_SPEED_START])
+    parser.add_argument("--speed-increment", type=float, nargs="+", default=[SPEED_INCREMENT])
+    parser.add_argument("--max-speed", type=float, nargs="+", default=[MAX_SPEED])
+    args = parser.parse_args()
+
+    param_sets = [
+        {"scroll_speed_start": start, "speed_increment": increment, "max_speed": max_speed}
+        for start in args.scroll_speed_start
+        for increment in args.speed_increment
+        for max_speed in args.max_speed
+    ]
+    start_time = time.perf_counter()
+    totals: Dict[tuple, List[EpisodeResult]] = {}
+    with RolloutPool(args.processes, POLICIES[args.policy], args.max_frames) as pool:
+        for result in pool.sweep(param_sets, range(args.episodes)):
+            totals.setdefault(tuple(result.params.values()), []).append(result)
+    elapsed = time.perf_counter() - start_time
+
+    frames = 0
+    for key, results in totals.items():
+        frames += sum(r.frames for r in results)
+        avg_score = sum(r.score for r in results) / len(results)
+        avg_frames = sum(r.frames for r in results) / len(results)
+        print(f"start={key[0]} increment={key[1]} max={key[2]}: score {avg_score:.1f}, frames {avg_frames:.0f}")
+    print(f"{frames} frames in {elapsed:.2f}s ({frames / elapsed:.0f} frames/s)")
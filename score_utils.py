@@ -1,10 +1,18 @@
 import pygame
+from typing import Optional, Tuple
+
+# The score only changes a few times a second, so the last rendered text is kept and reused
+_last_score: Optional[Tuple[int, int, pygame.font.Font]] = None
+_score_surf: Optional[pygame.Surface] = None
 
 def display_score(score: int, high_score: int, font: pygame.font.Font, screen: pygame.Surface) -> None:
     """
     Display the current score and high score on the screen.
     """
-    score_text = f"HI {high_score}    {score:05d}"
-    score_surf = font.render(score_text, False, "white")
-    score_rect = score_surf.get_rect(topright=(760, 20))
-    screen.blit(score_surf, score_rect)
+    global _last_score, _score_surf
+    if _last_score != (score, high_score, font):
+        score_text = f"HI {high_score}    {score:05d}"
+        _score_surf = font.render(score_text, False, "white")
+        _last_score = (score, high_score, font)
+    score_rect = _score_surf.get_rect(topright=(760, 20))
+    screen.blit(_score_surf, score_rect)
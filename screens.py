@@ -1,6 +1,8 @@
 import pygame
-from typing import List, Tuple, Any  # Added type hints inspired by Mr. Evan's very clean code
-from sound_utils import play_hover_sound, play_click_sound
+from typing import List, Any  # Added type hints inspired by Mr. Evan's very clean code
+from sound_utils import play_hover_sound, play_click_sound, set_music_volume, set_sound_volume, DEFAULT_SFX_VOLUME, DEFAULT_MUSIC_VOLUME
+from text_utils import get_font, render_text
+from animation_utils import Animation
 
 # Global hover state tracking - simple variables
 hover_played_play = False
@@ -10,9 +12,12 @@ hover_played_restart = False
 hover_played_quit = False
 hover_played_home = False
 
+# Areas redrawn with changing content this frame, for dirty-rect presenting - see take_dirty_rects()
+dirty_rects = []
+
 # Volume settings
-sfx_volume = 0.7  # Sound effects volume (0.0 to 1.0)
-music_volume = 0.5  # Music volume (0.0 to 1.0)
+sfx_volume = DEFAULT_SFX_VOLUME  # Sound effects volume (0.0 to 1.0)
+music_volume = DEFAULT_MUSIC_VOLUME  # Music volume (0.0 to 1.0)
 
 def handle_button(
     screen: pygame.Surface, 
@@ -28,7 +33,7 @@ def handle_button(
     """Handle button rendering, hover effects, and click detection. Returns True if clicked."""
     global hover_played_play, hover_played_settings, hover_played_back, hover_played_restart, hover_played_quit, hover_played_home
     
-    text_surf = font.render(text, True, "black")
+    text_surf = render_text(font, text, True, "black")
     text_rect = text_surf.get_rect(center=center_pos)
     button_box = text_rect.inflate(40, 18)
     
@@ -75,6 +80,7 @@ def handle_button(
             hover_played_home = False
     
     screen.blit(text_surf, text_rect)
+    dirty_rects.append(button_box)
     return False
 
 def handle_slider(
@@ -92,7 +98,7 @@ def handle_slider(
     knob_width = 16
     
     # Draw label
-    label_surf = font.render(label, True, "white")
+    label_surf = render_text(font, label, True, "white")
     screen.blit(label_surf, (pos[0] - 100, pos[1] - 30))
     
     # Draw slider track
@@ -116,44 +122,44 @@ def handle_slider(
     
     # Draw value percentage
     percentage_text = f"{int(new_value * 100)}%"
-    percentage_surf = font.render(percentage_text, True, "white")
-    screen.blit(percentage_surf, (pos[0] + slider_width + 20, pos[1]))
+    percentage_surf = render_text(font, percentage_text, True, "white")
+    dirty_rects.append(screen.blit(percentage_surf, (pos[0] + slider_width + 20, pos[1])))
+    dirty_rects.append(knob_rect.union(slider_rect))
     
     return new_value
 
+def take_dirty_rects() -> List[pygame.Rect]:
+    """Return and clear the areas the screens redrew with changing content since the last call."""
+    rects = dirty_rects[:]
+    dirty_rects.clear()
+    return rects
+
 def start_screen(
     screen: pygame.Surface,
-    walk_frames: List[pygame.Surface],
-    events: List[pygame.event.Event],
-    walk_frame_idx: int,
-    last_walk_frame_time: int,
-    walk_anim_delay: int
-) -> Tuple[str, int, int]:
+    walk: Animation,
+    events: List[pygame.event.Event]
+) -> str:
     screen.fill((30, 40, 80))  # Dark blue-purple color
-    title_font = pygame.font.Font("assets/font/PixeloidMono.ttf", 40)
-    title_surf = title_font.render("GANGSTER DINO", True, "white")
+    title_surf = render_text(get_font(40), "GANGSTER DINO", True, "white")
     title_rect = title_surf.get_rect(center=(400, 60))
     screen.blit(title_surf, title_rect)
 
-    now = pygame.time.get_ticks()
-    if now - last_walk_frame_time > walk_anim_delay:
-        walk_frame_idx = (walk_frame_idx + 1) % len(walk_frames)
-        last_walk_frame_time = now
-    walk_frame = walk_frames[walk_frame_idx]
+    walk_frame = walk.frame(pygame.time.get_ticks())
     walk_rect = walk_frame.get_rect(center=(400, 120))
     screen.blit(walk_frame, walk_rect)
+    dirty_rects.append(walk_rect)
 
-    button_font = pygame.font.Font("assets/font/PixeloidMono.ttf", 28)
+    button_font = get_font(28)
     mouse_pos = pygame.mouse.get_pos()
     clicked = any(event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 for event in events)
 
     if handle_button(screen, "PLAY", (400, 250), mouse_pos, clicked, "play", button_font):
-        return "game", walk_frame_idx, last_walk_frame_time
+        return "game"
     
     if handle_button(screen, "SETTINGS", (400, 320), mouse_pos, clicked, "settings", button_font):
-        return "settings", walk_frame_idx, last_walk_frame_time
+        return "settings"
 
-    return "start", walk_frame_idx, last_walk_frame_time
+    return "start"
 
 def settings_screen(
     screen: pygame.Surface,
@@ -164,12 +170,11 @@ def settings_screen(
     screen.fill((30, 40, 80))  # Dark blue-purple color
     
     # Title
-    title_font = pygame.font.Font("assets/font/PixeloidMono.ttf", 32)
-    title_surf = title_font.render("SETTINGS", True, "white")
+    title_surf = render_text(get_font(32), "SETTINGS", True, "white")
     title_rect = title_surf.get_rect(center=(400, 60))
     screen.blit(title_surf, title_rect)
     
-    font = pygame.font.Font("assets/font/PixeloidMono.ttf", 20)
+    font = get_font(20)
     mouse_pos = pygame.mouse.get_pos()
     mouse_pressed = pygame.mouse.get_pressed()[0]
     clicked = any(event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 for event in events)
@@ -178,11 +183,12 @@ def settings_screen(
     sfx_volume = handle_slider(screen, "Sound Effects", sfx_volume, (300, 150), mouse_pos, mouse_pressed, font)
     music_volume = handle_slider(screen, "Music", music_volume, (300, 220), mouse_pos, mouse_pressed, font)
     
-    # Update pygame mixer volumes
-    pygame.mixer.music.set_volume(music_volume)
+    # Update mixer volumes (only pushed to the mixer when a slider moved)
+    set_sound_volume(sfx_volume)
+    set_music_volume(music_volume)
     
     # Back button
-    button_font = pygame.font.Font("assets/font/PixeloidMono.ttf", 28)
+    button_font = get_font(28)
     if handle_button(screen, "BACK", (400, 350), mouse_pos, clicked, "back", button_font):
         return "start"
 
@@ -192,42 +198,36 @@ def end_screen(
     screen: pygame.Surface,
     score: int,
     events: List[pygame.event.Event],
-    walk_frames: List[pygame.Surface],
-    walk_frame_idx: int,
-    last_walk_frame_time: int,
-    walk_anim_delay: int,
+    walk: Animation,
     GAME_FONT: pygame.font.Font,
     SCREEN_FONT: pygame.font.Font
-) -> Tuple[Any, int, int]:
+) -> Any:
     screen.fill((30, 40, 80))  # Dark blue-purple color
 
-    title_surf = SCREEN_FONT.render("GAME OVER", True, "white")
+    title_surf = render_text(SCREEN_FONT, "GAME OVER", True, "white")
     title_rect = title_surf.get_rect(center=(400, 50))
     screen.blit(title_surf, title_rect)
 
-    score_surf = GAME_FONT.render(f"Score: {score}", True, "white")
+    score_surf = render_text(GAME_FONT, f"Score: {score}", True, "white")
     score_rect = score_surf.get_rect(center=(400, 90))
     screen.blit(score_surf, score_rect)
 
-    now = pygame.time.get_ticks()
-    if now - last_walk_frame_time > walk_anim_delay:
-        walk_frame_idx = (walk_frame_idx + 1) % len(walk_frames)
-        last_walk_frame_time = now
-    walk_frame = walk_frames[walk_frame_idx]
+    walk_frame = walk.frame(pygame.time.get_ticks())
     walk_rect = walk_frame.get_rect(center=(400, 140))
     screen.blit(walk_frame, walk_rect)
+    dirty_rects.append(walk_rect)
 
-    button_font = pygame.font.Font("assets/font/PixeloidMono.ttf", 28)
+    button_font = get_font(28)
     mouse_pos = pygame.mouse.get_pos()
     clicked = any(event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 for event in events)
 
     if handle_button(screen, "RESTART", (400, 250), mouse_pos, clicked, "restart", button_font):
-        return "restart", walk_frame_idx, last_walk_frame_time
+        return "restart"
     
     if handle_button(screen, "HOME", (330, 320), mouse_pos, clicked, "home", button_font):
-        return "home", walk_frame_idx, last_walk_frame_time
+        return "home"
     
     if handle_button(screen, "QUIT", (470, 320), mouse_pos, clicked, "quit", button_font):
-        return "quit", walk_frame_idx, last_walk_frame_time
+        return "quit"
 
-    return None, walk_frame_idx, last_walk_frame_time
\ No newline at end of file
+    return None
\ No newline at end of file
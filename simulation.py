@@ -0,0 +1,456 @@
+import pygame
+import random
+from typing import Dict, List, Optional, Tuple
+# Utility imports
+from animation_utils import Animation
+from car_utils import spawn_car, is_on_car, init_cars, explode_car, load_car_surfs
+from ammo_utils import manage_ammo_pickups
+from obstacle_utils import ObstacleQueue
+from entity_utils import EntityStore
+
+# Headless game logic - everything the main loop does except drawing, sound and input polling
+
+
+# CONSTANTS & CONFIG
+
+# Screen dimensions
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 400
+
+# Simulation clock - one step is one 60 FPS frame
+FPS = 60
+FRAME_MS = 1000 / FPS
+MAX_STEPS_PER_UPDATE = 5  # Catch up at most this many steps per drawn frame, then drop the backlog
+
+# Ground and physics settings
+GROUND_Y_DEFAULT = 365
+PLAYER_X = 80  # Horizontal centre of the player, who never moves sideways
+JUMP_GRAVITY_START_SPEED = -20
+
+# Scrolling and speed settings
+SCROLL_SPEED_START = 5.0
+SPEED_INCREMENT = 0.003
+MAX_SPEED = 15.0
+
+# Player and effect scaling
+PLAYER_SCALE = 1.3
+PLAYER_FRAME_SIZE = 128  # Size of one frame in the player sprite sheets
+EXPLOSION_SCALE = 0.35
+EXPLOSION_FRAME_SIZE = 680  # Size of one explosion image
+RUN_SPEED_START = 60 # ms delay between frames for running animation
+JUMP_SPEED = 50 # ms delay between frames for jumping animation
+SHOOT_SPEED = 15 # ms delay between frames for shooting animation
+RELOAD_SPEED = 30 # ms delay between frames for reload animation
+EXPLOSION_SPEED = 20  # ms delay between frames for explosion animation
+DEATH_SPEED = 100  # ms delay between frames for death animation
+DEATH_DISPLAY_TIME = 2000  # 2 seconds to display death before end screen
+
+# Number of frames in each player animation and in the explosion
+ANIM_FRAME_COUNTS = {"run": 10, "jump": 10, "shoot": 12, "reload": 6, "death": 5}
+EXPLOSION_FRAME_COUNT = 10
+
+
+def frame_steps(delay: float) -> int:
+    """Steps a frame stays up - it changes on the first step more than delay ms after it came up."""
+    return int(delay // FRAME_MS) + 1
+
+
+# Animation clips, timed in steps and shared by every game. The run speeds up with the scrolling,
+# see _update_animation()
+PLAYER_ANIMATIONS = {
+    "run": Animation.uniform(ANIM_FRAME_COUNTS["run"], frame_steps(RUN_SPEED_START)),
+    "jump": Animation.uniform(ANIM_FRAME_COUNTS["jump"], frame_steps(JUMP_SPEED), loop=False),
+    "shoot": Animation.uniform(ANIM_FRAME_COUNTS["shoot"], frame_steps(SHOOT_SPEED), loop=False),
+    "reload": Animation.uniform(ANIM_FRAME_COUNTS["reload"], frame_steps(RELOAD_SPEED), loop=False),
+    "death": Animation.uniform(ANIM_FRAME_COUNTS["death"], frame_steps(DEATH_SPEED), loop=False),
+}
+EXPLOSION_ANIMATION = Animation.uniform(EXPLOSION_FRAME_COUNT, frame_steps(EXPLOSION_SPEED), loop=False)
+
+# Hitbox settings
+HITBOX_OFFSET_X = int(34 * PLAYER_SCALE)
+HITBOX_OFFSET_Y = int(60 * PLAYER_SCALE)
+HITBOX_WIDTH = int(38 * PLAYER_SCALE)
+HITBOX_HEIGHT = int(68 * PLAYER_SCALE)
+
+# Car settings
+CAR_HITBOX_RIGHT_TRIM = 60 # Subtle trim off the back of car hitbox for smoother fall
+CAR_MIN_SPACING = 20 + CAR_HITBOX_RIGHT_TRIM
+CAR_MAX_SPACING = 800
+
+# Actions - bit flags so jump and shoot can be pressed on the same frame
+ACTION_NONE = 0
+ACTION_JUMP = 1
+ACTION_SHOOT = 2
+
+# Seeds are 0..SEED_RANGE - 1, so every seed fits the replay header
+SEED_RANGE = 2 ** 32
+
+
+class GameSimulation:
+    """
+    One game of Gangster Dino without a display.
+    Call step() once per frame with the pressed actions; it returns the names of the
+    events that happened that frame ("shot", "pickup", "reload", "explosion", "death", "game_over")
+    so the caller can play sounds or record stats.
+    """
+
+    def __init__(
+        self,
+        car_surfs: Optional[List[pygame.Surface]] = None,
+        player_size: Optional[Tuple[int, int]] = None,
+        explosion_size: Optional[Tuple[int, int]] = None,
+        scroll_speed_start: float = SCROLL_SPEED_START,
+        speed_increment: float = SPEED_INCREMENT,
+        max_speed: float = MAX_SPEED,
+        seed: Optional[int] = None,
+        car_masks: Optional[List[pygame.Mask]] = None,
+        player_masks: Optional[Dict[str, List[pygame.Mask]]] = None
+    ) -> None:
+        """
+        Pass car_masks (one per car surface) and player_masks (per animation, one per frame)
+        for pixel-perfect collisions, e.g. from AssetManager.get_masks().
+        """
+        # Only the sizes of the sprites matter here, so unconverted surfaces are fine
+        if car_surfs is None:
+            car_surfs = load_car_surfs(convert=False)
+        if player_size is None:
+            player_size = (int(PLAYER_FRAME_SIZE * PLAYER_SCALE),) * 2
+        if explosion_size is None:
+            explosion_size = (int(EXPLOSION_FRAME_SIZE * EXPLOSION_SCALE),) * 2
+
+        self.car_surfs = car_surfs
+        # Precise mode - hits found with the hitboxes are confirmed by checking the sprites' masks overlap
+        self.precise_collision = car_masks is not None and player_masks is not None
+        self.car_masks = dict(zip(car_surfs, car_masks)) if self.precise_collision else {}
+        self.player_masks = player_masks
+        self.scroll_speed_start = scroll_speed_start
+        self.speed_increment = speed_increment
+        self.max_speed = max_speed
+
+        self.player_rect = pygame.Rect((0, 0), player_size)
+        self.explosion_rect = pygame.Rect((0, 0), explosion_size)  # Where the latest explosion went off
+        self.explosions = EntityStore([EXPLOSION_ANIMATION])  # Explosions still playing, any number at once
+        self.cars = ObstacleQueue()  # Car hitboxes and sprites, left to right
+        self.ammo_pickups = ObstacleQueue()  # Rects for ammo pickups, left to right
+        # Every game draws cars and pickups from its own stream, so a seed fully determines the run
+        self.rng = random.Random()
+        self.reset(seed)
+
+    def reset(self, seed: Optional[int] = None) -> None:
+        """
+        Reset all game state for a new game. Without a seed a fresh one is picked, and it is kept
+        in self.seed so the run can be reproduced.
+        """
+        if seed is None:
+            seed = random.randrange(SEED_RANGE)
+        self.seed = seed
+        self.rng.seed(seed)
+
+        self.frame = 0
+        self.now = 0.0  # Simulated ms since the game started
+        self.is_playing = True
+        self.score = 0
+        self.distance_accumulator = 0
+        self.ground_y = GROUND_Y_DEFAULT
+        self.players_gravity_speed = 0
+        self.is_jumping = False
+        self.is_shooting = False
+        self.is_reloading = False
+        self.is_dying = False
+        self.shoot_start_time = 0.0
+        self.reload_start_time = 0.0
+        self.death_start_time = 0.0
+        self.scroll_speed = self.scroll_speed_start
+        self.scroll_offset = 0.0
+        self.scroll_step = 0
+        self.run_speed = RUN_SPEED_START
+        self.current_anim = "run"
+        self.anim_start = 0  # Step the current animation started on
+        self.frame_idx = 0
+        self.player_frame = ("run", 0)  # Animation and frame to draw this frame
+
+        # Explosion state
+        self.explosions.clear()
+        self.explosion_rect.center = (SCREEN_WIDTH // 2, GROUND_Y_DEFAULT)
+
+        # Ammo state
+        self.player_ammo = 0
+        self.ammo_used = 0
+        self.ammo_pickups.clear()
+
+        # Set by the collision check so callers can tell what killed the player, and where
+        self.death_car_rect: Optional[pygame.Rect] = None
+        self.death_hitbox_rect: Optional[pygame.Rect] = None
+
+        self.player_rect.midbottom = (PLAYER_X, self.ground_y)
+        init_cars(CAR_MIN_SPACING, CAR_MAX_SPACING, self.car_surfs, self.cars, rng=self.rng)
+
+    def get_hitbox_rect(self) -> pygame.Rect:
+        """Custom player hitbox within the frame."""
+        return pygame.Rect(
+            self.player_rect.left + HITBOX_OFFSET_X,
+            self.player_rect.top + HITBOX_OFFSET_Y,
+            HITBOX_WIDTH,
+            HITBOX_HEIGHT
+        )
+
+    def step(self, actions: int = ACTION_NONE) -> List[str]:
+        """
+        Advance the game by one frame. Returns the events that happened during it.
+        """
+        events = []
+        if not self.is_playing:
+            return events
+
+        self.frame += 1
+        self.now += FRAME_MS
+        now = self.now
+
+        # Handle controls (jumping, shooting)
+        if not self.is_dying:
+            if actions & ACTION_JUMP and self.player_rect.bottom >= self.ground_y and not self.is_jumping:
+                self._restart_animation()
+                self.players_gravity_speed = JUMP_GRAVITY_START_SPEED
+                self.is_jumping = True
+            if actions & ACTION_SHOOT:
+                if self.player_rect.bottom >= GROUND_Y_DEFAULT and not self.is_shooting and self.player_ammo > 0:
+                    self._restart_animation(keep_timer=True)
+                    self.is_shooting = True
+                    self.shoot_start_time = now
+                    self.player_ammo -= 1
+                    self.ammo_used += 1
+                    events.append("shot")
+
+        hitbox_rect = self.get_hitbox_rect()
+
+        # Only scroll if not dying
+        if not self.is_dying:
+            scroll_step = round(self.scroll_speed)  # Round to avoid rendering stutter
+            self.scroll_offset += scroll_step
+            self.distance_accumulator += scroll_step
+        else:
+            scroll_step = 0  # Stop all scrolling when dying
+        self.scroll_step = scroll_step
+
+        # Score logic based on distance traveled (only if not dying)
+        if self.distance_accumulator >= 100 and not self.is_dying:
+            self.score += 1
+            self.distance_accumulator = 0
+
+        self._update_cars(scroll_step)
+
+        self._update_pickups(hitbox_rect, scroll_step, events)
+        self._land_on_cars(hitbox_rect)
+
+        # Player falling logic
+        if self.player_rect.bottom > self.ground_y:
+            self.player_rect.bottom = self.ground_y
+            self.is_jumping = False
+        elif self.player_rect.bottom < self.ground_y and not self.is_dying:
+            self.is_jumping = True
+
+        self._update_animation(hitbox_rect, events)
+        self._update_explosion(scroll_step)
+
+        self._check_collision(hitbox_rect, events)
+
+        # Speed increment difficulty logic (only if not dying)
+        if self.scroll_speed < self.max_speed and not self.is_dying:
+            self.scroll_speed += self.speed_increment
+            self.run_speed -= self.speed_increment / 2 # make the run animation faster as speed increases
+
+        if not self.is_playing:
+            events.append("game_over")
+        return events
+
+    def _update_pickups(self, hitbox_rect: pygame.Rect, scroll_step: int, events: List[str]) -> None:
+        """Move, collect and respawn ammo pickups (only if not dying)."""
+        if not self.is_dying:
+            old_ammo = self.player_ammo
+            # Use hitbox_rect instead of player_rect for more accurate collision detection
+            self.player_ammo = manage_ammo_pickups(
+                self.ammo_pickups, self.cars, hitbox_rect, self.player_ammo, scroll_step, self.rng
+            )
+
+            if self.player_ammo > old_ammo:
+                events.append("pickup")
+
+            # Trigger reload animation if ammo was picked up
+            if self.player_ammo > old_ammo and not self.is_reloading and not self.is_shooting and not self.is_jumping:
+                self.is_reloading = True
+                self.reload_start_time = self.now
+                self._restart_animation(keep_timer=True)
+                events.append("reload")
+
+            # Safety check: remove any ammo that ended up under cars
+            remove_ammo_under_cars(self.ammo_pickups, self.cars)
+
+    def _land_on_cars(self, hitbox_rect: pygame.Rect) -> None:
+        """Player on car logic - stand the player on the car under them, if any (only if not dying)."""
+        self.ground_y = GROUND_Y_DEFAULT
+        if not self.is_dying:
+            # Only cars under the hitbox can be landed on, so look those up instead of checking every car
+            for car_rect in self.cars.overlapping(hitbox_rect.left, hitbox_rect.right):
+                if is_on_car(car_rect, hitbox_rect) and self.players_gravity_speed >= 0:
+                    self.player_rect.bottom = car_rect.top
+                    self.players_gravity_speed = 0
+                    self.is_jumping = False
+                    self.ground_y = car_rect.top
+                    break  # Player can only be on one car
+
+    def _check_collision(self, hitbox_rect: pygame.Rect, events: List[str]) -> None:
+        """Collision and game over - start the death animation if the player ran into a car."""
+        if not self.is_dying:
+            for i in range(*self.cars.overlap_range(hitbox_rect.left, hitbox_rect.right)):
+                car_rect = self.cars[i]
+                if (car_rect.colliderect(hitbox_rect) and not is_on_car(car_rect, hitbox_rect)
+                        and (not self.precise_collision or self._masks_overlap(self.cars.surf(i), car_rect))):
+                    self.is_dying = True
+                    self.death_start_time = self.now
+                    self.death_car_rect = car_rect.copy()
+                    self.death_hitbox_rect = hitbox_rect.copy()
+                    self._restart_animation()
+                    # Force player to fall to default ground level when dying
+                    self.ground_y = GROUND_Y_DEFAULT
+                    self.player_rect.bottom = GROUND_Y_DEFAULT
+                    self.is_jumping = False
+                    self.players_gravity_speed = 0
+                    events.append("death")
+                    break
+
+    def _masks_overlap(self, car_surf: pygame.Surface, car_rect: pygame.Rect) -> bool:
+        """Whether the player's current frame and a car's sprite share any solid pixel."""
+        anim, frame_idx = self.player_frame
+        player_mask = self.player_masks[anim][frame_idx]
+        offset = (car_rect.x - self.player_rect.x, car_rect.y - self.player_rect.y)
+        return player_mask.overlap(self.car_masks[car_surf], offset) is not None
+
+    def _update_cars(self, scroll_step: int) -> None:
+        """Move cars with the world, then retire off-screen cars and spawn replacements."""
+        # Cars stand still while dying
+        if self.is_dying:
+            return
+        cars = self.cars
+        cars.move(-scroll_step)
+
+        # Cars are sorted by x, so off-screen cars are always at the front
+        while cars and cars[0].right + CAR_HITBOX_RIGHT_TRIM <= 0:
+            cars.popleft()
+
+            # Spawn new car at a random distance from the previous one
+            last_x = cars[-1].right if cars else SCREEN_WIDTH
+            spawn_car(
+                last_x + self.rng.randint(CAR_MIN_SPACING, CAR_MAX_SPACING),
+                self.car_surfs,
+                cars,
+                GROUND_Y_DEFAULT,
+                CAR_HITBOX_RIGHT_TRIM,
+                self.rng
+            )
+
+    def _restart_animation(self, keep_timer: bool = False) -> None:
+        """
+        Go back to the first frame of the current animation. With keep_timer, the first frame counts
+        as shown since the current frame came up, so it may move on sooner (a quirk of the old
+        frame timer that replays depend on).
+        """
+        if keep_timer:
+            self.anim_start += PLAYER_ANIMATIONS[self.current_anim].frame_start(self.frame_idx)
+        else:
+            self.anim_start = self.frame
+        self.frame_idx = 0
+
+    def _update_animation(self, hitbox_rect: pygame.Rect, events: List[str]) -> None:
+        """Player animation state machine. Also ends the reload, fires the shot and finishes the game."""
+        now = self.now
+        new_anim = (
+            "death" if self.is_dying else "shoot" if self.is_shooting else "jump" if self.is_jumping
+            else "reload" if self.is_reloading else "run"
+        )
+        if new_anim != self.current_anim:
+            self.anim_start = self.frame
+            self.current_anim = new_anim
+            # Cancel reload if jumping, shooting, or dying takes priority
+            if self.current_anim in ["jump", "shoot", "death"] and self.is_reloading:
+                self.is_reloading = False
+
+        clip = PLAYER_ANIMATIONS[self.current_anim]
+        # Make the run animation faster as speed increases
+        speed = RUN_SPEED_START / self.run_speed if self.current_anim == "run" else 1.0
+        self.frame_idx = clip.frame_index(self.frame - self.anim_start, speed)
+        last_frame = len(clip) - 1
+
+        if self.current_anim == "death":
+            # Check if death animation is complete and enough time has passed
+            if self.frame_idx >= last_frame and now - self.death_start_time >= DEATH_DISPLAY_TIME:
+                self.is_playing = False
+
+        elif self.current_anim == "shoot":
+            # Trigger explosion when shooting animation shows fire
+            if self.frame_idx >= last_frame - 2:
+                explode_car(self.cars, self.car_surfs, self.explosion_rect, hitbox_rect, now, CAR_MIN_SPACING, CAR_MAX_SPACING, CAR_HITBOX_RIGHT_TRIM,
+                            rng=self.rng)
+                self.explosions.spawn(self.explosion_rect.x, self.explosion_rect.y, self.frame)
+                events.append("explosion")
+                self.is_shooting = False
+
+        elif self.current_anim == "reload":
+            # End reload animation when complete
+            if self.frame_idx >= last_frame:
+                self.is_reloading = False
+
+        elif self.current_anim == "jump":
+            # Only apply gravity if not dying
+            if not self.is_dying:
+                self.players_gravity_speed += 1
+                self.player_rect.y += self.players_gravity_speed
+
+        self.player_frame = (self.current_anim, self.frame_idx)
+
+    def _update_explosion(self, scroll_step: int) -> None:
+        """Explosion animation logic - scroll the explosions with the world and retire finished ones."""
+        # scroll_step is 0 while dying, so explosions stand still with everything else
+        self.explosions.move(-scroll_step)
+        self.explosions.expire(self.frame)
+
+
+class FixedTimestep:
+    """
+    Accumulates real elapsed time and hands out whole simulation steps, so the game runs at the
+    same speed whatever the render rate. alpha is how far the renderer is between the last two steps.
+    """
+
+    def __init__(self, step_ms: float = FRAME_MS, max_steps: int = MAX_STEPS_PER_UPDATE) -> None:
+        self.step_ms = step_ms
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+
+    def advance(self, elapsed_ms: float) -> int:
+        """Add elapsed real time and return how many steps to run now."""
+        self.accumulator += elapsed_ms
+        steps = int(self.accumulator // self.step_ms)
+        if steps > self.max_steps:
+            # Too far behind (window dragged, long stall) - skip ahead instead of fast-forwarding
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.step_ms
+        return steps
+
+    @property
+    def alpha(self) -> float:
+        return self.accumulator / self.step_ms
+
+    def reset(self) -> None:
+        self.accumulator = 0.0
+
+
+def remove_ammo_under_cars(ammo_pickups: ObstacleQueue, cars: ObstacleQueue) -> None:
+    """Remove any ammo pickups that are colliding with cars to catch edge cases."""
+    i = 0
+    while i < len(ammo_pickups):
+        pickup = ammo_pickups[i]
+        if pickup.collidelist(cars.overlapping(pickup.left, pickup.right)) != -1:
+            ammo_pickups.remove_at(i)
+            continue
+        i += 1
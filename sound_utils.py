@@ -1,131 +1,244 @@
+import hashlib
+import json
+import os
+import queue
+import struct
+import threading
 import pygame
+from typing import Dict, List, Optional
 
 # Sound and music management
-
-# Initialize pygame mixer
-if not pygame.mixer.get_init():
-    pygame.mixer.init()
-
-# Music state tracking
-menu_music_loaded = False
-game_music_loaded = False
-
-# Sound effects
-shot_sound = None
-explosion_sound = None
-reload_sound = None
-hover_sound = None
-click_sound = None
-death_sound = None
+# Nothing here blocks the main thread: sound effects are decoded on a background thread (and cached
+# as raw samples so later launches skip the MP3 decoding), and music is loaded by a music thread
+
+SOUND_EFFECTS_DIR = "assets/sound/sound_effects/"
+MENU_MUSIC = "assets/sound/music/menu_music.mp3"
+GAME_MUSIC = "assets/sound/music/game_music.mp3"
+
+# name: (file, channel pool, volume, whether the volume follows the sound effects slider)
+SOUND_EFFECTS = {
+    "shot": ("shot.mp3", "weapon", 0.7, False),
+    "reload": ("reload.mp3", "weapon", 0.6, False),
+    "explosion": ("explosion.mp3", "explosion", 1.0, False),
+    "hover": ("hover.wav", "ui", 1.0, True),
+    "click": ("click.wav", "ui", 1.0, True),
+    "death": ("death.mp3", "player", 0.8, True),
+}
+# Channels reserved for each pool, so a burst of one kind of sound never cuts off another kind
+CHANNEL_POOLS = {"weapon": 2, "explosion": 2, "ui": 2, "player": 1}
+
+DEFAULT_SFX_VOLUME = 0.7
+DEFAULT_MUSIC_VOLUME = 0.5
+
+SOUND_CACHE_PATH = ".cache/sounds.bin"
+SOUND_CACHE_MAGIC = b"DINOSNDS"
+SOUND_CACHE_VERSION = 1
+# magic, version, cache key, index length
+SOUND_CACHE_HEADER_FORMAT = "<8sH32sI"
+
+# Music state tracking - the music thread does the loading, see _music_worker()
+current_music: Optional[str] = None
+_music_requests: "queue.Queue[Optional[str]]" = queue.Queue()
+_music_thread: Optional[threading.Thread] = None
+
+# Sound effects, filled in by load_sound_effects()
+sounds: Dict[str, pygame.mixer.Sound] = {}
+channel_pools: Dict[str, List[pygame.mixer.Channel]] = {}
+_next_channel: Dict[str, int] = {}
+
+# Volumes as last pushed to the mixer, so unchanged values are never pushed again
+sfx_volume = DEFAULT_SFX_VOLUME
+music_volume = DEFAULT_MUSIC_VOLUME
+# Held while the slider volume is applied, so sounds published by the loader never miss a change
+_sfx_volume_lock = threading.Lock()
+
+def init_mixer():
+    """Open the audio device if pygame.init() couldn't, and set the default music volume."""
+    try:
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+    except pygame.error as e:
+        print(f"Warning: Could not open audio device: {e}")
+        return
+    pygame.mixer.music.set_volume(music_volume)
+
+def sound_cache_key() -> bytes:
+    """Hash of the mixer's sample format and the sound files, since the cache holds converted samples."""
+    digest = hashlib.sha256(f"{SOUND_CACHE_VERSION}:{pygame.mixer.get_init()}:{json.dumps(SOUND_EFFECTS, sort_keys=True)}".encode())
+    for file_name, _, _, _ in SOUND_EFFECTS.values():
+        stat = os.stat(SOUND_EFFECTS_DIR + file_name)
+        digest.update(f"{file_name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.digest()
+
+def read_sound_cache(key: bytes) -> Optional[Dict[str, bytes]]:
+    """Raw samples of every sound effect from the cache file, or None if it is missing or stale."""
+    try:
+        with open(SOUND_CACHE_PATH, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    header_size = struct.calcsize(SOUND_CACHE_HEADER_FORMAT)
+    if len(data) < header_size:
+        return None
+    magic, version, cache_key, index_length = struct.unpack_from(SOUND_CACHE_HEADER_FORMAT, data)
+    if (magic, version, cache_key) != (SOUND_CACHE_MAGIC, SOUND_CACHE_VERSION, key):
+        return None
+    index = json.loads(data[header_size:header_size + index_length])
+    samples = memoryview(data)[header_size + index_length:]
+    return {name: samples[start:start + length] for name, (start, length) in index.items()}
+
+def write_sound_cache(key: bytes, raw_sounds: Dict[str, bytes]) -> None:
+    index = {}
+    offset = 0
+    for name, raw in raw_sounds.items():
+        index[name] = [offset, len(raw)]
+        offset += len(raw)
+    index_data = json.dumps(index).encode()
+    os.makedirs(os.path.dirname(SOUND_CACHE_PATH), exist_ok=True)
+    tmp_path = SOUND_CACHE_PATH + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(struct.pack(SOUND_CACHE_HEADER_FORMAT, SOUND_CACHE_MAGIC, SOUND_CACHE_VERSION, key, len(index_data)))
+        f.write(index_data)
+        for raw in raw_sounds.values():
+            f.write(raw)
+    os.replace(tmp_path, SOUND_CACHE_PATH)  # Never leave a half-written cache behind
 
 def load_sound_effects():
-    """Load all sound effects into memory."""
-    global shot_sound, explosion_sound, reload_sound, hover_sound, click_sound, death_sound
-    
+    """
+    Load all sound effects into memory and reserve their channels. Decoding is slow, so main.py
+    does this in the background; the decoded samples are cached so the next launch only reads them.
+    """
+    global sounds
+    if not pygame.mixer.get_init():
+        print("Warning: Could not load sound effects: no audio device")
+        return
     try:
-        shot_sound = pygame.mixer.Sound("assets/sound/sound_effects/shot.mp3")
-        explosion_sound = pygame.mixer.Sound("assets/sound/sound_effects/explosion.mp3")
-        reload_sound = pygame.mixer.Sound("assets/sound/sound_effects/reload.mp3")
-        hover_sound = pygame.mixer.Sound("assets/sound/sound_effects/hover.wav")
-        click_sound = pygame.mixer.Sound("assets/sound/sound_effects/click.wav")
-        death_sound = pygame.mixer.Sound("assets/sound/sound_effects/death.mp3")
-        
-        # Set volumes for sound effects
-        shot_sound.set_volume(0.7)
-        explosion_sound.set_volume(1.0)
-        reload_sound.set_volume(0.6)
-        hover_sound.set_volume(0.4)
-        click_sound.set_volume(0.5)
-        death_sound.set_volume(0.8)
-        
-    except pygame.error as e:
+        key = sound_cache_key()
+        raw_sounds = read_sound_cache(key)
+        if raw_sounds is not None:
+            loaded = {name: pygame.mixer.Sound(buffer=raw) for name, raw in raw_sounds.items()}
+        else:
+            loaded = {
+                name: pygame.mixer.Sound(SOUND_EFFECTS_DIR + file_name)
+                for name, (file_name, _, _, _) in SOUND_EFFECTS.items()
+            }
+            write_sound_cache(key, {name: sound.get_raw() for name, sound in loaded.items()})
+    except (pygame.error, OSError) as e:
         print(f"Warning: Could not load sound effect: {e}")
+        return
+
+    reserve_channels()
+    with _sfx_volume_lock:
+        for name, sound in loaded.items():
+            _, _, volume, follows_slider = SOUND_EFFECTS[name]
+            sound.set_volume(volume * sfx_volume if follows_slider else volume)
+        sounds = loaded  # Published last, so a sound is only played once it is fully set up
+
+def reserve_channels():
+    """Set aside CHANNEL_POOLS channels; sounds played without a channel never take these."""
+    reserved = sum(CHANNEL_POOLS.values())
+    pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), reserved + 4))
+    pygame.mixer.set_reserved(reserved)
+    first = 0
+    for pool, size in CHANNEL_POOLS.items():
+        channel_pools[pool] = [pygame.mixer.Channel(i) for i in range(first, first + size)]
+        _next_channel[pool] = 0
+        first += size
+
+def play_sound(name):
+    """Play a sound effect on a free channel of its pool, cutting off the oldest one if all are busy."""
+    sound = sounds.get(name)
+    if sound is None:
+        return  # Still loading
+    pool_name = SOUND_EFFECTS[name][1]
+    pool = channel_pools[pool_name]
+    for channel in pool:
+        if not channel.get_busy():
+            channel.play(sound)
+            return
+    # Channels are taken in turn, so the next one is the one that started playing longest ago
+    i = _next_channel[pool_name]
+    pool[i].play(sound)
+    _next_channel[pool_name] = (i + 1) % len(pool)
+
+def _music_worker():
+    """Load and start music off the main thread. None stops the music."""
+    while True:
+        path = _music_requests.get()
+        # Only the latest request matters if several piled up
+        while not _music_requests.empty():
+            path = _music_requests.get()
+        try:
+            if path is None:
+                pygame.mixer.music.stop()
+            else:
+                pygame.mixer.music.load(path)
+                pygame.mixer.music.play(-1)  # Loop indefinitely
+        except (pygame.error, OSError) as e:
+            print(f"Warning: Could not load music: {e}")
+
+def request_music(path):
+    """Ask the music thread to switch to a track (or stop, for None) unless it already has."""
+    global current_music, _music_thread
+    if path == current_music or not pygame.mixer.get_init():  # No music without an audio device
+        return
+    current_music = path
+    if _music_thread is None:
+        _music_thread = threading.Thread(target=_music_worker, name="music", daemon=True)
+        _music_thread.start()
+    _music_requests.put(path)
 
 def load_menu_music():
     """Load and play menu music if not already playing."""
-    global menu_music_loaded, game_music_loaded
-    if not menu_music_loaded:
-        try:
-            pygame.mixer.music.load("assets/sound/music/menu_music.mp3")
-            pygame.mixer.music.play(-1)  # Loop indefinitely
-            menu_music_loaded = True
-            game_music_loaded = False
-        except pygame.error as e:
-            print(f"Warning: Could not load menu music: {e}")
+    request_music(MENU_MUSIC)
 
 def load_game_music():
     """Load and play game music if not already playing."""
-    global menu_music_loaded, game_music_loaded
-    if not game_music_loaded:
-        try:
-            pygame.mixer.music.load("assets/sound/music/game_music.mp3")
-            pygame.mixer.music.play(-1)  # Loop indefinitely
-            game_music_loaded = True
-            menu_music_loaded = False
-        except pygame.error as e:
-            print(f"Warning: Could not load game music: {e}")
+    request_music(GAME_MUSIC)
 
 def play_shot_sound():
     """Play the shooting sound effect."""
-    if shot_sound:
-        shot_sound.play()
+    play_sound("shot")
 
 def play_explosion_sound():
     """Play the explosion sound effect."""
-    if explosion_sound:
-        explosion_sound.play()
+    play_sound("explosion")
 
 def play_reload_sound():
     """Play the reload/ammo pickup sound effect."""
-    if reload_sound:
-        reload_sound.play()
+    play_sound("reload")
 
 def play_hover_sound():
-    from screens import sfx_volume
-    if hover_sound:
-        hover_sound.set_volume(sfx_volume)
-        hover_sound.play()
+    play_sound("hover")
 
 def play_click_sound():
-    from screens import sfx_volume
-    if click_sound:
-        click_sound.set_volume(sfx_volume)
-        click_sound.play()
+    play_sound("click")
 
 def play_death_sound():
     """Play the death sound effect."""
-    from screens import sfx_volume
-    if death_sound:
-        death_sound.set_volume(sfx_volume * 0.8)
-        death_sound.play()
+    play_sound("death")
 
 def stop_music():
     """Stop all music playback."""
-    global menu_music_loaded, game_music_loaded
-    pygame.mixer.music.stop()
-    menu_music_loaded = False
-    game_music_loaded = False
+    request_music(None)
 
 def set_music_volume(volume):
-    """Set the music volume (0.0 to 1.0)."""
-    pygame.mixer.music.set_volume(max(0.0, min(1.0, volume)))
+    """Set the music volume (0.0 to 1.0). Cheap to call every frame - the mixer only hears about changes."""
+    global music_volume
+    volume = max(0.0, min(1.0, volume))
+    if volume != music_volume and pygame.mixer.get_init():
+        pygame.mixer.music.set_volume(volume)
+        music_volume = volume
 
 def set_sound_volume(volume):
-    """Set the volume for all sound effects (0.0 to 1.0)."""
+    """Set the sound effects slider volume (0.0 to 1.0). Like set_music_volume, only changes are pushed."""
+    global sfx_volume
     volume = max(0.0, min(1.0, volume))
-    if shot_sound:
-        shot_sound.set_volume(volume * 0.7)
-    if explosion_sound:
-        explosion_sound.set_volume(volume * 0.8)
-    if reload_sound:
-        reload_sound.set_volume(volume * 0.6)
-    if hover_sound:
-        hover_sound.set_volume(volume * 0.4)
-    if click_sound:
-        click_sound.set_volume(volume * 0.5)
-    if death_sound:
-        death_sound.set_volume(volume * 0.8)
-
-# Initialize sound effects and set default music volume
-load_sound_effects()
-pygame.mixer.music.set_volume(0.5)
\ No newline at end of file
+    with _sfx_volume_lock:
+        if volume == sfx_volume:
+            return
+        sfx_volume = volume
+        for name, sound in sounds.items():
+            _, _, base_volume, follows_slider = SOUND_EFFECTS[name]
+            if follows_slider:
+                sound.set_volume(base_volume * volume)
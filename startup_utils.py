@@ -0,0 +1,81 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Tuple
+
+# Startup timing - the stages of getting the first frame on screen, and the work that
+# continues in the background after it
+
+
+class StartupTimer:
+    """
+    Records how long each startup stage takes, measured from start (a time.perf_counter() value).
+    stage() times work on the critical path; background() runs work on a daemon thread and
+    times it there, so the first frame never waits for it.
+    """
+
+    def __init__(self, start: Optional[float] = None) -> None:
+        self.start = start if start is not None else time.perf_counter()
+        self.stages: List[Tuple[str, float, float, bool]] = []  # (name, start, end, background) in seconds
+        self.first_frame: Optional[float] = None
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, start, time.perf_counter(), False)
+
+    def add(self, name: str, start: float) -> None:
+        """Record a stage that started at start and ends now."""
+        self._record(name, start, time.perf_counter(), False)
+
+    def background(self, name: str, fn: Callable[[], object]) -> threading.Thread:
+        """Run fn on a daemon thread and record how long it took."""
+        def run() -> None:
+            start = time.perf_counter()
+            try:
+                fn()
+            finally:
+                self._record(name, start, time.perf_counter(), True)
+
+        thread = threading.Thread(target=run, name=f"startup-{name}", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        return thread
+
+    def frame_shown(self) -> None:
+        """Mark the first frame as presented."""
+        if self.first_frame is None:
+            self.first_frame = time.perf_counter()
+
+    def finished(self) -> bool:
+        """Whether the first frame is up and all background stages are done."""
+        return self.first_frame is not None and not any(thread.is_alive() for thread in self._threads)
+
+    def report(self) -> str:
+        """A table of the stages in ms: the critical path up to the first frame, then background work."""
+        def row(name: str, took: str, end: float) -> str:
+            return f"  {name:<16}{took:>8}{(end - self.start) * 1000:9.1f}"
+
+        with self._lock:
+            stages = sorted(self.stages, key=lambda stage: stage[1])
+        lines = [f"{'startup (ms)':<18}{'took':>8}{'done at':>9}"]
+        for name, start, end, background in stages:
+            if not background:
+                lines.append(row(name, f"{(end - start) * 1000:.1f}", end))
+        if self.first_frame is not None:
+            lines.append(row("first frame", "", self.first_frame))
+        background_stages = [stage for stage in stages if stage[3]]
+        if background_stages:
+            lines.append("background:")
+            for name, start, end, _ in background_stages:
+                lines.append(row(name, f"{(end - start) * 1000:.1f}", end))
+        return "\n".join(lines)
+
+    def _record(self, name: str, start: float, end: float, background: bool) -> None:
+        with self._lock:
+            self.stages.append((name, start, end, background))
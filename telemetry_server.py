@@ -0,0 +1,203 @@
+import argparse
+import json
+import socketserver
+import statistics
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Tuple
+
+# A small telemetry collector for testing, standing in for the real aggregation service.
+# Takes the batches sent by telemetry_utils.Telemetry over UDP and HTTP (or reads a telemetry
+# file), and keeps running totals:
+#
+#     python telemetry_server.py                        # udp://127.0.0.1:8765 and http://127.0.0.1:8765/
+#     python main.py --telemetry udp://127.0.0.1:8765
+#     curl http://127.0.0.1:8765/summary
+#     python telemetry_server.py --file telemetry.jsonl
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765  # The same number for UDP and HTTP
+DEATH_BIN = 10  # Death positions are grouped into 10 px squares
+TOP_DEATH_SPOTS = 5
+MAX_DATAGRAM = 65507
+
+
+def hist_percentile(hist: Counter, q: float) -> int:
+    """The bin below which q of the counts fall, for a Counter of bin -> count."""
+    total = sum(hist.values())
+    seen = 0
+    for value in sorted(hist):
+        seen += hist[value]
+        if seen >= q * total:
+            return value
+    return 0
+
+
+class TelemetryAggregator:
+    """Running totals over every batch added, safe to feed from several server threads."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.sources: Dict[Tuple[str, int], int] = {}  # (host, pid) -> next expected seq
+        self.missing = 0  # Batches skipped in some source's sequence
+        self.scores: List[int] = []
+        self.frames: List[int] = []
+        self.runs_started = 0
+        self.shots = 0
+        self.pickups = 0
+        self.deaths: Counter = Counter()  # (x, y) bin from the car's top-left -> deaths
+        self.frame_ms: Counter = Counter()
+
+    def add(self, batch: Dict[str, Any]) -> None:
+        """Add a batch. Raises KeyError, TypeError or ValueError for a malformed one, leaving the totals as they were."""
+        # Read everything first, so a bad field cannot leave the totals half updated
+        source = (str(batch["host"]), int(batch["pid"]))
+        seq = int(batch["seq"])
+        frame_ms = [(int(ms), int(count)) for ms, count in batch["frame_ms"].items()]
+        events = []  # (kind, score or x, steps or y)
+        for event in batch["events"]:
+            kind = event["event"]
+            if kind == "run_end":
+                events.append((kind, int(event["score"]), int(event["frame"])))
+            elif kind == "death":
+                events.append((kind, int(event["x"]) // DEATH_BIN * DEATH_BIN, int(event["y"]) // DEATH_BIN * DEATH_BIN))
+            else:
+                events.append((kind, 0, 0))
+
+        with self._lock:
+            self.batches += 1
+            expected = self.sources.get(source, 0)
+            self.missing += max(seq - expected, 0)
+            self.sources[source] = max(expected, seq + 1)
+            for ms, count in frame_ms:
+                self.frame_ms[ms] += count
+            for kind, first, second in events:
+                if kind == "run_start":
+                    self.runs_started += 1
+                elif kind == "run_end":
+                    self.scores.append(first)
+                    self.frames.append(second)
+                elif kind == "shot":
+                    self.shots += 1
+                elif kind == "pickup":
+                    self.pickups += 1
+                elif kind == "death":
+                    self.deaths[(first, second)] += 1
+
+    def add_lines(self, lines: Iterable[bytes]) -> int:
+        """Add one batch per line, skipping malformed ones. Returns how many were skipped."""
+        return sum(not add_safely(self, line) for line in lines if line.strip())
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            runs = len(self.scores)
+            return {
+                "batches": self.batches,
+                "sources": len(self.sources),
+                "missing_batches": self.missing,
+                "runs_started": self.runs_started,
+                "runs_finished": runs,
+                "score_mean": round(statistics.fmean(self.scores), 1) if runs else None,
+                "score_max": max(self.scores, default=None),
+                "steps_median": statistics.median(self.frames) if runs else None,
+                "shots_per_run": round(self.shots / runs, 2) if runs else None,
+                "pickups_per_run": round(self.pickups / runs, 2) if runs else None,
+                # Hitbox position relative to the car's top-left corner, in DEATH_BIN px squares
+                "death_spots": [
+                    {"x": x, "y": y, "deaths": count} for (x, y), count in self.deaths.most_common(TOP_DEATH_SPOTS)
+                ],
+                "frames": sum(self.frame_ms.values()),
+                "frame_ms_p50": hist_percentile(self.frame_ms, 0.5),
+                "frame_ms_p99": hist_percentile(self.frame_ms, 0.99),
+                "frame_ms_max_bin": max(self.frame_ms, default=None),
+            }
+
+
+def add_safely(aggregator: TelemetryAggregator, data: bytes) -> bool:
+    """Add one JSON-encoded batch, or warn and skip it if it is malformed."""
+    try:
+        aggregator.add(json.loads(data))
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        print(f"Warning: Ignored a malformed telemetry batch: {e}")
+        return False
+    return True
+
+
+def make_udp_server(aggregator: TelemetryAggregator, host: str, port: int) -> socketserver.UDPServer:
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self) -> None:
+            add_safely(aggregator, self.request[0])
+
+    server = socketserver.UDPServer((host, port), Handler)
+    server.max_packet_size = MAX_DATAGRAM
+    return server
+
+
+def make_http_server(aggregator: TelemetryAggregator, host: str, port: int) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            data = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self.send_response(204 if add_safely(aggregator, data) else 400)
+            self.end_headers()
+
+        def do_GET(self) -> None:
+            if self.path != "/summary":
+                self.send_error(404)
+                return
+            body = json.dumps(aggregator.summary(), indent=2).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass  # One line per batch would drown the summaries
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    return (f"{summary['runs_finished']} runs from {summary['sources']} sources, mean score {summary['score_mean']}, "
+            f"frame time p50 {summary['frame_ms_p50']} ms p99 {summary['frame_ms_p99']} ms, "
+            f"{summary['missing_batches']} batches missing")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Collect telemetry batches and print running totals.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="UDP and HTTP port")
+    parser.add_argument("--file", nargs="+", default=None, help="summarize telemetry files instead of listening")
+    parser.add_argument("--interval", type=float, default=10.0, help="seconds between printed summaries")
+    args = parser.parse_args()
+
+    aggregator = TelemetryAggregator()
+    if args.file:
+        for path in args.file:
+            with open(path, "rb") as f:
+                aggregator.add_lines(f)
+        print(json.dumps(aggregator.summary(), indent=2))
+        return
+
+    udp_server = make_udp_server(aggregator, args.host, args.port)
+    http_server = make_http_server(aggregator, args.host, args.port)
+    for server in (udp_server, http_server):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Listening on udp://{args.host}:{args.port} and http://{args.host}:{args.port}/ (summary at /summary)")
+    try:
+        while True:
+            time.sleep(args.interval)
+            print(format_summary(aggregator.summary()))
+    except KeyboardInterrupt:
+        pass
+    udp_server.shutdown()
+    http_server.shutdown()
+    print(json.dumps(aggregator.summary(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+import http.client
+import json
+import os
+import queue
+import socket
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+# Utility imports
+from simulation import GameSimulation
+
+# Field telemetry - runs, deaths, shots, pickups and frame times, for kiosks we cannot watch.
+# The main loop only appends to the current batch and bumps a histogram counter; a sender
+# thread encodes finished batches and hands them to a sink, dropping them rather than waiting
+# when the sink is slow or gone
+
+
+BATCH_SECONDS = 5.0  # A batch is sent at least this often while frames are drawn
+BATCH_EVENTS = 128  # ...or once it holds this many events, keeping UDP datagrams well under 64 KB
+SEND_QUEUE_BATCHES = 32  # Batches waiting for the sender before new ones are dropped
+FRAME_HIST_MAX_MS = 100  # Frame times are counted in 1 ms bins, the last one for anything longer
+HTTP_TIMEOUT = 2.0  # Seconds the sender waits on an HTTP sink
+CLOSE_TIMEOUT = 3.0  # Seconds close() waits for the sender before giving up on what is queued
+
+
+class TelemetrySink(ABC):
+    """Where batches go: send() takes one JSON-encoded batch. Only ever used from the sender thread."""
+
+    @abstractmethod
+    def send(self, data: bytes) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+class FileSink(TelemetrySink):
+    """Appends one batch per line. Each batch is a single append, so instances can share the file."""
+
+    def __init__(self, path: str) -> None:
+        self.fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def send(self, data: bytes) -> None:
+        os.write(self.fd, data + b"\n")
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class UdpSink(TelemetrySink):
+    """One datagram per batch, from a non-blocking socket - a full send buffer drops the batch."""
+
+    def __init__(self, host: str, port: int) -> None:
+        self.address = (host, port)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+
+    def send(self, data: bytes) -> None:
+        self.sock.sendto(data, self.address)
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+class HttpSink(TelemetrySink):
+    """POSTs each batch over a kept-alive connection, reconnecting after errors."""
+
+    def __init__(self, host: str, port: int, path: str) -> None:
+        self.host, self.port, self.path = host, port, path or "/"
+        self.conn: Optional[http.client.HTTPConnection] = None
+
+    def send(self, data: bytes) -> None:
+        if self.conn is None:
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=HTTP_TIMEOUT)
+        try:
+            self.conn.request("POST", self.path, data, {"Content-Type": "application/json"})
+            response = self.conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+        if response.status >= 300:
+            raise OSError(f"HTTP {response.status} from {self.host}:{self.port}{self.path}")
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def open_sink(url: str) -> TelemetrySink:
+    """A sink for a file path (or file://PATH), udp://HOST:PORT or http://HOST:PORT/PATH."""
+    parts = urlsplit(url)
+    if parts.scheme in ("", "file"):
+        return FileSink(parts.path if parts.scheme else url)
+    if parts.scheme == "udp" and parts.port:
+        return UdpSink(parts.hostname, parts.port)
+    if parts.scheme == "http" and parts.port:
+        return HttpSink(parts.hostname, parts.port, parts.path)
+    raise ValueError(f"unknown telemetry sink {url!r}, expected a file, udp://HOST:PORT or http://HOST:PORT/PATH")
+
+
+class Telemetry:
+    """
+    Collects telemetry from the main loop and sends it to sink (see open_sink()) in batches.
+    Call record_step() with the events of every simulation step and record_frame() with
+    every frame's time. Does nothing when sink is None, so it can stay wired in for normal play.
+    Call close() before exiting to send what is left.
+    """
+
+    def __init__(self, sink: Optional[str] = None) -> None:
+        self.enabled = sink is not None
+        self.sent = 0
+        self.dropped = 0  # Batches the sender had no room for
+        self.failed = 0  # Batches the sink did not take
+        if not self.enabled:
+            return
+        self._sink = open_sink(sink)
+        self._source = {"host": socket.gethostname(), "pid": os.getpid()}
+        self._events: List[Dict[str, Any]] = []
+        self._frame_hist = [0] * (FRAME_HIST_MAX_MS + 1)
+        self._batch_start = time.monotonic()
+        self._seq = 0
+        self._pending: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(SEND_QUEUE_BATCHES)
+        self._failing = False  # Only the first of a run of failures is reported
+        self._thread = threading.Thread(target=self._send_batches, name="telemetry-sender", daemon=True)
+        self._thread.start()
+
+    def record_step(self, sim: GameSimulation, game_events: List[str]) -> None:
+        """Record a simulation step that just ran and the events it returned."""
+        if not self.enabled:
+            return
+        if sim.frame == 1:
+            self._event("run_start", sim, seed=sim.seed)
+        for game_event in game_events:
+            if game_event == "shot":
+                self._event("shot", sim, ammo=sim.player_ammo)
+            elif game_event == "pickup":
+                self._event("pickup", sim, ammo=sim.player_ammo)
+            elif game_event == "death":
+                car, hitbox = sim.death_car_rect, sim.death_hitbox_rect
+                # Where the player's hitbox was, from the top-left corner of the car it hit
+                self._event("death", sim, x=hitbox.x - car.x, y=hitbox.y - car.y, car_width=car.width, speed=round(sim.scroll_speed, 2))
+            elif game_event == "game_over":
+                self._event("run_end", sim, seed=sim.seed, ammo_used=sim.ammo_used)
+
+    def record_frame(self, frame_ms: float) -> None:
+        """Count a frame's time, and start sending the batch when it is due."""
+        if not self.enabled:
+            return
+        self._frame_hist[min(int(frame_ms), FRAME_HIST_MAX_MS)] += 1
+        if time.monotonic() - self._batch_start >= BATCH_SECONDS:
+            self._send_batch()
+
+    def close(self) -> None:
+        """
+        Send the current batch and whatever is queued, then stop the sender. Waits at most about
+        CLOSE_TIMEOUT for a slow sink, then leaves the rest to be dropped when the process exits.
+        """
+        if not self.enabled:
+            return
+        self._send_batch()
+        deadline = time.monotonic() + CLOSE_TIMEOUT
+        stop_queued = True
+        try:
+            self._pending.put(None, timeout=CLOSE_TIMEOUT)
+        except queue.Full:
+            stop_queued = False  # The sender is stuck
+        self._thread.join(max(deadline - time.monotonic(), 0))
+        if self._thread.is_alive():
+            self.dropped += self._pending.qsize() - stop_queued  # Never sent
+            return
+        self._sink.close()
+
+    def summary(self) -> str:
+        return f"Telemetry: sent {self.sent} batches ({self.dropped} dropped, {self.failed} failed)"
+
+    def _event(self, kind: str, sim: GameSimulation, **fields: Any) -> None:
+        fields.update(event=kind, time=time.time(), frame=sim.frame, score=sim.score)
+        self._events.append(fields)
+        if len(self._events) >= BATCH_EVENTS:
+            self._send_batch()
+
+    def _send_batch(self) -> None:
+        # Only swaps in fresh containers - encoding happens on the sender thread
+        batch = {
+            **self._source, "seq": self._seq, "start": time.time() - (time.monotonic() - self._batch_start),
+            "events": self._events, "frame_ms": self._frame_hist,
+        }
+        self._seq += 1
+        self._events = []
+        self._frame_hist = [0] * (FRAME_HIST_MAX_MS + 1)
+        self._batch_start = time.monotonic()
+        try:
+            self._pending.put_nowait(batch)
+        except queue.Full:
+            self.dropped += 1
+
+    def _send_batches(self) -> None:
+        while True:
+            batch = self._pending.get()
+            if batch is None:
+                return
+            # Only the bins that were used, as {"ms": count}
+            batch["frame_ms"] = {str(ms): count for ms, count in enumerate(batch["frame_ms"]) if count}
+            try:
+                self._sink.send(json.dumps(batch, separators=(",", ":")).encode())
+            except Exception as e:
+                # Anything a sink raises only loses this batch - the sender must keep running
+                self.failed += 1
+                if not self._failing:
+                    print(f"Warning: Could not send telemetry, dropping batches until it works again: {e}")
+                self._failing = True
+                continue
+            self._failing = False
+            self.sent += 1
@@ -0,0 +1,11 @@
+# Utility imports
+from atlas_utils import ASSET_RECIPES, open_atlas
+
+
+def test_atlas_that_cannot_be_saved_is_used_from_memory(tmp_path, capsys):
+    blocker = tmp_path / "not_a_directory"
+    blocker.write_text("")
+    index, width, pixels = open_atlas(str(blocker / "atlas.bin"))
+    assert set(index) == set(ASSET_RECIPES)
+    assert len(pixels) % (width * 4) == 0
+    assert "Could not save the sprite atlas" in capsys.readouterr().out
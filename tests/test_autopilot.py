@@ -0,0 +1,29 @@
+import pytest
+# Utility imports
+from autopilot import Autopilot
+from simulation import GameSimulation, ACTION_NONE, ACTION_JUMP, ACTION_SHOOT
+
+MAX_STEPS = 20000
+
+
+def play(seed: int, autopilot=None) -> GameSimulation:
+    sim = GameSimulation(seed=seed)
+    while sim.is_playing and sim.frame < MAX_STEPS:
+        actions = autopilot.act(sim) if autopilot is not None else ACTION_NONE
+        assert actions & ~(ACTION_JUMP | ACTION_SHOOT) == 0
+        sim.step(actions)
+    return sim
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_autopilot_outlasts_standing_still(seed):
+    idle = play(seed)
+    autopilot = play(seed, Autopilot())
+    # Standing still dies at the first car, a few seconds in; the autopilot plays for minutes
+    assert autopilot.frame > 10 * idle.frame
+    assert autopilot.score > idle.score
+
+
+def test_autopilot_plays_the_same_game_every_time():
+    first, second = play(5, Autopilot()), play(5, Autopilot())
+    assert (first.frame, first.score, first.ammo_used) == (second.frame, second.score, second.ammo_used)
@@ -0,0 +1,143 @@
+import random
+import numpy as np
+# Utility imports
+from batch_simulation import BatchSimulation, NUM_CARS, NUM_PICKUPS
+from ammo_utils import AMMO_PICKUP_WIDTH
+from car_utils import load_car_surfs
+from simulation import GameSimulation, GROUND_Y_DEFAULT, ACTION_NONE, ACTION_JUMP, ACTION_SHOOT
+
+# The batch simulator draws its spawns from one NumPy stream, so games only match GameSimulation
+# while they play on the cars both started with. Each batch game is given the starting cars of a
+# seeded GameSimulation and both are stepped with the same inputs until that layout runs out.
+
+SEEDS = range(60)
+JUMP_CHANCE = 0.04
+SHOOT_CHANCE = 0.03
+SYNCED_STEPS = 2000
+
+
+def copy_layout(sim: GameSimulation, batch: BatchSimulation, g: int) -> None:
+    """Give batch game g the cars and pickups of sim."""
+    assert len(sim.cars) == NUM_CARS and len(sim.ammo_pickups) <= NUM_PICKUPS
+    for k, car in enumerate(sim.cars):
+        batch.car_x[g, k], batch.car_w[g, k], batch.car_h[g, k] = car.x, car.width, car.height
+    batch.pickup_alive[g] = False
+    for p, pickup in enumerate(sim.ammo_pickups):
+        batch.pickup_x[g, p], batch.pickup_alive[g, p] = pickup.x, True
+
+
+def batch_cars(batch: BatchSimulation, g: int) -> list:
+    return sorted(zip(batch.car_x[g].tolist(), batch.car_w[g].tolist(), batch.car_h[g].tolist()))
+
+
+def batch_pickups(batch: BatchSimulation, g: int) -> list:
+    return sorted(batch.pickup_x[g][batch.pickup_alive[g]].tolist())
+
+
+def scripted_actions(sim: GameSimulation, rng: random.Random) -> int:
+    """Usually jump over the next car, and shoot now and then, so games last long enough to pick up ammo."""
+    near_car = any(0 < car.left - sim.player_rect.right < 60 for car in sim.cars)
+    actions = ACTION_JUMP if rng.random() < (0.5 if near_car else JUMP_CHANCE) else ACTION_NONE
+    return actions | (ACTION_SHOOT if rng.random() < SHOOT_CHANCE else ACTION_NONE)
+
+
+def test_batch_matches_game_simulation_per_seed():
+    car_surfs = load_car_surfs(convert=False)
+    sims = [GameSimulation(car_surfs, seed=seed) for seed in SEEDS]
+    batch = BatchSimulation(len(sims), seed=0, car_surfs=car_surfs)
+    for g, sim in enumerate(sims):
+        for k, car in enumerate(sim.cars):
+            batch.car_x[g, k], batch.car_w[g, k], batch.car_h[g, k] = car.x, car.width, car.height
+    first_cars = [sim.cars[0] for sim in sims]
+    # The batch's first respawn would put a different car at the right - stop before it can matter
+    playing = np.ones(len(sims), dtype=bool)
+    rng = random.Random(1234)
+
+    compared = 0
+    while playing.any():
+        actions = np.array([ACTION_JUMP if rng.random() < JUMP_CHANCE else ACTION_NONE for _ in sims])
+        died = batch.step(actions)
+        for g, sim in enumerate(sims):
+            if not playing[g]:
+                continue
+            events = sim.step(int(actions[g]))
+            assert ("death" in events) == died[g], f"seed {sim.seed} frame {sim.frame}"
+            if died[g]:
+                playing[g] = False
+                continue
+            assert sim.player_rect.bottom == batch.player_y[g], f"seed {sim.seed} frame {sim.frame}"
+            assert sim.score == batch.score[g]
+            assert sim.scroll_speed == batch.scroll_speed[g]
+            compared += 1
+            if sim.cars[0] is not first_cars[g]:
+                playing[g] = False
+    assert compared > 100 * len(sims)
+
+
+def test_batch_matches_game_simulation_with_shooting_and_pickups():
+    # Here spawns cannot match at all, so after every step the batch games are given the new cars
+    # and pickups of their GameSimulation. Everything that was already there must have moved,
+    # exploded, been collected or been removed the same way, and the player state must match.
+    # A game that ends is restarted on the next seed, so each slot plays many games.
+    car_surfs = load_car_surfs(convert=False)
+    sims = [GameSimulation(car_surfs, seed=seed) for seed in SEEDS]
+    batch = BatchSimulation(len(sims), seed=0, car_surfs=car_surfs)
+    next_seed = len(sims)
+    rng = random.Random(4321)
+    totals = {"shot": 0, "pickup": 0, "explosion": 0, "death": 0}
+
+    for step in range(SYNCED_STEPS):
+        before = []
+        for g, sim in enumerate(sims):
+            copy_layout(sim, batch, g)
+            before.append(([(car.x, car.width, car.height) for car in sim.cars], [pickup.x for pickup in sim.ammo_pickups]))
+        actions = np.array([scripted_actions(sim, rng) for sim in sims])
+        died = batch.step(actions)
+
+        for g, sim in enumerate(sims):
+            where = f"seed {sim.seed} frame {sim.frame + 1}"
+            ammo = sim.player_ammo
+            events = sim.step(int(actions[g]))
+            for event in ("shot", "explosion", "death"):
+                totals[event] += event in events
+            totals["pickup"] += sim.player_ammo > ammo
+            assert ("death" in events) == died[g], where
+            assert (sim.score, sim.player_ammo, sim.ammo_used) == (batch.score[g], batch.player_ammo[g], batch.ammo_used[g]), where
+            assert sim.player_rect.bottom == batch.player_y[g], where
+            assert sim.scroll_speed == batch.scroll_speed[g], where
+
+            # What was there before the step and still is, ignoring anything spawned this step
+            old_cars, old_pickups = before[g]
+            moved_cars = {(x - sim.scroll_step, w, h) for x, w, h in old_cars}
+            moved_pickups = {x - sim.scroll_step for x in old_pickups}
+            sim_cars = sorted((car.x, car.width, car.height) for car in sim.cars)
+            assert [car for car in sim_cars if car in moved_cars] == [car for car in batch_cars(batch, g) if car in moved_cars], where
+            # Pickups under a new car are removed, and new cars differ, so leave those out too
+            new_cars = [car for car in sim_cars + batch_cars(batch, g) if car not in moved_cars]
+            moved_pickups = {x for x in moved_pickups if not any(x < cx + w and x + AMMO_PICKUP_WIDTH > cx for cx, w, _ in new_cars)}
+            sim_pickups = sorted(pickup.x for pickup in sim.ammo_pickups)
+            assert [x for x in sim_pickups if x in moved_pickups] == [x for x in batch_pickups(batch, g) if x in moved_pickups], where
+
+            if died[g]:
+                sim.reset(next_seed)
+                next_seed += 1
+        if died.any():
+            batch.reset(died)
+
+    # Make sure every rule was actually exercised
+    assert totals["death"] > 2 * len(sims), totals
+    assert min(totals["shot"], totals["pickup"], totals["explosion"]) > 50, totals
+
+
+def test_finished_games_stay_frozen_until_reset():
+    batch = BatchSimulation(4, seed=1)
+    # Standing still runs into the first car
+    while not batch.done.all():
+        batch.step(np.zeros(4, dtype=np.int64))
+    frames = batch.frame.copy()
+    batch.step(np.zeros(4, dtype=np.int64))
+    assert (batch.frame == frames).all()
+
+    batch.reset(np.array([True, False, False, False]))
+    assert list(batch.done) == [False, True, True, True]
+    assert batch.frame[0] == 0 and batch.player_y[0] == GROUND_Y_DEFAULT
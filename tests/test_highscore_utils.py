@@ -0,0 +1,85 @@
+import multiprocessing
+import random
+import sqlite3
+# Utility imports
+from highscore_utils import HighScoreStore, HIGH_SCORE_KEEP
+
+WRITERS = 4
+RUNS_PER_WRITER = 50
+
+
+def test_legacy_score_is_imported_once(tmp_path):
+    db, legacy = tmp_path / "highscores.db", tmp_path / "highscore.txt"
+    legacy.write_text("42")
+    store = HighScoreStore(str(db), legacy_path=str(legacy))
+    store.close()
+    assert [(run.score, run.seed) for run in store.runs] == [(42, None)]
+
+    # Even if the old file changes, a database that has runs is never imported into again
+    legacy.write_text("99")
+    store = HighScoreStore(str(db), legacy_path=str(legacy))
+    store.close()
+    assert [run.score for run in store.runs] == [42]
+
+
+def test_missing_or_bad_legacy_file_is_ignored(tmp_path):
+    legacy = tmp_path / "highscore.txt"
+    store = HighScoreStore(str(tmp_path / "a.db"), legacy_path=str(legacy))
+    store.close()
+    legacy.write_text("not a number")
+    other = HighScoreStore(str(tmp_path / "b.db"), legacy_path=str(legacy))
+    other.close()
+    assert store.runs == [] and other.runs == []
+
+
+def test_keeps_the_best_runs_in_order(tmp_path):
+    db = str(tmp_path / "highscores.db")
+    store = HighScoreStore(db, keep=3)
+    for score in [5, 50, 20, 50, 1]:
+        store.submit(score, seed=score, frames=score * 10)
+    assert store.best == 50  # Before anything is written
+    store.close()
+    reopened = HighScoreStore(db, keep=3)
+    reopened.close()
+    assert [run.score for run in reopened.runs] == [50, 50, 20]
+    assert reopened.runs[0].frames == 500
+
+
+def test_a_bad_run_does_not_stop_the_writer(tmp_path, capsys):
+    db = str(tmp_path / "highscores.db")
+    store = HighScoreStore(db)
+    store.submit(10, seed=2 ** 64, frames=1)  # Too big for SQLite's integers
+    store.submit(7, seed=3, frames=1)
+    store.close()
+    assert "Could not save high score 10" in capsys.readouterr().out
+    reopened = HighScoreStore(db)
+    reopened.close()
+    assert [(run.score, run.seed) for run in reopened.runs] == [(7, 3)]
+
+
+def submit_runs(db: str, writer: int) -> None:
+    rng = random.Random(writer)
+    store = HighScoreStore(db)
+    for i in range(RUNS_PER_WRITER):
+        store.submit(rng.randrange(1000), seed=writer * RUNS_PER_WRITER + i, frames=i)
+    store.close()
+
+
+def test_concurrent_writers_keep_the_true_top_runs(tmp_path):
+    db = str(tmp_path / "highscores.db")
+    HighScoreStore(db).close()  # Create the table before the writers race
+    processes = [multiprocessing.Process(target=submit_runs, args=(db, writer)) for writer in range(WRITERS)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+
+    scores = []
+    for writer in range(WRITERS):
+        rng = random.Random(writer)
+        scores += [rng.randrange(1000) for _ in range(RUNS_PER_WRITER)]
+    with sqlite3.connect(db) as conn:
+        saved = sorted((row[0] for row in conn.execute("SELECT score FROM runs")), reverse=True)
+        assert conn.execute("PRAGMA integrity_check").fetchone() == ("ok",)
+    assert saved == sorted(scores, reverse=True)[:HIGH_SCORE_KEEP]
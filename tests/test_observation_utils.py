@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+# Utility imports
+from observation_utils import FrameRing, ObservationPipeline, GRAY_WEIGHTS
+
+SIZE = (32, 16)
+
+
+def random_frame(seed: int = 0) -> np.ndarray:
+    """A (height, width, 4) B, G, R, A frame of random pixels."""
+    return np.random.default_rng(seed).integers(0, 256, (SIZE[1], SIZE[0], 4), dtype=np.uint8)
+
+
+def reference(frame: np.ndarray, grayscale: bool, downscale: int) -> np.ndarray:
+    """The observation worked out the slow, obvious way."""
+    pixels = frame.astype(np.int64)
+    if downscale > 1:
+        height, width = frame.shape[:2]
+        blocks = pixels.reshape(height // downscale, downscale, width // downscale, downscale, 4)
+        pixels = blocks.sum(axis=(1, 3)) // (downscale * downscale)
+    blue, green, red = pixels[..., 0], pixels[..., 1], pixels[..., 2]
+    if grayscale:
+        return (red * GRAY_WEIGHTS["r"] + green * GRAY_WEIGHTS["g"] + blue * GRAY_WEIGHTS["b"]) >> 8
+    return np.stack([red, green, blue], axis=-1)
+
+
+@pytest.mark.parametrize("grayscale", [False, True])
+@pytest.mark.parametrize("downscale", [1, 2, 4, 8])
+def test_observations_match_a_reference(grayscale, downscale):
+    pipeline = ObservationPipeline(SIZE, grayscale, downscale)
+    for seed in range(3):
+        frame = random_frame(seed)
+        observation = pipeline.process(frame)
+        assert observation.shape == pipeline.shape
+        np.testing.assert_array_equal(observation, reference(frame, grayscale, downscale))
+
+
+def test_white_stays_white():
+    frame = np.full((SIZE[1], SIZE[0], 4), 255, dtype=np.uint8)
+    assert np.all(ObservationPipeline(SIZE, grayscale=True, downscale=4).process(frame) == 255)
+
+
+def test_bad_downscale_is_rejected():
+    with pytest.raises(ValueError, match="does not divide"):
+        ObservationPipeline(SIZE, downscale=3)
+    with pytest.raises(ValueError, match="16 bits"):
+        ObservationPipeline((34, 34), downscale=17)
+
+
+def test_frame_ring_readers_see_published_frames():
+    ring = FrameRing(2, SIZE)
+    reader = FrameRing.attach(ring.name, 2, SIZE)
+    try:
+        assert reader.latest() == (-1, None)
+        for number, colour in enumerate([(10, 20, 30), (40, 50, 60), (70, 80, 90)]):
+            ring.next_surface().fill(colour)
+            assert ring.publish() == number
+            latest, pixels = reader.latest()
+            assert latest == number
+            assert tuple(pixels[3, 5]) == (colour[2], colour[1], colour[0], 255)  # B, G, R, A
+        assert reader.is_current(2)
+        assert not reader.is_current(1)  # The writer draws the next frame into its slot
+    finally:
+        reader.close()
+        ring.close()
+        ring.unlink()
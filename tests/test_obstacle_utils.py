@@ -0,0 +1,104 @@
+import pygame
+import pytest
+# Utility imports
+from obstacle_utils import ObstacleQueue
+
+
+def make_queue(lefts, width=10, capacity=4):
+    queue = ObstacleQueue(capacity)
+    for left in lefts:
+        queue.append(pygame.Rect(left, 0, width, 10), surf=f"surf{left}")
+    return queue
+
+
+def lefts(queue):
+    return [rect.left for rect in queue]
+
+
+def wrapped_queue():
+    """A full queue whose leftmost obstacle is in the middle of the ring."""
+    queue = make_queue([0, 20, 40, 60])
+    queue.popleft()
+    queue.popleft()
+    queue.append(pygame.Rect(80, 0, 10, 10), surf="surf80")
+    queue.append(pygame.Rect(100, 0, 10, 10), surf="surf100")
+    assert queue._head == 2  # The next two obstacles sit in slots 0 and 1
+    return queue
+
+
+def test_popleft_and_append_wrap_around_the_ring():
+    queue = wrapped_queue()
+    assert lefts(queue) == [40, 60, 80, 100]
+    assert [queue[i].left for i in range(4)] == [40, 60, 80, 100]
+    assert queue[-1].left == 100
+    assert [surf for surf, _ in queue.items()] == ["surf40", "surf60", "surf80", "surf100"]
+    assert queue.surf(2) == "surf80"
+
+
+def test_growing_a_wrapped_queue_keeps_the_order():
+    queue = wrapped_queue()
+    queue.append(pygame.Rect(120, 0, 10, 10), surf="surf120")
+    assert lefts(queue) == [40, 60, 80, 100, 120]
+    assert queue.surf(4) == "surf120"
+
+
+def test_index_errors():
+    queue = make_queue([0, 20])
+    with pytest.raises(IndexError):
+        queue[2]
+    with pytest.raises(IndexError):
+        queue[-3]
+    with pytest.raises(IndexError):
+        ObstacleQueue().popleft()
+
+
+@pytest.mark.parametrize("x, index", [(-5, 0), (39, 0), (40, 1), (60, 2), (99, 3), (100, 4), (1000, 4)])
+def test_index_ahead(x, index):
+    assert wrapped_queue().index_ahead(x) == index
+
+
+@pytest.mark.parametrize("i", [0, 1, 2, 3, -1])
+def test_remove_at_either_side_of_a_wrapped_queue(i):
+    queue = wrapped_queue()
+    expected = [40, 60, 80, 100]
+    del expected[i]
+    queue.remove_at(i)
+    assert lefts(queue) == expected
+    assert [surf for surf, _ in queue.items()] == [f"surf{left}" for left in expected]
+    # The freed slot is reused in order
+    queue.append(pygame.Rect(200, 0, 10, 10))
+    assert lefts(queue) == expected + [200]
+
+
+def test_move_scrolls_every_obstacle():
+    queue = wrapped_queue()
+    queue.move(-5)
+    assert lefts(queue) == [35, 55, 75, 95]
+
+
+@pytest.mark.parametrize("left, right, expected", [
+    (-20, -10, []),  # Before everything
+    (45, 55, [40]),  # Inside one obstacle
+    (45, 61, [40, 60]),  # Across the gap into the next
+    (50, 60, []),  # The gap between two, touching both edges is not overlapping
+    (30, 41, [40]),
+    (0, 200, [40, 60, 80, 100]),
+    (110, 200, []),  # Past the last one's right edge
+])
+def test_overlapping_a_wrapped_queue(left, right, expected):
+    queue = wrapped_queue()
+    assert [rect.left for rect in queue.overlapping(left, right)] == expected
+    start, stop = queue.overlap_range(left, right)
+    assert [queue[i].left for i in range(start, stop)] == expected
+
+
+def test_overlapping_matches_a_full_scan():
+    queue = ObstacleQueue(2)
+    x = 0
+    for width in [5, 30, 12, 80, 1, 44, 9]:
+        queue.append(pygame.Rect(x, 0, width, 10))
+        x += width + 7
+    for left in range(-10, x + 10, 3):
+        for right in range(left, x + 20, 11):
+            scan = [rect for rect in queue if rect.right > left and rect.left < right]
+            assert queue.overlapping(left, right) == scan
@@ -0,0 +1,112 @@
+import os
+import random
+import struct
+import subprocess
+import sys
+import pytest
+# Utility imports
+from replay_utils import Replay, run_replay, replay_simulation, REPLAY_EXTENSION
+from simulation import GameSimulation, SEED_RANGE, ACTION_NONE, ACTION_JUMP, ACTION_SHOOT
+
+
+def play_recorded_game(seed: int, pixel_collision: bool = False) -> Replay:
+    """Play a game with random inputs to the end, recording it."""
+    sim = replay_simulation(Replay(seed, pixel_collision=pixel_collision))
+    sim.reset(seed)
+    replay = Replay(sim.seed, pixel_collision=sim.precise_collision)
+    rng = random.Random(seed)
+    while sim.is_playing:
+        actions = rng.choice([ACTION_NONE] * 20 + [ACTION_JUMP, ACTION_SHOOT, ACTION_JUMP | ACTION_SHOOT])
+        replay.record(sim.frame, actions)
+        sim.step(actions)
+    replay.finish(sim)
+    return replay
+
+
+@pytest.mark.parametrize("seed", [0, 7, SEED_RANGE - 1])
+def test_saved_replay_plays_back_the_same_game(tmp_path, seed):
+    replay = play_recorded_game(seed)
+    path = tmp_path / f"game{REPLAY_EXTENSION}"
+    replay.save(str(path))
+
+    loaded = Replay.load(str(path))
+    assert (loaded.seed, loaded.frames, loaded.score, loaded.inputs) == (seed, replay.frames, replay.score, replay.inputs)
+    sim = run_replay(loaded)
+    assert (sim.frame, sim.score) == (replay.frames, replay.score)
+
+
+def test_bad_magic_is_rejected(tmp_path):
+    path = tmp_path / f"bad{REPLAY_EXTENSION}"
+    play_recorded_game(1).save(str(path))
+    data = bytearray(path.read_bytes())
+    data[:8] = b"NOTREPLY"
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="not a replay file"):
+        Replay.load(str(path))
+
+
+def test_truncated_replay_is_rejected(tmp_path):
+    path = tmp_path / f"short{REPLAY_EXTENSION}"
+    replay = play_recorded_game(2)
+    assert len(replay.inputs) > 1
+    replay.save(str(path))
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(ValueError, match="truncated"):
+        Replay.load(str(path))
+
+
+def test_short_header_is_rejected(tmp_path):
+    path = tmp_path / f"empty{REPLAY_EXTENSION}"
+    path.write_bytes(b"DINOREPL")
+    with pytest.raises(ValueError, match="not a replay file"):
+        Replay.load(str(path))
+
+
+def test_random_seeds_fit_the_replay_header():
+    for _ in range(100):
+        seed = GameSimulation().seed
+        assert 0 <= seed < SEED_RANGE
+        Replay(seed).save(os.devnull)
+
+
+@pytest.mark.parametrize("seed", ["-5", str(SEED_RANGE)])
+def test_main_rejects_seeds_a_replay_cannot_store(seed):
+    # Rejected while parsing the options, before any window opens
+    result = subprocess.run([sys.executable, "main.py", "--seed", seed], capture_output=True, text=True, timeout=60)
+    assert result.returncode == 2
+    assert "seed must be from 0 to" in result.stderr
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_pixel_collision_replays_play_back_with_pixel_collisions(tmp_path, seed):
+    replay = play_recorded_game(seed, pixel_collision=True)
+    path = tmp_path / f"precise{REPLAY_EXTENSION}"
+    replay.save(str(path))
+
+    loaded = Replay.load(str(path))
+    assert loaded.pixel_collision
+    sim = run_replay(loaded)
+    assert sim.precise_collision
+    assert (sim.frame, sim.score) == (replay.frames, replay.score)
+
+
+def test_replay_refuses_a_simulation_with_the_other_collision_mode():
+    with pytest.raises(ValueError, match="pixel_collision"):
+        run_replay(play_recorded_game(3, pixel_collision=True), GameSimulation())
+
+
+def test_other_versions_are_rejected(tmp_path):
+    path = tmp_path / f"v1{REPLAY_EXTENSION}"
+    play_recorded_game(4).save(str(path))
+    data = bytearray(path.read_bytes())
+    struct.pack_into("<H", data, 8, 1)
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="version 1 replay file, only version 2"):
+        Replay.load(str(path))
+
+
+@pytest.mark.parametrize("options", [["--replay", "game.dinoreplay", "--record", "replays"], ["--replay-speed", "4"]])
+def test_main_rejects_replay_options_that_would_do_nothing_useful(options):
+    result = subprocess.run([sys.executable, "main.py", *options], capture_output=True, text=True, timeout=60)
+    assert result.returncode == 2
+    assert "--replay" in result.stderr.splitlines()[-1]
@@ -0,0 +1,12 @@
+# Utility imports
+from rollout import RolloutPool
+
+
+def test_sweep_plays_every_seed_for_every_parameter_set():
+    param_sets = [{"scroll_speed_start": 5.0}, {"scroll_speed_start": 8.0}]
+    with RolloutPool(2, max_frames=300) as pool:
+        # A generator can only be read once
+        results = list(pool.sweep(param_sets, (seed for seed in range(3))))
+    assert sorted((r.params["scroll_speed_start"], r.seed) for r in results) == [
+        (speed, seed) for speed in (5.0, 8.0) for seed in range(3)
+    ]
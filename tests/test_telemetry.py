@@ -0,0 +1,124 @@
+import json
+import threading
+import time
+import pytest
+# Utility imports
+import telemetry_utils
+from telemetry_utils import Telemetry, TelemetrySink
+from telemetry_server import TelemetryAggregator
+from simulation import GameSimulation
+
+
+def batch(seq=0, events=(), frame_ms=None, host="kiosk"):
+    return {"host": host, "pid": 1, "seq": seq, "start": 0.0, "events": list(events), "frame_ms": frame_ms or {"16": 3}}
+
+
+class BrokenSink(TelemetrySink):
+    """Fails with something other than OSError."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def send(self, data: bytes) -> None:
+        self.calls += 1
+        raise RuntimeError("sink bug")
+
+
+class StuckSink(TelemetrySink):
+    """Blocks until released, like an HTTP sink waiting on a dead server."""
+
+    def __init__(self) -> None:
+        self.release = threading.Event()
+
+    def send(self, data: bytes) -> None:
+        self.release.wait()
+
+
+def telemetry_with(sink: TelemetrySink, tmp_path) -> Telemetry:
+    telemetry = Telemetry(str(tmp_path / "unused.jsonl"))
+    telemetry._sink.close()
+    telemetry._sink = sink
+    return telemetry
+
+
+def test_sinks_must_implement_send():
+    with pytest.raises(TypeError):
+        TelemetrySink()
+
+
+def test_file_sink_writes_one_batch_per_line(tmp_path):
+    path = tmp_path / "telemetry.jsonl"
+    telemetry = Telemetry(str(path))
+    sim = GameSimulation(seed=1)
+    telemetry.record_step(sim, sim.step())
+    telemetry.record_frame(16.7)
+    telemetry.close()
+    lines = path.read_bytes().splitlines()
+    assert len(lines) == 1 and telemetry.sent == 1
+    sent = json.loads(lines[0])
+    assert sent["events"][0]["event"] == "run_start"
+    assert sent["frame_ms"] == {"16": 1}
+
+
+def test_sender_survives_any_sink_error(tmp_path, capsys):
+    sink = BrokenSink()
+    telemetry = telemetry_with(sink, tmp_path)
+    for _ in range(3):
+        telemetry._send_batch()
+    telemetry.close()
+    assert sink.calls == 4 and telemetry.failed == 4
+    assert capsys.readouterr().out.count("Warning") == 1  # Only the first failure in a row
+
+
+def test_close_gives_up_on_a_stuck_sink(tmp_path, monkeypatch):
+    monkeypatch.setattr(telemetry_utils, "CLOSE_TIMEOUT", 0.2)
+    sink = StuckSink()
+    telemetry = telemetry_with(sink, tmp_path)
+    for _ in range(telemetry_utils.SEND_QUEUE_BATCHES + 5):  # Fill the queue behind the stuck send
+        telemetry._send_batch()
+    start = time.monotonic()
+    telemetry.close()
+    assert time.monotonic() - start < 2
+    assert telemetry.dropped >= telemetry_utils.SEND_QUEUE_BATCHES
+    sink.release.set()
+
+
+def test_aggregator_totals():
+    aggregator = TelemetryAggregator()
+    aggregator.add(batch(0, [{"event": "run_start"}, {"event": "shot"}, {"event": "death", "x": -47, "y": 12}]))
+    aggregator.add(batch(2, [{"event": "run_end", "score": 30, "frame": 900}], {"16": 97, "40": 3}))
+    summary = aggregator.summary()
+    assert summary["runs_started"] == 1 and summary["runs_finished"] == 1
+    assert summary["missing_batches"] == 1
+    assert summary["death_spots"] == [{"x": -50, "y": 10, "deaths": 1}]
+    assert summary["frame_ms_p50"] == 16 and summary["frame_ms_p99"] == 40
+
+
+@pytest.mark.parametrize("bad", [
+    batch(0, [{"event": "shot"}, {"event": "run_end", "score": 5}]),  # Missing the steps
+    batch(0, [{"event": "shot"}, {"event": "death", "x": "left", "y": 0}]),
+    batch(0, [{"event": "shot"}], frame_ms={"16": "many"}),
+    {"host": "kiosk", "pid": 1, "seq": 0},
+])
+def test_a_malformed_batch_changes_nothing(bad):
+    aggregator = TelemetryAggregator()
+    aggregator.add(batch(0, [{"event": "shot"}]))
+    before = aggregator.summary()
+    with pytest.raises((KeyError, TypeError, ValueError)):
+        aggregator.add(bad)
+    assert aggregator.summary() == before
+    assert aggregator.shots == 1
+
+
+def test_file_mode_skips_malformed_lines(capsys):
+    aggregator = TelemetryAggregator()
+    lines = [
+        json.dumps(batch(0, [{"event": "shot"}])).encode(),
+        b'{"host": "kiosk", "pid": 1, "seq": 1, "eve',  # Cut off mid-write
+        b"[1, 2, 3]",
+        b"",
+        json.dumps(batch(1, [{"event": "shot"}])).encode(),
+    ]
+    assert aggregator.add_lines(lines) == 2
+    assert aggregator.batches == 2 and aggregator.shots == 2
+    assert capsys.readouterr().out.count("Warning") == 2
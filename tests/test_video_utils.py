@@ -0,0 +1,70 @@
+import pygame
+import pytest
+# Utility imports
+import video_utils
+from video_utils import VideoRecorder, read_video, VIDEO_EXTENSION
+
+SIZE = (24, 10)
+FRAMES = 12
+
+
+def colour(i: int) -> pygame.Color:
+    return pygame.Color(i * 20, 100 + i, 255 - i * 10)
+
+
+def record(path: str, format: str) -> VideoRecorder:
+    """Record FRAMES frames of a different solid colour each, with room for all of them in the queue."""
+    surface = pygame.Surface(SIZE, depth=32)
+    video = VideoRecorder(path, surface, 60, format, queue_frames=FRAMES)
+    for i in range(FRAMES):
+        surface.fill(colour(i))
+        surface.fill("white", (i, 0, 1, 1))  # A pixel that moves, so frames differ in more than colour
+        video.capture(surface)
+    video.close()
+    return video
+
+
+@pytest.mark.parametrize("format", ["zlib", "raw"])
+def test_recorded_frames_read_back(tmp_path, format):
+    path = str(tmp_path / f"game{VIDEO_EXTENSION}")
+    video = record(path, format)
+    assert (video.written, video.dropped, video.decimated) == (FRAMES, 0, 0)
+
+    size, fps, byte_order, frames = read_video(path)
+    assert (size, fps) == (SIZE, 60)
+    frames = list(frames)
+    assert [number for number, _, _ in frames] == list(range(FRAMES))
+    red, green, blue = (byte_order.index(channel) for channel in (b"R", b"G", b"B"))
+    for i, (_, _, pixels) in enumerate(frames):
+        assert pixels.shape == (SIZE[1], SIZE[0], 4)
+        assert tuple(pixels[5, 20, [red, green, blue]]) == tuple(colour(i))[:3]
+        assert tuple(pixels[0, i, [red, green, blue]]) == (255, 255, 255)
+
+
+def test_png_frames_read_back(tmp_path):
+    video = record(str(tmp_path), "png")
+    assert video.written == FRAMES
+    for i in range(FRAMES):
+        image = pygame.image.load(str(tmp_path / f"{i:06d}.png"))
+        assert image.get_at((20, 5)) == colour(i)
+        assert image.get_at((i, 0)) == pygame.Color("white")
+
+
+def test_failed_write_stops_recording_cleanly(tmp_path, monkeypatch, capsys):
+    def broken_save(*args) -> None:
+        raise pygame.error("no space for the png")
+
+    monkeypatch.setattr(video_utils, "save_png", broken_save)
+    video = record(str(tmp_path), "png")  # close() must not hang on the stopped writer
+    assert video.written == 0
+    assert "recording stopped" in capsys.readouterr().out
+
+
+def test_stride_returns_to_every_frame_once_the_writer_catches_up(tmp_path):
+    surface = pygame.Surface(SIZE, depth=32)
+    video = VideoRecorder(str(tmp_path / f"slow{VIDEO_EXTENSION}"), surface, 60, "zlib", queue_frames=1)
+    video.stride = 4  # As if the writer had fallen behind
+    video._caught_up.set()
+    video.capture(surface)
+    assert video.stride == 2
+    video.close()
@@ -0,0 +1,40 @@
+import pygame
+from collections import OrderedDict
+from typing import Dict, Tuple, Union
+
+# Shared fonts and rendered text - menus and the HUD draw the same few strings every frame,
+# so fonts are opened once and rendered text is kept until it falls out of an LRU cache
+
+FONT_PATH = "assets/font/PixeloidMono.ttf"
+TEXT_CACHE_SIZE = 256  # Rendered strings kept, far more than any one screen shows
+
+Color = Union[str, Tuple[int, int, int]]
+
+_fonts: Dict[Tuple[str, int], pygame.font.Font] = {}
+_text_cache: "OrderedDict[Tuple[pygame.font.Font, str, bool, Color], pygame.Surface]" = OrderedDict()
+
+
+def get_font(size: int, path: str = FONT_PATH) -> pygame.font.Font:
+    """The font at the given size, opened from disk the first time it is asked for."""
+    font = _fonts.get((path, size))
+    if font is None:
+        font = pygame.font.Font(path, size)
+        _fonts[(path, size)] = font
+    return font
+
+
+def render_text(font: pygame.font.Font, text: str, antialias: bool, color: Color) -> pygame.Surface:
+    """
+    font.render(), but each (font, text, antialias, color) is only rendered once while it stays in the cache.
+    The returned surface is shared, so draw it but don't modify it.
+    """
+    key = (font, text, antialias, color)
+    surf = _text_cache.get(key)
+    if surf is not None:
+        _text_cache.move_to_end(key)
+        return surf
+    surf = font.render(text, antialias, color)
+    _text_cache[key] = surf
+    if len(_text_cache) > TEXT_CACHE_SIZE:
+        _text_cache.popitem(last=False)
+    return surf
@@ -0,0 +1,234 @@
+import mmap
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+import zlib
+import numpy as np
+import pygame
+from typing import Iterator, Optional, Tuple
+
+# Gameplay video capture. The main loop only copies each presented frame into a free buffer
+# (well under a millisecond); a writer thread encodes and saves it. When the writer falls behind,
+# frames are skipped instead of making the game wait
+
+
+VIDEO_EXTENSION = ".dvid"
+VIDEO_MAGIC = b"DINOVIDS"
+VIDEO_VERSION = 1
+# magic, version, width, height, frame rate, compressed, byte order of a pixel (e.g. b"BGRX")
+VIDEO_HEADER_FORMAT = "<8sHIIHB4s"
+# Before each frame: its number among the presented frames, ms since recording started, data length
+FRAME_HEADER_FORMAT = "<III"
+VIDEO_FORMATS = ["zlib", "raw", "png"]
+
+VIDEO_QUEUE_FRAMES = 8  # Frames waiting for the writer, about 10 MB at 800x400
+MAX_FRAME_STRIDE = 8  # Keep at least every 8th frame when falling behind
+ZLIB_LEVEL = 1  # Fastest compression - game frames are mostly flat colour and compress well anyway
+RAW_GROW_FRAMES = 256  # The memory-mapped file grows by this many frames at a time
+
+
+def pixel_byte_order(surface: pygame.Surface) -> bytes:
+    """The channel stored in each byte of a 32-bit pixel, e.g. b"BGRX" (X for unused)."""
+    order = [b"X"] * 4
+    for channel, mask, shift in zip(b"RGBA", surface.get_masks(), surface.get_shifts()):
+        if mask:
+            byte = shift // 8 if sys.byteorder == "little" else 3 - shift // 8
+            order[byte] = bytes([channel])
+    return b"".join(order)
+
+
+class VideoRecorder:
+    """
+    Records frames of a 32-bit surface (the screen) to path in a background thread.
+    format is "zlib" (compressed frames in one file), "raw" (uncompressed frames in a memory-mapped
+    file) or "png" (a directory of numbered PNG files). capture() copies the surface into one of
+    VIDEO_QUEUE_FRAMES preallocated buffers; if none is free the frame is dropped and from then on
+    only every second, fourth, ... frame is kept, until the writer catches up again.
+    """
+
+    def __init__(self, path: str, surface: pygame.Surface, fps: int, format: str = "zlib", queue_frames: int = VIDEO_QUEUE_FRAMES) -> None:
+        if format not in VIDEO_FORMATS:
+            raise ValueError(f"unknown video format {format!r}, expected one of {VIDEO_FORMATS}")
+        if surface.get_bytesize() != 4:
+            raise ValueError("only 32-bit surfaces can be recorded")
+        self.path = path
+        self.format = format
+        self.size = surface.get_size()
+        self.fps = fps
+        self.byte_order = pixel_byte_order(surface)
+        width, height = self.size
+        self._frame_bytes = width * height * 4
+        self._buffers = [np.zeros((height, width * 4), dtype=np.uint8) for _ in range(queue_frames)]
+        self._free: "queue.Queue[int]" = queue.Queue()
+        for i in range(queue_frames):
+            self._free.put(i)
+        self._pending: "queue.Queue[Optional[Tuple[int, int, int]]]" = queue.Queue()
+
+        self.presented = 0  # Frames offered to capture()
+        self.written = 0
+        self.dropped = 0  # Skipped because every buffer was in use
+        self.decimated = 0  # Skipped to lower the frame rate while catching up
+        self.stride = 1  # Keep every stride-th frame, only changed by capture()
+        self._caught_up = threading.Event()  # Set by the writer whenever it empties the queue
+        self._start = time.perf_counter()
+
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._offset = 0
+        self._open()
+        self._thread = threading.Thread(target=self._write_frames, name="video-writer", daemon=True)
+        self._thread.start()
+
+    def capture(self, surface: pygame.Surface) -> None:
+        """Queue a copy of the surface's pixels for writing. Never waits for the writer."""
+        number = self.presented
+        self.presented += 1
+        if self.stride > 1 and self._caught_up.is_set():
+            # Go back towards recording every frame
+            self._caught_up.clear()
+            self.stride //= 2
+        if number % self.stride:
+            self.decimated += 1
+            return
+        try:
+            slot = self._free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            self.stride = min(self.stride * 2, MAX_FRAME_STRIDE)
+            return
+        # Rows can be padded, so only copy the pixels of each row. The view locks the surface
+        # until it is deleted
+        pixels = surface.get_view("0")
+        rows = np.frombuffer(pixels, dtype=np.uint8).reshape(self.size[1], surface.get_pitch())
+        np.copyto(self._buffers[slot], rows[:, :self.size[0] * 4])
+        del rows, pixels
+        elapsed_ms = int((time.perf_counter() - self._start) * 1000)
+        self._pending.put((slot, number, elapsed_ms))
+
+    def close(self) -> None:
+        """Write out the queued frames and finish the file."""
+        self._pending.put(None)
+        self._thread.join()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._file.truncate(self._offset)  # Drop the unused room at the end
+        if self._file is not None:
+            self._file.close()
+
+    def summary(self) -> str:
+        return (f"Recorded {self.written} of {self.presented} frames to {self.path} "
+                f"({self.dropped} dropped, {self.decimated} skipped to catch up)")
+
+    def _open(self) -> None:
+        if self.format == "png":
+            os.makedirs(self.path, exist_ok=True)
+            return
+        width, height = self.size
+        header = struct.pack(VIDEO_HEADER_FORMAT, VIDEO_MAGIC, VIDEO_VERSION, width, height, self.fps, self.format == "zlib", self.byte_order)
+        self._file = open(self.path, "w+b" if self.format == "raw" else "wb")
+        self._file.write(header)
+        self._offset = len(header)
+        if self.format == "raw":
+            self._file.flush()
+            self._grow_mmap()
+
+    def _write_frames(self) -> None:
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            slot, number, elapsed_ms = item
+            try:
+                self._write_frame(self._buffers[slot], number, elapsed_ms)
+            except (OSError, pygame.error) as e:
+                # Nothing is freed again, so capture() drops every frame from here on
+                print(f"Warning: Could not write video frame, recording stopped: {e}")
+                return
+            self._free.put(slot)
+            self.written += 1
+            if self._pending.empty():
+                self._caught_up.set()
+
+    def _write_frame(self, pixels: np.ndarray, number: int, elapsed_ms: int) -> None:
+        if self.format == "png":
+            save_png(pixels, self.size, self.byte_order, os.path.join(self.path, f"{number:06d}.png"))
+            return
+        data = zlib.compress(pixels, ZLIB_LEVEL) if self.format == "zlib" else memoryview(pixels).cast("B")
+        record = struct.pack(FRAME_HEADER_FORMAT, number, elapsed_ms, len(data))
+        if self._mmap is None:
+            self._file.write(record)
+            self._file.write(data)
+            return
+        end = self._offset + len(record) + len(data)
+        if end > len(self._mmap):
+            self._grow_mmap()
+        self._mmap[self._offset:self._offset + len(record)] = record
+        self._mmap[self._offset + len(record):end] = data
+        self._offset = end
+
+    def _grow_mmap(self) -> None:
+        record_size = struct.calcsize(FRAME_HEADER_FORMAT) + self._frame_bytes
+        size = max(self._offset, len(self._mmap) if self._mmap is not None else 0) + RAW_GROW_FRAMES * record_size
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.truncate(size)
+        self._mmap = mmap.mmap(self._file.fileno(), size)
+
+
+def save_png(pixels: np.ndarray, size: Tuple[int, int], byte_order: bytes, path: str) -> None:
+    """Save 32-bit pixels in byte_order as a PNG. Overwrites the unused byte, which becomes alpha."""
+    unused = byte_order.find(b"X")
+    if unused >= 0:
+        pixels.reshape(size[1], size[0], 4)[..., unused] = 255  # Opaque, the byte is often 0
+    pygame.image.save(pygame.image.frombuffer(pixels, size, byte_order.replace(b"X", b"A").decode()), path)
+
+
+def read_video(path: str) -> Tuple[Tuple[int, int], int, bytes, Iterator[Tuple[int, int, np.ndarray]]]:
+    """
+    Open a video written by VideoRecorder. Returns the frame size, frame rate, pixel byte order and
+    an iterator of (frame number, ms since the start, (height, width, 4) pixels) for every frame.
+    """
+    f = open(path, "rb")
+    header = f.read(struct.calcsize(VIDEO_HEADER_FORMAT))
+    magic, version, width, height, fps, compressed, byte_order = struct.unpack(VIDEO_HEADER_FORMAT, header)
+    if magic != VIDEO_MAGIC or version != VIDEO_VERSION:
+        f.close()
+        raise ValueError(f"{path} is not a version {VIDEO_VERSION} video file")
+
+    def frames() -> Iterator[Tuple[int, int, np.ndarray]]:
+        record_size = struct.calcsize(FRAME_HEADER_FORMAT)
+        with f:
+            while True:
+                record = f.read(record_size)
+                if len(record) < record_size:
+                    return
+                number, elapsed_ms, length = struct.unpack(FRAME_HEADER_FORMAT, record)
+                if not length:
+                    return  # Unused room at the end of a raw file that was not closed
+                data = f.read(length)
+                if compressed:
+                    data = zlib.decompress(data)
+                yield number, elapsed_ms, np.frombuffer(data, dtype=np.uint8).reshape(height, width, 4)
+
+    return (width, height), fps, byte_order, frames()
+
+
+def export_png(path: str, out_dir: str) -> int:
+    """Save every frame of a video as a numbered PNG. Returns how many were saved."""
+    size, _, byte_order, frames = read_video(path)
+    os.makedirs(out_dir, exist_ok=True)
+    count = 0
+    for number, _, pixels in frames:
+        save_png(pixels.copy(), size, byte_order, os.path.join(out_dir, f"{number:06d}.png"))
+        count += 1
+    return count
+
+
+if __name__ == "__main__":
+    # Turn a recording into PNG files for a bug report: python video_utils.py VIDEO OUT_DIR
+    if len(sys.argv) != 3:
+        sys.exit(f"usage: {sys.argv[0]} VIDEO{VIDEO_EXTENSION} OUT_DIR")
+    print(f"Saved {export_png(sys.argv[1], sys.argv[2])} frames to {sys.argv[2]}")